@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Check CLI import time against a fixed budget.
+
+Runs `cli.py --help` & `cli.py list` under `python -X importtime`, and
+fails if the total import time of either exceeds the budget. Interpreter
+startup (`site`) is not counted against the budget.
+
+    python benchmarks/import_time.py --budget-ms 100
+"""
+
+# Standard Library Imports
+import argparse
+import os
+import subprocess  # noqa: S404
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+COMMANDS = (("--help",), ("list",))
+CONFIG = """devices:
+  - name: router1
+    host: 192.0.2.1
+    username: admin
+    password: secret
+"""
+
+
+def import_times(args, env):
+    """Run the CLI with `-X importtime`.
+
+    Returns:
+        {list} -- (module, cumulative microseconds) of top-level imports
+    """
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", str(ROOT / "cli.py"), *args],
+        env=env,
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, module = line[len("import time:") :].split("|")
+        if not module.startswith("  ") and module.strip() != "site":
+            times.append((module.strip(), int(cumulative)))
+    return times
+
+
+def main():
+    """Run the import time check."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as temp:
+        config_file = Path(temp) / "junos_rest.yaml"
+        config_file.write_text(CONFIG)
+        env = {
+            **os.environ,
+            "JUNOS_REST_CONFIG": str(config_file),
+            "JUNOS_REST_SNAPSHOT_DIR": str(Path(temp) / "snapshots"),
+        }
+        # Build the inventory snapshot, so only warm starts are measured.
+        import_times(("list",), env)
+
+        for command in COMMANDS:
+            times = import_times(command, env)
+            total = sum(t for _, t in times) / 1000
+            status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+            failed = failed or total > args.budget_ms
+
+            print(  # noqa: T001
+                f"cli.py {' '.join(command)}: {total:.1f}ms "
+                f"(budget {args.budget_ms:.0f}ms) {status}"
+            )
+            for module, took in sorted(times, key=lambda t: -t[1])[: args.top]:
+                print(f"  {took / 1000:8.1f}ms  {module}")  # noqa: T001
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
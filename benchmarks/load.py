@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Measure push throughput & latency against simulated devices.
+
+Starts simulated devices with `junos_rest.simulator`, points junos_rest at
+them with a temporary config file, then pushes a distinct change for each
+push, spread evenly across the devices, & reports pushes per second &
+latency percentiles. No network access is needed, so it can run in CI.
+
+Operational RPCs can be run alongside the pushes with `--reads`, e.g. to
+see how junos_rest backs off from devices with a low `--max-connections`.
+
+The simulated devices run in the same process & event loop as junos_rest,
+so results include the simulator's own overhead.
+
+    python benchmarks/load.py --devices 50 --pushes 1000 --latency 0.01
+    python benchmarks/load.py --error-rate 0.05 --json
+    python benchmarks/load.py --reads 2000 --max-connections 2
+"""
+
+# Standard Library Imports
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Project Imports
+from junos_rest.log import configure_logging  # noqa: E402
+from junos_rest.simulator import Simulator  # noqa: E402
+
+
+def make_config(push):
+    """Build a change which doesn't conflict with any other push."""
+    return {
+        "interfaces": {
+            "interface": [{"name": f"ge-0/0/{push}", "description": f"Push {push}"}]
+        }
+    }
+
+
+def uptime(**args):
+    """Build `get-system-uptime-information` output."""
+    return {"system-uptime-information": [{"time-length": [{"data": "5w4d 04:00"}]}]}
+
+
+def percentile(values, fraction):
+    """Get a percentile of sorted values."""
+    if not values:
+        return 0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(args, tmp):
+    """Run the pushes & reads against the simulated devices.
+
+    Returns:
+        {dict} -- Summary
+    """
+    simulator = Simulator(
+        devices=args.devices,
+        latency=args.latency,
+        commit_duration=args.commit_duration,
+        error_rate=args.error_rate,
+        max_connections=args.max_connections,
+        responses={"get-system-uptime-information": uptime},
+    )
+    attrs = {"max_sessions": args.max_sessions} if args.max_sessions else {}
+    async with simulator:
+        config_file = Path(tmp) / "junos_rest.yaml"
+        config_file.write_text(simulator.inventory(**attrs))
+        os.environ["JUNOS_REST_CONFIG"] = str(config_file)
+        os.environ["JUNOS_REST_SNAPSHOT_DIR"] = tmp
+
+        # Imported after the config is set, so nothing reads another config.
+        from junos_rest.actions import run_rpc
+        from junos_rest.actions import set_config
+        from junos_rest.limiter import limiter
+        from junos_rest.pool import pool
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = {"pushes": [], "reads": []}
+        statuses = Counter()
+
+        async def timed(kind, operation):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await operation
+                    statuses[result.get("status", "success")] += 1
+                except Exception as err:
+                    statuses[type(err).__name__] += 1
+                latencies[kind].append(time.perf_counter() - start)
+
+        def device(i):
+            return simulator.devices[i % args.devices].name
+
+        operations = [
+            timed("pushes", set_config(device(i), config=make_config(i)))
+            for i in range(args.pushes)
+        ] + [
+            timed("reads", run_rpc(device(i), "get-system-uptime-information"))
+            for i in range(args.reads)
+        ]
+
+        start = time.perf_counter()
+        async with pool:
+            await asyncio.gather(*operations)
+        elapsed = time.perf_counter() - start
+
+        summary = {
+            "devices": args.devices,
+            "pushes": args.pushes,
+            "reads": args.reads,
+            "seconds": round(elapsed, 3),
+        }
+        for kind, values in latencies.items():
+            values.sort()
+            summary.update(
+                {
+                    f"{kind}_per_second": round(len(values) / elapsed, 1),
+                    f"{kind}_p50_ms": round(percentile(values, 0.5) * 1000, 1),
+                    f"{kind}_p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                    f"{kind}_max_ms": round(percentile(values, 1) * 1000, 1),
+                }
+            )
+        limits = [limiter.limit(d.name) or 0 for d in simulator.devices]
+        summary.update(
+            {
+                "commits": sum(len(d.commits) for d in simulator.devices),
+                "requests": sum(d.requests for d in simulator.devices),
+                "min_limit": round(min(limits), 1),
+                "statuses": dict(statuses),
+            }
+        )
+        return summary
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--pushes", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--commit-duration", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--max-connections", type=int, default=None)
+    parser.add_argument("--max-sessions", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print JSON summary")
+    args = parser.parse_args()
+
+    configure_logging(level="ERROR")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loop = asyncio.new_event_loop()
+        try:
+            summary = loop.run_until_complete(run(args, tmp))
+        finally:
+            loop.close()
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(
+        f"{summary['pushes']} pushes & {summary['reads']} reads to "
+        f"{summary['devices']} devices in {summary['seconds']:.2f}s"
+    )
+    for kind in ("pushes", "reads"):
+        if summary[kind]:
+            print(f"  {kind}")
+            print(f"    throughput  {summary[f'{kind}_per_second']:10.1f}/s")
+            print(f"    p50         {summary[f'{kind}_p50_ms']:10.1f}ms")
+            print(f"    p99         {summary[f'{kind}_p99_ms']:10.1f}ms")
+            print(f"    max         {summary[f'{kind}_max_ms']:10.1f}ms")
+    print(f"  commits       {summary['commits']:10d}")
+    print(f"  requests      {summary['requests']:10d}")
+    print(f"  min limit     {summary['min_limit']:10.1f}")
+    print(f"  statuses      {summary['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Measure how long logging blocks the event loop during a burst of pushes.
+
+Simulates many concurrent pushes of a large config, each of which builds
+the config, logs a few debug messages & handles a failed device, while a
+monitor task measures how late the event loop wakes it up.
+
+    before      The previous behavior: a synchronous DEBUG sink, the full
+                config formatted on every push & every error logged when
+                it's raised.
+    after       The current defaults: an enqueued sink at the default
+                level, lazy formatting & errors logged where handled.
+
+    python benchmarks/log_blocking.py --pushes 2000 --interfaces 500
+"""
+
+# Standard Library Imports
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError  # noqa: E402
+from junos_rest.log import configure_logging  # noqa: E402
+from junos_rest.log import log  # noqa: E402
+from junos_rest.util import build_config  # noqa: E402
+
+TICK = 0.001
+
+
+def make_config(interfaces):
+    """Build a config with many interfaces."""
+    return {
+        "interfaces": {
+            "interface": [
+                {
+                    "name": f"ge-0/0/{i}",
+                    "description": f"Link to peer {i}",
+                    "unit": [{"name": 0, "family": {"inet": {"address": []}}}],
+                }
+                for i in range(interfaces)
+            ]
+        }
+    }
+
+
+async def push_before(name, config):
+    """Log a push the way junos_rest previously did."""
+    parsed = {"configuration": config}
+    log.debug("Pending Config:\n{c}", c=parsed)
+    log.debug(f"Using cached running config for '{name}'")
+    err = JunosRestError("{d} is unreachable.", status=502, d=name)
+    log.critical(repr(err))
+    log.critical(f"'{name}': {err}")
+
+
+async def push_after(name, config):
+    """Log a push the way junos_rest currently does."""
+    await build_config(config=config)
+    log.debug("Using cached running config for '{}'", name)
+    try:
+        raise JunosRestError("{d} is unreachable.", status=502, d=name)
+    except JunosRestError as err:
+        log.log(err.level, "'{}': {}", name, err)
+
+
+async def monitor(lags, stop):
+    """Record how late each tick of the event loop is."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run(push, pushes, concurrency, config):
+    """Run the simulated pushes while monitoring the event loop.
+
+    Returns:
+        {tuple} -- Wall time, event loop lags
+    """
+    lags, stop = [], asyncio.Event()
+    monitor_task = asyncio.ensure_future(monitor(lags, stop))
+    await asyncio.sleep(TICK * 2)
+
+    async def worker(worker_id):
+        for i in range(worker_id, pushes, concurrency):
+            await push(f"router{i}", config)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor_task
+    return elapsed, lags
+
+
+def report(label, elapsed, lags):
+    """Print a summary of event loop lag."""
+    lags = sorted(lags) or [0]
+    blocked = sum(lag for lag in lags if lag > TICK)
+    print(
+        f"{label:<8} wall {elapsed * 1000:8.1f}ms   "
+        f"blocked {blocked * 1000:8.1f}ms   "
+        f"p99 lag {lags[int(len(lags) * 0.99)] * 1000:7.2f}ms   "
+        f"max lag {lags[-1] * 1000:7.2f}ms"
+    )
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pushes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--interfaces", type=int, default=500)
+    args = parser.parse_args()
+
+    config = make_config(args.interfaces)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = (
+            ("before", push_before, {"level": "DEBUG", "enqueue": False}),
+            ("after", push_after, {}),
+        )
+        for label, push, options in modes:
+            configure_logging(sink=str(Path(tmp) / f"{label}.log"), **options)
+            loop = asyncio.new_event_loop()
+            try:
+                elapsed, lags = loop.run_until_complete(
+                    run(push, args.pushes, args.concurrency, config)
+                )
+            finally:
+                loop.close()
+            report(label, elapsed, lags)
+            log.remove()
+
+
+if __name__ == "__main__":
+    main()
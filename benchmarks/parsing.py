@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Measure parsing time & peak memory for recorded JunOS responses.
+
+Each case parses a response from `benchmarks/fixtures` with the same
+function junos_rest uses for it:
+
+    commit_success      lock, load, commit & unlock, as a multipart reply
+    commit_multi_re     commit on a device with two routing engines
+    commit_check_errors commit check failing with a long list of errors
+    load_error          load failing with line & column details
+    batch_mixed         several RPCs' JSON & XML output, demultiplexed
+    route_table_xml     large XML route table, built from a recorded route
+    route_table_json    large JSON route table, streamed record by record
+
+Everything runs inline, without offloading. Save results as a baseline,
+then compare later runs against it to catch regressions:
+
+    python benchmarks/parsing.py --save baseline.json
+    python benchmarks/parsing.py --compare baseline.json --threshold 20
+"""
+
+# Standard Library Imports
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Project Imports
+from junos_rest.offload import offload  # noqa: E402
+from junos_rest.parser import parse_batch  # noqa: E402
+from junos_rest.parser import parse_results  # noqa: E402
+from junos_rest.parser import parse_xml  # noqa: E402
+from junos_rest.stream import JSONPathStreamer  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CHUNK_SIZE = 64 * 1024
+
+
+class FixtureResponse:
+    """Stand-in for an httpx response, with a recorded body."""
+
+    def __init__(self, content, content_type, status_code=200):
+        """Set the response body & headers."""
+        self.content = content
+        self.headers = {"content-type": content_type}
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        """Get the body as text."""
+        return self.content.decode()
+
+
+def load_response(name):
+    """Load a fixture as a response, with a Content-Type from its extension."""
+    path = FIXTURES / name
+    content = path.read_bytes()
+    if path.suffix == ".multipart":
+        boundary = content.split(b"\r\n", 1)[0][2:].decode()
+        content_type = f"multipart/mixed; boundary={boundary}"
+    elif path.suffix == ".json":
+        content_type = "application/json; charset=utf-8"
+    else:
+        content_type = "application/xml; charset=utf-8"
+    return FixtureResponse(content, content_type)
+
+
+def route_table_xml(routes):
+    """Build a `get-route-information` XML reply from the recorded route."""
+    route = (FIXTURES / "route_rt.xml").read_bytes()
+    return (
+        b'<route-information xmlns="http://xml.juniper.net/junos/19.4R0/'
+        b'junos-routing" xmlns:junos="http://xml.juniper.net/junos/19.4R0/junos">'
+        b"<route-table><table-name>inet.0</table-name>"
+        + route * routes
+        + b"</route-table></route-information>"
+    )
+
+
+def route_table_json(routes):
+    """Build a `get-route-information` JSON reply from the recorded route."""
+    route = (FIXTURES / "route_rt.json").read_bytes().strip()
+    return (
+        b'{"route-information": [{"route-table": [{"table-name": '
+        b'[{"data": "inet.0"}], "rt": [' + b", ".join([route] * routes) + b"]}]}]}"
+    )
+
+
+async def stream_routes(content):
+    """Stream each route from a JSON reply, as `stream_rpc` does."""
+    streamer = JSONPathStreamer("route-information/route-table/rt")
+    count = 0
+    for start in range(0, len(content), CHUNK_SIZE):
+        count += len(streamer.feed(content[start : start + CHUNK_SIZE].decode()))
+    return count + len(streamer.close())
+
+
+def cases(routes):
+    """Build each benchmark case.
+
+    Returns:
+        {list} -- Name, coroutine function, argument & expected result
+    """
+
+    def status(expected):
+        return lambda result: result["status"] == expected
+
+    return [
+        (
+            "commit_success",
+            parse_results,
+            load_response("commit_success.multipart"),
+            status("success"),
+        ),
+        (
+            "commit_multi_re",
+            parse_results,
+            load_response("commit_multi_re.xml"),
+            status("success"),
+        ),
+        (
+            "commit_check_errors",
+            parse_results,
+            load_response("commit_check_errors.xml"),
+            status("fail"),
+        ),
+        ("load_error", parse_results, load_response("load_error.xml"), status("fail")),
+        (
+            "batch_mixed",
+            lambda response: parse_batch(response, 3),
+            load_response("batch_mixed.multipart"),
+            lambda result: [r["status"] for r in result]
+            == ["success", "success", "fail"],
+        ),
+        (
+            "route_table_xml",
+            parse_xml,
+            route_table_xml(routes),
+            lambda result: len(
+                result["results"]["route-information"]["route-table"]["rt"]
+            )
+            == routes,
+        ),
+        (
+            "route_table_json",
+            stream_routes,
+            route_table_json(routes),
+            lambda result: result == routes,
+        ),
+    ]
+
+
+def measure(loop, func, arg, check, rounds):
+    """Time a case, then measure its peak memory separately.
+
+    Returns:
+        {dict} -- Median & fastest time in ms, peak memory in KiB
+    """
+    result = loop.run_until_complete(func(arg))
+    if not check(result):
+        raise AssertionError(f"Unexpected result: {result!r:.200}")
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        loop.run_until_complete(func(arg))
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    loop.run_until_complete(func(arg))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "min_ms": round(min(times) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--large-rounds", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="Save results to a file")
+    parser.add_argument("--compare", type=Path, help="Compare to saved results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=25,
+        help="Fail if any case is this many percent slower than the saved results",
+    )
+    args = parser.parse_args()
+
+    offload.configure(thread_threshold=None, process_threshold=None)
+    baseline = json.loads(args.compare.read_text()) if args.compare else {}
+
+    results = {}
+    regressions = []
+    loop = asyncio.new_event_loop()
+    try:
+        for name, func, arg, check in cases(args.routes):
+            rounds = args.large_rounds if name.startswith("route") else args.rounds
+            result = measure(loop, func, arg, check, rounds)
+            results[name] = result
+
+            line = (
+                f"{name:<20} median {result['median_ms']:10.3f}ms   "
+                f"min {result['min_ms']:10.3f}ms   "
+                f"peak {result['peak_kib']:10.1f}KiB"
+            )
+            if name in baseline:
+                # The fastest run is the least affected by noise.
+                before = baseline[name]["min_ms"]
+                change = (result["min_ms"] - before) / before * 100
+                line += f"   {change:+6.1f}%"
+                if change > args.threshold:
+                    regressions.append(name)
+            print(line)
+    finally:
+        loop.close()
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+    if regressions:
+        print(f"Slower than {args.compare}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark cold vs. warm (snapshot) inventory loading.
+
+Generates a config file with many devices, then times loading it in a
+fresh interpreter, first without a snapshot (cold), then with one (warm).
+
+    python benchmarks/startup.py --devices 20000 --runs 5
+"""
+
+# Standard Library Imports
+import argparse
+import os
+import shutil
+import statistics
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+LOAD = "from junos_rest.config import get_params; get_params()"
+
+
+def write_config(path, count):
+    """Write a config file with `count` devices."""
+    with path.open("w") as f:
+        f.write("devices:\n")
+        for i in range(count):
+            f.write(
+                f"  - name: router{i}\n"
+                f"    host: 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}\n"
+                f"    port: 8080\n"
+                f"    username: admin\n"
+                f"    password: secret\n"
+                f"    site: site{i % 100}\n"
+                f"    role: {'edge' if i % 4 else 'core'}\n"
+                f"    tags: [fleet, group{i % 10}]\n"
+            )
+
+
+def timed_load(env):
+    """Load the config in a fresh interpreter, returning elapsed seconds."""
+    start = time.perf_counter()
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", LOAD], env=env, cwd=ROOT, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        config_file = Path(temp) / "junos_rest.yaml"
+        snapshot_dir = Path(temp) / "snapshots"
+        write_config(config_file, args.devices)
+
+        env = {
+            **os.environ,
+            "JUNOS_REST_CONFIG": str(config_file),
+            "JUNOS_REST_SNAPSHOT_DIR": str(snapshot_dir),
+        }
+
+        cold, warm = [], []
+        for _ in range(args.runs):
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            cold.append(timed_load(env))
+            warm.append(timed_load(env))
+
+    print(f"{args.devices} devices, {args.runs} runs (median seconds)")  # noqa: T001
+    print(f"  cold (YAML + validation): {statistics.median(cold):.3f}")  # noqa: T001
+    print(f"  warm (snapshot):          {statistics.median(warm):.3f}")  # noqa: T001
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,12 @@
 #!/usr/bin/env python3
 
-import asyncio
-import random
-
 import click
-import stackprinter
-import ujson
-import uvloop
 from click import ClickException
-from pygments import highlight
-from pygments.formatters import Terminal256Formatter
-from pygments.lexers.data import JsonLexer
-from pygments.styles.monokai import MonokaiStyle
-from rapidtables import FORMAT_GENERATOR
-from rapidtables import format_table
 
-stackprinter.set_excepthook(style="darkbg2")
-asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+from junos_rest import install_excepthook
+from junos_rest.constants import FLEET_CONCURRENCY
+
+install_excepthook()
 
 
 class _Char:
@@ -70,14 +60,19 @@ TITLE = {"fg": "white", "bold": True, "underline": True}
 
 def async_command(func):
     """Decororator for to make async functions runable from syncronous code."""
-    import asyncio
     from functools import update_wrapper
 
-    func = asyncio.coroutine(func)
-
     def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(func(*args, **kwargs))
+        import asyncio
+
+        from junos_rest import install_uvloop
+
+        install_uvloop()
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(func(*args, **kwargs))
+        finally:
+            loop.close()
 
     return update_wrapper(wrapper, func)
 
@@ -91,12 +86,20 @@ def highlighted_json(raw):
     Returns:
         {str} -- Formatted JSON
     """
+    import ujson
+    from pygments import highlight
+    from pygments.formatters import Terminal256Formatter
+    from pygments.lexers.data import JsonLexer
+    from pygments.styles.monokai import MonokaiStyle
+
     raw_json = ujson.dumps(raw, indent=2)
     return highlight(raw_json, JsonLexer(), Terminal256Formatter(style=MonokaiStyle))
 
 
 def random_colors(rows):
     """From tuple of commands, generate random but unique colors."""
+    import random
+
     colors = ["blue", "green", "red", "yellow", "magenta", "cyan", "white"]
     rows_list = list(rows)
 
@@ -115,34 +118,145 @@ def random_colors(rows):
     return colored_rows
 
 
-@click.group()
-def cli():
-    pass
+def load_json(config):
+    """Parse a config given as JSON on the command line.
 
+    Arguments:
+        config {str} -- Configuration in JSON
 
-@cli.command("configure", help="Send a new config")
-@click.option("-d", "--device", type=str, help="Device Name")
-@click.option("-c", "--config", type=str, help="Configuration in JSON")
-@async_command
-async def send_config(device, config):
-    from junos_rest.actions import set_config
+    Raises:
+        ClickException: Raised if the config isn't valid JSON
+
+    Returns:
+        {any} -- Parsed config
+    """
+    import ujson
 
     try:
-        loaded_config = ujson.loads(config)
+        return ujson.loads(config)
     except ValueError:
         raise ClickException(E.ERROR + click.style(f"'{config}' is not valid JSON"))
 
-    results = await set_config(device=device, config=loaded_config)
 
-    click.echo(NL[1] + E.CHECK + NL[2] + highlighted_json(results))
+def target_devices(devices, select):
+    """Combine device names & the devices matching a selector.
+
+    Arguments:
+        devices {tuple} -- Device Names
+        select {str} -- Device Selector, or None
+
+    Raises:
+        ClickException: Raised if the selector is invalid
+
+    Returns:
+        {list} -- Unique Device Names, in order
+    """
+    from junos_rest.exceptions import JunosRestError
+    from junos_rest.util import device_names
+
+    if select is None:
+        return list(devices)
+    try:
+        selected = device_names(select)
+    except JunosRestError as err:
+        raise ClickException(E.ERROR + click.style(str(err)))
+    return list(dict.fromkeys((*devices, *selected)))
+
+
+def echo_result(device, results):
+    """Print a device's Response Details.
+
+    Arguments:
+        device {str} -- Device Name
+        results {dict} -- Response Details
+    """
+    icon = E.CHECK if results["status"] == "success" else E.ERROR
+    click.echo(
+        NL[1] + icon + click.style(device, **LABEL) + NL[2] + highlighted_json(results)
+    )
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command("configure", help="Send a new config")
+@click.option(
+    "-d", "--device", "devices", type=str, multiple=True, help="Device Name(s)"
+)
+@click.option("-s", "--select", type=str, help="Device Selector")
+@click.option("-c", "--config", type=str, help="Configuration in JSON")
+@click.option(
+    "-a",
+    "--action",
+    type=click.Choice(["merge", "replace", "set"]),
+    default="merge",
+    show_default=True,
+    help="How changes are applied",
+)
+@click.option(
+    "-n",
+    "--concurrency",
+    type=int,
+    default=FLEET_CONCURRENCY,
+    show_default=True,
+    help="Maximum devices configured at once",
+)
+@click.option(
+    "-t",
+    "--transaction",
+    is_flag=True,
+    help="Commit only if every device passes 'commit check'",
+)
+@async_command
+async def send_config(devices, select, config, action, concurrency, transaction):
+    from junos_rest.actions import commit_many
+    from junos_rest.actions import set_config_many
+    from junos_rest.pool import pool
+
+    loaded_config = load_json(config)
+    devices = target_devices(devices, select)
+
+    if transaction:
+        async with pool:
+            outcome = await commit_many(
+                devices=devices,
+                config=loaded_config,
+                action=action,
+                check_concurrency=concurrency,
+                commit_concurrency=concurrency,
+            )
+        device_results = outcome["checked"]
+        if outcome["status"] != "fail":
+            device_results = {**device_results, **outcome["committed"]}
+        for device, results in device_results.items():
+            echo_result(device, results)
+        return
+
+    async with pool:
+        async for results in set_config_many(
+            devices=devices,
+            config=loaded_config,
+            action=action,
+            concurrency=concurrency,
+        ):
+            echo_result(results.pop("device"), results)
 
 
 @cli.command("list", help="List configured devices")
-def list_devices():
-    from junos_rest.config import params
+@click.option("-s", "--select", type=str, default="*", help="Device Selector")
+def list_devices(select):
+    from rapidtables import FORMAT_GENERATOR
+    from rapidtables import format_table
+
+    from junos_rest.inventory import get_inventory
 
-    devices = [d.dict(exclude={"password"}) for d in params.devices]
     try:
+        devices = [
+            {**d.dict(exclude={"password"}), "tags": ",".join(d.tags)}
+            for d in get_inventory().select(select)
+        ]
         header, rows = format_table(devices, fmt=FORMAT_GENERATOR, separator=WS[4])
 
         click.echo(
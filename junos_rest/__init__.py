@@ -1,11 +1,28 @@
 """Get/Configure JunOS devices as if they had an actual REST API."""
 
-# Third Party Imports
-import stackprinter
-import uvloop
-
 __name__ = "junos_rest"
 
-stackprinter.set_excepthook(style="darkbg2")
 
-uvloop.install()
+def install_excepthook(style="darkbg2"):
+    """Print uncaught exceptions with stackprinter.
+
+    stackprinter is only imported if an uncaught exception occurs.
+
+    Keyword Arguments:
+        style {str} -- stackprinter color style (default: {"darkbg2"})
+    """
+    import sys
+
+    def _excepthook(*exc_info):
+        import stackprinter
+
+        stackprinter.show(exc_info, style=style)
+
+    sys.excepthook = _excepthook
+
+
+def install_uvloop():
+    """Use uvloop as the asyncio event loop implementation."""
+    import uvloop
+
+    uvloop.install()
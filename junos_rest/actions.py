@@ -1,25 +1,39 @@
 """Supported Interactions with JunOS Devices."""
 
 # Standard Library Imports
+import asyncio
+
+# Third Party Imports
 import ujson
 
 # Project Imports
-from junos_rest.connection import Connection
-from junos_rest.constants import CONFIG_JSON
+from junos_rest.constants import FLEET_CONCURRENCY
+from junos_rest.constants import OPERATION_DEADLINE
+from junos_rest.diff import validate_action
+from junos_rest.pool import pool
+from junos_rest.rpc import as_rpc
+from junos_rest.scheduler import scheduler
+from junos_rest.transaction import check_config
+from junos_rest.transaction import run_phase
 from junos_rest.util import build_config
+from junos_rest.util import device_names
+from junos_rest.util import device_result
 from junos_rest.util import find_device
 from junos_rest.exceptions import JunosRestError
 
 
-async def set_config(device, config=None, json_config=None):
-    """Send a new configuration to a device.
+async def _config_data(config=None, json_config=None):
+    """Validate & build the configuration to send from either input format.
 
-    Arguments:
-        device {str} -- Device Name
-        config {dict} -- Configuration
+    Keyword Arguments:
+        config {dict} -- Configuration (default: {None})
+        json_config {str} -- Configuration as JSON (default: {None})
+
+    Raises:
+        JunosRestError: Raised if no configuration is specified.
 
     Returns:
-        {dict} -- Response Details
+        {dict} -- Wrapped configuration
     """
     if config is None and json_config is not None:
         config_data = await build_config(config=ujson.loads(json_config))
@@ -29,15 +43,320 @@ async def set_config(device, config=None, json_config=None):
         config_data = await build_config(config=config)
     else:
         raise JunosRestError("A configuration must be specified.")
+    return config_data
+
+
+async def set_config(
+    device,
+    config=None,
+    json_config=None,
+    action="merge",
+    deadline=OPERATION_DEADLINE,
+):
+    """Send a new configuration to a device.
+
+    Arguments:
+        device {str} -- Device Name
+        config {dict} -- Configuration
+
+    Keyword Arguments:
+        json_config {str} -- Configuration as JSON (default: {None})
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        deadline {float} -- Seconds the push may take, including retries, or
+            None for no deadline (default: {OPERATION_DEADLINE})
+
+    Returns:
+        {dict} -- Response Details
+    """
+    config_data = await _config_data(config=config, json_config=json_config)
+    validate_action(action)
+    return await scheduler.submit(
+        device_name=device, config_data=config_data, action=action, deadline=deadline
+    )
+
+
+async def set_config_many(
+    devices,
+    config=None,
+    json_config=None,
+    action="merge",
+    concurrency=FLEET_CONCURRENCY,
+    deadline=OPERATION_DEADLINE,
+):
+    """Send a new configuration to many devices concurrently.
+
+    Results are yielded as soon as each device finishes, in order of
+    completion rather than the order of `devices`. A failure on one
+    device is reported in its result & does not stop the others.
+
+    Arguments:
+        devices {list|str} -- Device Names, or a device selector
+        config {dict} -- Configuration
+
+    Keyword Arguments:
+        json_config {str} -- Configuration as JSON (default: {None})
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        concurrency {int} -- Maximum devices in progress at once
+        deadline {float} -- Seconds each device's push may take, including
+            retries, or None for no deadline (default: {OPERATION_DEADLINE})
+
+    Yields:
+        {dict} -- Response Details, with the device name under `device`
+    """
+    config_data = await _config_data(config=config, json_config=json_config)
+    validate_action(action)
+
+    async def _config_for(device_name):
+        return config_data
+
+    pushes = _push_many(devices, _config_for, action, concurrency, deadline)
+    async for result in pushes:
+        yield result
+
+
+async def set_config_template(
+    devices,
+    template,
+    variables=None,
+    defaults=None,
+    action="merge",
+    concurrency=FLEET_CONCURRENCY,
+    deadline=OPERATION_DEADLINE,
+):
+    """Render a config template for each of many devices, & send it.
+
+    Each device's config is rendered just before it's sent, so only the
+    configs of devices in progress are held in memory at once. A device
+    whose config can't be rendered, e.g. because a variable isn't set, is
+    reported in its result & does not stop the others.
+
+    Arguments:
+        devices {list|str} -- Device Names, or a device selector
+        template {object} -- ConfigTemplate, see `junos_rest.template`
+
+    Keyword Arguments:
+        variables {dict} -- Each device's variables, keyed by device name
+            (default: {None})
+        defaults {dict} -- Variables for devices which don't set them
+            (default: {None})
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        concurrency {int} -- Maximum devices in progress at once
+        deadline {float} -- Seconds each device's push may take, including
+            retries, or None for no deadline (default: {OPERATION_DEADLINE})
+
+    Yields:
+        {dict} -- Response Details, with the device name under `device`
+    """
+    validate_action(action)
+    variables = variables or {}
+
+    async def _config_for(device_name):
+        device = await find_device(device_name=device_name)
+        rendered = template.render(device, variables.get(device_name), defaults)
+        return await build_config(config=rendered)
+
+    pushes = _push_many(devices, _config_for, action, concurrency, deadline)
+    async for result in pushes:
+        yield result
+
+
+async def _push_many(devices, config_for, action, concurrency, deadline):
+    """Send configs to many devices concurrently.
+
+    Arguments:
+        devices {list|str} -- Device Names, or a device selector
+        config_for {coroutine} -- Gets a device's wrapped configuration,
+            called with the device name once the device is in progress
+        action {str} -- One of 'merge', 'replace', or 'set'
+        concurrency {int} -- Maximum devices in progress at once
+        deadline {float} -- Seconds each device's push may take, or None
+
+    Yields:
+        {dict} -- Response Details, with the device name under `device`
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _submit(device_name):
+        return await scheduler.submit(
+            device_name=device_name,
+            config_data=await config_for(device_name),
+            action=action,
+            deadline=deadline,
+        )
+
+    async def _push(device_name):
+        async with semaphore:
+            result = await device_result(device_name, _submit(device_name))
+        return {"device": device_name, **result}
+
+    tasks = [
+        asyncio.ensure_future(_push(device_name))
+        for device_name in device_names(devices)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
-    device = await find_device(device_name=device)
-    session = await Connection.new(device=device)
+async def commit_many(
+    devices,
+    config=None,
+    json_config=None,
+    action="merge",
+    check_concurrency=FLEET_CONCURRENCY,
+    commit_concurrency=FLEET_CONCURRENCY,
+    deadline=OPERATION_DEADLINE,
+):
+    """Send a new configuration to many devices, only if all of them accept it.
 
-    current_config = await session.get(item="get-configuration")
-    if "@" in current_config["configuration"]:
-        current_config["configuration"].pop("@")
+    First, the configuration is loaded & verified with `commit check` on
+    every device concurrently, then discarded. Only if every check passes
+    is the configuration committed on every device that it would change.
 
-    json_config = ujson.dumps(config_data, escape_forward_slashes=False)
+    Arguments:
+        devices {list|str} -- Device Names, or a device selector
+        config {dict} -- Configuration
+
+    Keyword Arguments:
+        json_config {str} -- Configuration as JSON (default: {None})
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        check_concurrency {int} -- Maximum devices checked at once
+        commit_concurrency {int} -- Maximum devices committed at once
+        deadline {float} -- Seconds each device's check, & then its commit,
+            may take, including retries, or None for no deadline
+            (default: {OPERATION_DEADLINE})
+
+    Returns:
+        {dict} -- Overall `status`, with Response Details for each device's
+            check under `checked` & for each device's commit under
+            `committed`. If any check fails, nothing is committed.
+    """
+    config_data = await _config_data(config=config, json_config=json_config)
+    validate_action(action)
+    devices = device_names(devices)
+
+    checked = await run_phase(
+        devices,
+        check_config,
+        check_concurrency,
+        config_data=config_data,
+        action=action,
+        deadline=deadline,
+    )
+    if any(result["status"] != "success" for result in checked.values()):
+        return {"status": "fail", "checked": checked, "committed": {}}
+
+    changed = [name for name, result in checked.items() if result.get("changed", True)]
+    committed = await run_phase(
+        changed,
+        scheduler.submit,
+        commit_concurrency,
+        config_data=config_data,
+        action=action,
+        deadline=deadline,
+    )
+    if all(result["status"] == "success" for result in committed.values()):
+        status = "success"
+    else:
+        status = "error"
+    return {"status": status, "checked": checked, "committed": committed}
+
+
+async def get_config(device, paths=None):
+    """Get a device's running config, or only some hierarchies of it.
+
+    Arguments:
+        device {str} -- Device Name
+
+    Keyword Arguments:
+        paths {list} -- Hierarchies to get, each as keys separated by '/',
+            e.g. ['system/time-zone', 'interfaces'], or None for the whole
+            config (default: {None})
+
+    Raises:
+        JunosRestError: Raised if the config can't be retrieved.
+
+    Returns:
+        {dict} -- Config, wrapped under `configuration`
+    """
+    device_obj = await find_device(device_name=device)
+
+    async with pool.session(device_obj) as session:
+        return await session.get_config(paths)
+
+
+async def stream_rpc(device, rpc, path, params=None):
+    """Run an RPC on a device, yielding records from its output as received.
+
+    Arguments:
+        device {str} -- Device Name
+        rpc {str} -- RPC name, e.g. 'get-route-information'
+        path {str|tuple} -- Keys to the records, e.g.
+            'route-information/route-table/rt'
+
+    Keyword Arguments:
+        params {dict} -- RPC arguments, as URL parameters (default: {None})
+
+    Yields:
+        {any} -- Each record at `path`
+    """
+    device_obj = await find_device(device_name=device)
+
+    async with pool.session(device_obj) as session:
+        async for record in session.stream(item=rpc, path=path, params=params):
+            yield record
+
+
+async def run_rpc(device, rpc, params=None):
+    """Run a single RPC on a device.
+
+    If the response cache is enabled, see `junos_rest.cache`, the RPC's
+    output may be served from the cache.
+
+    Arguments:
+        device {str} -- Device Name
+        rpc {str} -- RPC name, e.g. 'get-interface-information'
+
+    Keyword Arguments:
+        params {dict} -- RPC arguments, as URL parameters (default: {None})
+
+    Raises:
+        JunosRestError: Raised if the RPC fails.
+
+    Returns:
+        {dict} -- RPC output
+    """
+    device_obj = await find_device(device_name=device)
+
+    async with pool.session(device_obj) as session:
+        return await session.get(item=rpc, params=params)
+
+
+async def run_rpcs(device, rpcs, stop_on_error=False, idempotent=False):
+    """Run several RPCs on a device in a single request.
+
+    Arguments:
+        device {str} -- Device Name
+        rpcs {list} -- RPCs, as XML from `build_rpc`, or bare RPC names,
+            e.g. ['get-software-information', build_rpc('get-route-summary')]
+
+    Keyword Arguments:
+        stop_on_error {bool} -- Don't run any further RPCs after one fails
+            (default: {False})
+        idempotent {bool} -- The RPCs don't change anything, so the request
+            may be retried if it fails (default: {False})
+
+    Returns:
+        {list} -- Result dict for each RPC, in order
+    """
+    device_obj = await find_device(device_name=device)
 
-    result = await session.post(data=CONFIG_JSON.format(config=json_config).strip())
-    return result
+    async with pool.session(device_obj) as session:
+        return await session.batch(
+            [as_rpc(rpc) for rpc in rpcs],
+            stop_on_error=stop_on_error,
+            idempotent=idempotent,
+        )
@@ -0,0 +1,274 @@
+"""Build request bodies for loading configs, streaming large ones.
+
+A config is normally serialized, formatted into its RPCs & encoded before
+it's sent, which holds several full copies of a large config in memory at
+once. Bodies larger than `stream_threshold` bytes are instead encoded a
+chunk at a time as they're sent: the RPCs before the config, the config
+itself in pieces of about `chunk_size` bytes, then the RPCs after it.
+Peak memory per push stays near the chunk size, & the event loop runs
+between chunks.
+
+Streamed bodies are sent with chunked transfer encoding, & can only be
+sent once, so requests with them are never retried. Bodies can also be
+compressed with gzip, if the devices accept gzip-encoded requests:
+
+    bodies.configure(stream_threshold=256 * 1024, gzip=True)
+"""
+
+# Standard Library Imports
+import gzip
+import zlib
+from xml.sax.saxutils import escape
+
+# Third Party Imports
+import ujson
+
+# Project Imports
+from junos_rest.constants import BODY_CHUNK_SIZE
+from junos_rest.constants import BODY_GZIP
+from junos_rest.constants import BODY_STREAM_THRESHOLD
+from junos_rest.offload import estimate_size
+from junos_rest.offload import offload
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def _dumps(value):
+    """Serialize a value to JSON, as it's loaded on the device."""
+    return ujson.dumps(value, escape_forward_slashes=False)
+
+
+def _iter_container(value, limit):
+    """Serialize a dict or list in pieces of about `limit` characters.
+
+    Small members are serialized together, & large members piece by piece,
+    so no piece holds much more than `limit` characters of the container.
+    """
+    is_dict = isinstance(value, dict)
+    yield "{" if is_dict else "["
+    separator = ""
+    batch = []
+    size = 0
+
+    for member in value.items() if is_dict else value:
+        child = member[1] if is_dict else member
+        child_size = estimate_size(child, limit)
+        if child_size < limit or not isinstance(child, _CONTAINERS):
+            batch.append(member)
+            size += child_size
+            if size < limit:
+                continue
+        if batch:
+            text = _dumps(dict(batch) if is_dict else batch)
+            yield separator + text[1:-1]
+            separator = ","
+            batch = []
+            size = 0
+        if child_size >= limit and isinstance(child, _CONTAINERS):
+            yield separator + (_dumps(str(member[0])) + ":" if is_dict else "")
+            separator = ","
+            yield from _iter_container(child, limit)
+
+    if batch:
+        text = _dumps(dict(batch) if is_dict else batch)
+        yield separator + text[1:-1]
+    yield "}" if is_dict else "]"
+
+
+def _iter_json(value, limit):
+    """Serialize a value to JSON, in pieces of about `limit` characters.
+
+    The pieces joined together are the same as the value serialized at
+    once. A None limit serializes the value in a single piece.
+    """
+    if (
+        limit is None
+        or not isinstance(value, _CONTAINERS)
+        or estimate_size(value, limit) < limit
+    ):
+        yield _dumps(value)
+    else:
+        yield from _iter_container(value, limit)
+
+
+def iter_config(template, delta, action, limit=None):
+    """Format a config into RPCs, in pieces.
+
+    Arguments:
+        template {str} -- RPC XML, with `{config}` where the config goes &
+            optionally `{action}`, e.g. `CONFIG_JSON`
+        delta {dict|list} -- Config to load (`set` statements for 'set')
+        action {str} -- One of 'merge', 'replace', or 'set'
+
+    Keyword Arguments:
+        limit {int} -- Characters of config per piece, or None for the
+            whole config in one piece (default: {None})
+
+    Yields:
+        {str} -- Pieces of RPC XML
+    """
+    prefix, suffix = template.strip().split("{config}")
+    yield prefix.format(action=action)
+    if action == "set":
+        separator = ""
+        for statement in delta:
+            yield separator + escape(statement)
+            separator = "\n"
+    else:
+        for piece in _iter_json(delta, limit):
+            yield escape(piece)
+    yield suffix
+
+
+def config_text(template, delta, action):
+    """Format a config into RPCs.
+
+    Arguments:
+        template {str} -- RPC XML, e.g. `CONFIG_JSON`
+        delta {dict|list} -- Config to load (`set` statements for 'set')
+        action {str} -- One of 'merge', 'replace', or 'set'
+
+    Returns:
+        {str} -- RPC XML
+    """
+    return "".join(iter_config(template, delta, action))
+
+
+def _config_bytes(template, delta, action, compress):
+    """Format & encode a config into RPCs, as a single request body."""
+    data = config_text(template, delta, action).encode()
+    if compress:
+        return gzip.compress(data)
+    return data
+
+
+class StreamedBody:
+    """Request body which encodes a config into RPCs as it's sent."""
+
+    __slots__ = ("pieces", "chunk_size", "compress", "sent")
+
+    def __init__(self, pieces, chunk_size, compress):
+        """Set the body's content.
+
+        Arguments:
+            pieces {iterable} -- Pieces of RPC XML
+            chunk_size {int} -- Bytes to encode before sending them
+            compress {bool} -- Compress the body with gzip
+        """
+        self.pieces = pieces
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.sent = 0
+
+    def _chunks(self):
+        """Join the pieces into chunks of at least `chunk_size` bytes."""
+        buffer = []
+        size = 0
+        for piece in self.pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield "".join(buffer).encode()
+                buffer = []
+                size = 0
+        if buffer:
+            yield "".join(buffer).encode()
+
+    async def __aiter__(self):
+        """Encode & yield each chunk, for httpx to send.
+
+        Yields:
+            {bytes} -- Request body chunk
+        """
+        compressor = zlib.compressobj(wbits=31) if self.compress else None
+        for chunk in self._chunks():
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+                if not chunk:
+                    continue
+            self.sent += len(chunk)
+            yield chunk
+        if compressor is not None:
+            chunk = compressor.flush()
+            self.sent += len(chunk)
+            yield chunk
+
+
+class BodyBuilder:
+    """Build config request bodies, in memory or streamed by size."""
+
+    def __init__(
+        self,
+        stream_threshold=BODY_STREAM_THRESHOLD,
+        chunk_size=BODY_CHUNK_SIZE,
+        gzip=BODY_GZIP,
+    ):
+        """Initialize the builder.
+
+        Keyword Arguments:
+            stream_threshold {int} -- Bytes above which bodies are streamed,
+                or None to always build them in memory
+            chunk_size {int} -- Bytes in each chunk of a streamed body
+            gzip {bool} -- Compress bodies with gzip
+        """
+        self.configure(
+            stream_threshold=stream_threshold, chunk_size=chunk_size, gzip=gzip
+        )
+
+    def configure(
+        self,
+        stream_threshold=BODY_STREAM_THRESHOLD,
+        chunk_size=BODY_CHUNK_SIZE,
+        gzip=BODY_GZIP,
+    ):
+        """Set the streaming threshold, chunk size & compression.
+
+        Keyword Arguments:
+            stream_threshold {int} -- Bytes above which bodies are streamed,
+                or None to always build them in memory
+            chunk_size {int} -- Bytes in each chunk of a streamed body
+            gzip {bool} -- Compress bodies with gzip
+        """
+        self.stream_threshold = stream_threshold
+        self.chunk_size = chunk_size
+        self.gzip = gzip
+
+    @property
+    def headers(self):
+        """Get the headers for a body.
+
+        Returns:
+            {dict} -- HTTP headers
+        """
+        return {"Content-Encoding": "gzip"} if self.gzip else {}
+
+    async def build(self, template, delta, action):
+        """Build the request body to load a config.
+
+        Large bodies are streamed. Others are built in memory, off the
+        event loop if they're large enough, see `junos_rest.offload`.
+
+        Arguments:
+            template {str} -- RPC XML, e.g. `CONFIG_JSON`
+            delta {dict|list} -- Config to load (`set` statements for 'set')
+            action {str} -- One of 'merge', 'replace', or 'set'
+
+        Returns:
+            {tuple} -- Request body, as bytes or a `StreamedBody`, & headers
+        """
+        thresholds = [
+            t for t in (self.stream_threshold, offload.threshold) if t is not None
+        ]
+        size = estimate_size(delta, limit=max(thresholds, default=0))
+
+        if self.stream_threshold is not None and size >= self.stream_threshold:
+            pieces = iter_config(template, delta, action, limit=self.chunk_size)
+            return StreamedBody(pieces, self.chunk_size, self.gzip), self.headers
+
+        data = await offload.run(
+            size, _config_bytes, template, delta, action, self.gzip
+        )
+        return data, self.headers
+
+
+bodies = BodyBuilder()
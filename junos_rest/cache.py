@@ -0,0 +1,195 @@
+"""Opt-in cache for operational RPC output.
+
+Output from `Connection.get` is cached per device, RPC & parameters for
+the RPC's TTL, so dashboards & automation polling the same RPCs don't
+each cost a round trip to the device. Concurrent identical requests share
+a single request, even before anything is cached. When the cache holds
+more than `max_bytes` of output, the least recently used entries are
+evicted first. A device's entries are dropped whenever a configuration is
+committed to it.
+
+The cache is disabled until it's configured:
+
+    cache.configure(ttl=10, ttls={"get-alarm-information": 2})
+
+Cached output is shared between callers, so it must not be modified.
+`get-configuration` & `get-commit-information` are never cached, since
+the running config cache relies on them being current.
+"""
+
+# Standard Library Imports
+import asyncio
+import time
+from collections import OrderedDict
+
+# Project Imports
+from junos_rest.constants import CACHE_MAX_BYTES
+from junos_rest.constants import CACHE_TTL
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+
+UNCACHEABLE = frozenset(("get-configuration", "get-commit-information"))
+
+
+def _key(device_name, rpc, params):
+    """Build a cache key from a request's device, RPC & parameters."""
+    if not params:
+        return device_name, rpc, ()
+    return device_name, rpc, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+class ResponseCache:
+    """LRU cache of RPC output, with per-RPC TTLs & single-flight requests."""
+
+    def __init__(self):
+        """Initialize a disabled cache."""
+        self.enabled = False
+        self.ttl = CACHE_TTL
+        self.ttls = {}
+        self.max_bytes = CACHE_MAX_BYTES
+        self.size = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def configure(self, ttl=CACHE_TTL, ttls=None, max_bytes=CACHE_MAX_BYTES):
+        """Enable the cache.
+
+        Keyword Arguments:
+            ttl {float} -- Seconds to cache output of RPCs without their own
+                TTL, or None to only cache RPCs in `ttls` (default: {None})
+            ttls {dict} -- Seconds to cache each RPC's output, keyed by RPC
+                name. 0 disables caching for an RPC (default: {None})
+            max_bytes {int} -- Maximum response bytes cached
+                (default: {CACHE_MAX_BYTES})
+        """
+        self.clear()
+        self.enabled = True
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+
+    def disable(self):
+        """Disable the cache & drop everything in it."""
+        self.clear()
+        self.enabled = False
+
+    def ttl_for(self, rpc):
+        """Get the TTL for an RPC.
+
+        Arguments:
+            rpc {str} -- RPC name
+
+        Returns:
+            {float|None} -- Seconds, or None if the RPC isn't cached
+        """
+        if not self.enabled or not rpc or rpc in UNCACHEABLE:
+            return None
+        return self.ttls.get(rpc, self.ttl) or None
+
+    def clear(self):
+        """Drop everything in the cache."""
+        self._entries.clear()
+        self._inflight.clear()
+        self.size = 0
+
+    def invalidate(self, device_name):
+        """Drop a device's cached output.
+
+        Arguments:
+            device_name {str} -- Device Name
+        """
+        for key in [key for key in self._entries if key[0] == device_name]:
+            self._remove(key)
+        # Output already being fetched may be from before the change.
+        for key in [key for key in self._inflight if key[0] == device_name]:
+            del self._inflight[key]
+
+    def _remove(self, key):
+        """Remove an entry."""
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def _store(self, key, ttl, size, value):
+        """Add an entry, evicting the least recently used entries to fit it."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        while self._entries and self.size + size > self.max_bytes:
+            evicted = next(iter(self._entries))
+            self._remove(evicted)
+            metrics.count("cache_evictions_total", device=evicted[0])
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self.size += size
+
+    def _lookup(self, key):
+        """Get an unexpired entry's value, marking it as recently used.
+
+        Returns:
+            {tuple} -- Whether the entry was found, & its value
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires, _, value = entry
+        if expires <= time.monotonic():
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def get(self, device_name, rpc, params, fetch):
+        """Get an RPC's output from the cache, or fetch it.
+
+        Arguments:
+            device_name {str} -- Device Name
+            rpc {str} -- RPC name
+            params {dict} -- RPC arguments
+            fetch {callable} -- Coroutine function which fetches the output,
+                returning the output & its size in bytes
+
+        Returns:
+            {any} -- RPC output
+        """
+        ttl = self.ttl_for(rpc)
+        if ttl is None:
+            value, _ = await fetch()
+            return value
+
+        key = _key(device_name, rpc, params)
+        found, value = self._lookup(key)
+        if found:
+            metrics.count("cache_hits_total", device=device_name, rpc=rpc)
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            metrics.count("cache_shared_total", device=device_name, rpc=rpc)
+            _, task = inflight
+        else:
+            metrics.count("cache_misses_total", device=device_name, rpc=rpc)
+            token = object()
+            task = asyncio.ensure_future(self._fetch(key, ttl, fetch, token))
+            self._inflight[key] = (token, task)
+        # Shielded, so one caller being cancelled doesn't cancel the others.
+        return await asyncio.shield(task)
+
+    def _is_current(self, key, token):
+        """Determine if a fetch is still wanted, i.e. it's not invalidated."""
+        inflight = self._inflight.get(key)
+        return inflight is not None and inflight[0] is token
+
+    async def _fetch(self, key, ttl, fetch, token):
+        """Fetch & cache output, for every caller waiting on it."""
+        try:
+            value, size = await fetch()
+            if self._is_current(key, token):
+                self._store(key, ttl, size, value)
+                log.debug("Cached '{}' from '{}' for {}s", key[1], key[0], ttl)
+            return value
+        finally:
+            if self._is_current(key, token):
+                del self._inflight[key]
+
+
+cache = ResponseCache()
@@ -1,14 +1,22 @@
-"""Load YAML Config & Validate."""
+"""Load YAML Config & Validate.
+
+The config file is only read when it's first needed, & is re-read
+whenever its modification time changes. The modification time is
+checked at most once every `CONFIG_CHECK_INTERVAL` seconds. Validated
+configs are cached as compiled snapshots, see `junos_rest.snapshot`.
+"""
 
 # Standard Library Imports
+import os
+import time
 from pathlib import Path
 
-# Third Party Imports
-import yaml
-
 # Project Imports
-from junos_rest.models.config import Config
+from junos_rest import snapshot
+from junos_rest.constants import CONFIG_CHECK_INTERVAL
+from junos_rest.exceptions import JunosRestError
 
+CONFIG_ENV = "JUNOS_REST_CONFIG"
 WORKING_DIR = Path(__file__).parent
 POTENTIAL_CONFIG_LOCATIONS = [
     Path.home(),
@@ -17,20 +25,78 @@ POTENTIAL_CONFIG_LOCATIONS = [
     Path(__file__).parent,
 ]
 
-_matched_config_file = None
-for path in POTENTIAL_CONFIG_LOCATIONS:
-    file_path = path / "junos_rest.yaml"
-    if file_path.exists():
-        _matched_config_file = file_path
-        break
-
-if _matched_config_file is None:
-    raise Exception(
-        "No config file found. A file named 'junos_rest.yaml' must exist in one of the following paths: {p}".format(
-            p=", ".join([str(p) for p in POTENTIAL_CONFIG_LOCATIONS])
-        )
+_loaded = {}
+_checked = {}
+
+
+def find_config_file(path=None):
+    """Locate the config file.
+
+    An explicit path takes precedence, followed by the path in the
+    `JUNOS_REST_CONFIG` environment variable, followed by the first
+    `junos_rest.yaml` found in `POTENTIAL_CONFIG_LOCATIONS`.
+
+    Keyword Arguments:
+        path {str} -- Config file path (default: {None})
+
+    Raises:
+        JunosRestError: Raised if no config file is found.
+
+    Returns:
+        {Path} -- Config file path
+    """
+    if path is None:
+        path = os.environ.get(CONFIG_ENV)
+
+    if path is not None:
+        file_path = Path(path).expanduser()
+        if not file_path.exists():
+            raise JunosRestError("Config file {p} does not exist", p=str(file_path))
+        return file_path
+
+    for location in POTENTIAL_CONFIG_LOCATIONS:
+        file_path = location / "junos_rest.yaml"
+        if file_path.exists():
+            return file_path
+
+    raise JunosRestError(
+        "No config file found. A file named 'junos_rest.yaml' must exist in one "
+        "of the following paths: {p}",
+        p=", ".join([str(p) for p in POTENTIAL_CONFIG_LOCATIONS]),
     )
-with _matched_config_file.open("r") as raw:
-    unvalidated_config = yaml.safe_load(raw.read())
 
-params = Config(**unvalidated_config)
+
+def get_params(path=None):
+    """Get the validated config, loading or reloading it if needed.
+
+    Keyword Arguments:
+        path {str} -- Config file path (default: {None})
+
+    Returns:
+        {object} -- Validated config
+    """
+    key = (path, os.environ.get(CONFIG_ENV))
+    now = time.monotonic()
+    checked = _checked.get(key)
+    if checked is not None and now - checked[0] < CONFIG_CHECK_INTERVAL:
+        return checked[1]
+
+    file_path = find_config_file(path)
+    mtime = file_path.stat().st_mtime_ns
+
+    cached = _loaded.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        params = cached[1]
+    else:
+        params = snapshot.load(file_path)
+        _loaded[file_path] = (mtime, params)
+
+    _checked[key] = (now, params)
+    return params
+
+
+def __getattr__(name):
+    """Lazily load the config when `params` is accessed as a module attribute."""
+    if name == "params":
+        return get_params()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,40 +1,35 @@
 """HTTP Connection Handler."""
 # Standard Library Imports
 import asyncio
+import codecs
+import json
+from functools import partial
 from json import JSONDecodeError
 
 # Third Party Imports
 import httpx
 
 # Project Imports
+from junos_rest.body import StreamedBody
+from junos_rest.cache import cache
+from junos_rest.constants import COMMIT_TIMEOUT
+from junos_rest.constants import CONNECT_TIMEOUT
+from junos_rest.constants import READ_TIMEOUT
+from junos_rest.constants import RETRY_ATTEMPTS
 from junos_rest.exceptions import JunosRestError
+from junos_rest.health import health
+from junos_rest.limiter import limiter
 from junos_rest.log import log
+from junos_rest.metrics import metrics
+from junos_rest.offload import offload
+from junos_rest.parser import parse_batch
 from junos_rest.parser import parse_results
-
-
-async def _test_reachability(host, port):
-    """Verify the target host & port are actually reachable and open.
-
-    Arguments:
-        host {str} -- Device hostname or IP address
-        port {int} -- Device listening TCP port
-
-    Raises:
-        JunosRestError: Raised if device is unreachable
-
-    Returns:
-        {bool} -- True if device is reachable
-    """
-    from socket import gaierror
-
-    try:
-        _reader, _writer = await asyncio.open_connection(str(host), int(port))
-    except gaierror:
-        raise JunosRestError(f"{host}:{port} is unreachable/unresolvable.", status=502)
-    if _reader or _writer:
-        return True
-    else:
-        return False
+from junos_rest.retry import RETRY_STATUSES
+from junos_rest.retry import Deadline
+from junos_rest.retry import backoff
+from junos_rest.retry import is_transient
+from junos_rest.rpc import config_filter
+from junos_rest.stream import JSONPathStreamer
 
 
 class Connection:
@@ -44,23 +39,21 @@ class Connection:
     session = None
 
     @classmethod
-    async def new(cls, device):
+    async def new(cls, device, pool_limits=None):
         """Intantiate a connection to a JunOS device.
 
         Arguments:
             device {object} -- Device object
 
+        Keyword Arguments:
+            pool_limits {object} -- httpx.PoolLimits for the client (default: {None})
+
         Returns:
             {object} -- Initialized connection
         """
         instance = Connection()
         endpoint = device.url()
 
-        reachable = await _test_reachability(device.host, device.port)
-
-        if reachable:
-            log.debug(f"'{device.name}' is reachable")
-
         common_http = {
             "base_url": endpoint,
             "verify": False,
@@ -68,13 +61,16 @@ class Connection:
             "headers": {
                 "Content-Type": "application/xml",
                 "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
             },
         }
+        if pool_limits is not None:
+            common_http.update({"pool_limits": pool_limits})
 
         instance.device = device
-        instance.session = httpx.AsyncClient(**common_http)
+        instance.session = httpx.AsyncClient(timeout=instance.timeout(), **common_http)
 
-        log.debug(f"Opened session with {device.host}")
+        log.debug("Opened session with {}", device.host)
 
         return instance
 
@@ -91,14 +87,179 @@ class Connection:
                 "Unable to close session with {device}", device=self.device
             )
 
-        log.debug(f"Closed session with {self.device.host}")
+        log.debug("Closed session with {}", self.device.host)
+
+    @property
+    def is_closed(self):
+        """Determine if the underlying HTTP client has been closed.
+
+        Returns:
+            {bool} -- True if the session is closed
+        """
+        return self.session is None or self.session.dispatch.is_closed
+
+    def timeout(self, commit=False, deadline=None):
+        """Get the timeouts for a request to the device.
+
+        Each timeout is the device's own, if set, or the default. No
+        timeout extends past the deadline.
+
+        Keyword Arguments:
+            commit {bool} -- Allow for a commit while waiting for the
+                response (default: {False})
+            deadline {object} -- Operation deadline (default: {None})
+
+        Returns:
+            {object} -- httpx.Timeout
+        """
+        deadline = deadline or Deadline()
+        connect = deadline.limit(self.device.connect_timeout or CONNECT_TIMEOUT)
+        if commit:
+            read = self.device.commit_timeout or COMMIT_TIMEOUT
+        else:
+            read = self.device.read_timeout or READ_TIMEOUT
+        read = deadline.limit(read)
+        return httpx.Timeout(
+            connect_timeout=connect,
+            read_timeout=read,
+            write_timeout=read,
+            pool_timeout=connect,
+        )
+
+    @staticmethod
+    def _status_error(response):
+        """Build the error for an unsuccessful response.
+
+        Arguments:
+            response {object} -- Raw httpx response object
+
+        Returns:
+            {object} -- JunosRestError
+        """
+        status = httpx.status_codes.StatusCode(response.status_code)
+        return JunosRestError(
+            "{msg} - {url}",
+            status=status.value,
+            msg=status.name.replace("_", " "),
+            url=response.url,
+        )
+
+    async def _send(
+        self, method, endpoint, idempotent=False, commit=False, deadline=None, **kwargs
+    ):
+        """Send a request, retrying transient failures of idempotent requests.
+
+        The device's health is updated once, from the last attempt, so
+        failures which are retried successfully don't count against it.
+
+        Arguments:
+            method {str} -- HTTP method
+            endpoint {str} -- HTTP URI
+
+        Keyword Arguments:
+            idempotent {bool} -- Request is safe to retry (default: {False})
+            commit {bool} -- Request includes a commit (default: {False})
+            deadline {object} -- Operation deadline (default: {None})
+            kwargs {any} -- httpx request arguments
+
+        Raises:
+            JunosRestError: Raised if status code is not 200
+            JunosRestError: Raised on other HTTP/library errors
+            JunosRestError: Raised if the deadline passes
+
+        Returns:
+            {object} -- Raw httpx response object
+        """
+        deadline = deadline or Deadline()
+        attempts = RETRY_ATTEMPTS if idempotent else 1
+        name = self.device.name
+        kind = f"{method} commit" if commit else method
+
+        data = kwargs.get("data")
+        if isinstance(data, str):
+            data = data.encode()
+        sent = len(data) if isinstance(data, bytes) else 0
+        if isinstance(data, StreamedBody):
+            # A streamed body is consumed as it's sent, so it can't be resent.
+            attempts = 1
+
+        if deadline.expired:
+            raise JunosRestError(
+                "Deadline exceeded for {d}", status=504, d=self.device.name
+            )
+
+        # Retries are abandoned before they'd wait past the deadline.
+        for attempt in range(1, attempts + 1):
+            try:
+                async with limiter.slot(self.device, kind) as slot:
+                    response = await self.session.request(
+                        method,
+                        endpoint,
+                        timeout=self.timeout(commit=commit, deadline=deadline),
+                        **kwargs,
+                    )
+                    slot.record(response.status_code)
+                status = response.status_code
+                if isinstance(data, StreamedBody):
+                    sent = data.sent
+                metrics.count("bytes_sent_total", sent, device=name)
+                metrics.count(
+                    "bytes_received_total", len(response.content), device=name
+                )
+                metrics.count(
+                    "requests_total",
+                    device=name,
+                    method=method,
+                    status=response.status_code,
+                )
+                if status == 200:
+                    health.record_success(name)
+                    return response
+                error = self._status_error
+                transient = status in RETRY_STATUSES
+                failure = response
+            except (httpx.HTTPError, OSError) as http_err:
+                status = None
+                metrics.count(
+                    "requests_total", device=name, method=method, status="error"
+                )
+                error = JunosRestError
+                transient = is_transient(http_err)
+                failure = str(http_err) or type(http_err).__name__
+
+            delay = backoff(attempt)
+            remaining = deadline.remaining()
+            if (
+                not transient
+                or attempt == attempts
+                or (remaining is not None and delay >= remaining)
+            ):
+                health.record_status(name, status)
+                raise error(failure)
+
+            log.debug(
+                "Retrying {} {} on '{}' in {:.2f}s ({}/{})",
+                method,
+                endpoint,
+                name,
+                delay,
+                attempt,
+                attempts,
+            )
+            metrics.count("retries_total", device=name)
+            await asyncio.sleep(delay)
 
-    async def get(self, item="", endpoint="/rpc", params=None):
+    async def get(self, item="", endpoint="/rpc", params=None, deadline=None):
         """Perform HTTP GET.
 
+        GETs are idempotent, so transient failures are retried. If the
+        response cache is enabled, see `junos_rest.cache`, the RPC's output
+        may be served from the cache.
+
         Keyword Arguments:
             endpoint {str} -- HTTP URI (default: {"/rpc"})
             params {dict} -- URL Parameters (default: {None})
+            deadline {object} -- Operation deadline (default: {None})
 
         Raises:
             JunosRestError: Raised if status code is not 200
@@ -107,39 +268,171 @@ class Connection:
         Returns:
             {dict} -- Dictionary of parsed XML response
         """
+        if cache.ttl_for(item) is not None and endpoint == "/rpc":
+            return await cache.get(
+                self.device.name,
+                item,
+                params,
+                partial(self._get, item, endpoint, params, deadline),
+            )
+        value, _ = await self._get(item, endpoint, params, deadline)
+        return value
+
+    async def _get(self, item, endpoint, params, deadline):
+        """Perform HTTP GET, uncached.
+
+        Returns:
+            {tuple} -- Parsed response, & the response size in bytes
+        """
         request_config = {}
 
         if params is not None:
             request_config.update({"params": params})
         if item:
             endpoint = f"{endpoint}/{item}"
-        try:
-            response = await self.session.get(endpoint, **request_config)
-
-            if response.status_code != 200:
-                status = httpx.status_codes.StatusCode(response.status_code)
-                status_name = status.name.replace("_", " ")
-                raise JunosRestError(
-                    "{msg} - {url}",
-                    status=status.value,
-                    msg=status_name,
-                    url=response.url,
-                )
-        except httpx.HTTPError as http_err:
-            raise JunosRestError(str(http_err))
 
+        response = await self._send(
+            "GET", endpoint, idempotent=True, deadline=deadline, **request_config
+        )
+        return await self._parse_json(response)
+
+    async def _parse_json(self, response):
+        """Parse a JSON response.
+
+        Raises:
+            JunosRestError: Raised if the response isn't valid JSON
+
+        Returns:
+            {tuple} -- Parsed response, & the response size in bytes
+        """
         try:
-            return response.json()
+            with metrics.time(self.device.name, "parse"):
+                content = response.content
+                value = await offload.run(len(content), json.loads, content)
+                return value, len(content)
         except JSONDecodeError as je:
             raise JunosRestError(str(je))
 
-    async def post(self, endpoint="/rpc/", params=None, data=""):
+    async def get_config(self, paths=None, deadline=None):
+        """Get the device's running config, or only some hierarchies of it.
+
+        Keyword Arguments:
+            paths {list} -- Hierarchies to get, each as keys separated by
+                '/' or as a tuple of keys, e.g. ['system/time-zone'], or
+                None for the whole config (default: {None})
+            deadline {object} -- Operation deadline (default: {None})
+
+        Raises:
+            JunosRestError: Raised if status code is not 200
+            JunosRestError: Raised on other HTTP/library errors
+
+        Returns:
+            {dict} -- Config, wrapped under `configuration`
+        """
+        if paths is None:
+            return await self.get(item="get-configuration", deadline=deadline)
+
+        response = await self._send(
+            "POST",
+            "/rpc",
+            idempotent=True,
+            deadline=deadline,
+            data=config_filter(paths),
+        )
+        value, _ = await self._parse_json(response)
+        return value
+
+    async def stream(
+        self, item="", path="", endpoint="/rpc", params=None, deadline=None
+    ):
+        """Perform HTTP GET, yielding records from the response as it's received.
+
+        Unlike `get`, the response is never held in memory in full, so
+        memory use stays flat regardless of the response size. Since
+        records may already have been yielded, failures aren't retried.
+
+        Keyword Arguments:
+            item {str} -- RPC name, e.g. 'get-route-information' (default: {""})
+            path {str|tuple} -- Keys to the records, e.g.
+                'route-information/route-table/rt' (default: {""})
+            endpoint {str} -- HTTP URI (default: {"/rpc"})
+            params {dict} -- URL Parameters (default: {None})
+            deadline {object} -- Operation deadline (default: {None})
+
+        Raises:
+            JunosRestError: Raised if status code is not 200
+            JunosRestError: Raised on other HTTP/library errors
+
+        Yields:
+            {any} -- Each record at `path`
+        """
+        request_config = {"timeout": self.timeout(deadline=deadline)}
+
+        if params is not None:
+            request_config.update({"params": params})
+        if item:
+            endpoint = f"{endpoint}/{item}"
+
+        name = self.device.name
+        streamer = JSONPathStreamer(path)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            # Streams last as long as the caller takes to consume them, so their
+            # duration says nothing about the device's load.
+            async with limiter.slot(self.device, kind=None) as slot:
+                async with self.session.stream(
+                    "GET", endpoint, **request_config
+                ) as response:
+                    slot.record(response.status_code)
+                    health.record_status(name, response.status_code)
+                    metrics.count(
+                        "requests_total",
+                        device=name,
+                        method="GET",
+                        status=response.status_code,
+                    )
+
+                    if response.status_code != 200:
+                        raise self._status_error(response)
+
+                    async for chunk in response.aiter_bytes():
+                        metrics.count("bytes_received_total", len(chunk), device=name)
+                        for record in streamer.feed(decoder.decode(chunk)):
+                            yield record
+
+        except (httpx.HTTPError, OSError) as http_err:
+            health.record_failure(name)
+            metrics.count("requests_total", device=name, method="GET", status="error")
+            raise JunosRestError(str(http_err))
+
+        remaining = streamer.feed(decoder.decode(b"", final=True))
+        for record in remaining + streamer.close():
+            yield record
+
+    async def post(
+        self,
+        endpoint="/rpc/",
+        params=None,
+        data="",
+        headers=None,
+        idempotent=False,
+        commit=False,
+        deadline=None,
+    ):
         """Perform HTTP POST.
 
         Keyword Arguments:
             endpoint {str} -- HTTP URI (default: {"/rpc/"})
             params {dict} -- URL Parameters (default: {None})
-            data {str} -- XML Content (default: {""})
+            data {str|bytes|object} -- XML Content, or a `StreamedBody`
+                (default: {""})
+            headers {dict} -- Additional HTTP headers, e.g. the body's
+                Content-Encoding (default: {None})
+            idempotent {bool} -- The RPCs are safe to retry, e.g. operational
+                RPCs which don't change anything (default: {False})
+            commit {bool} -- The RPCs include a commit, so allow for the
+                device's commit timeout (default: {False})
+            deadline {object} -- Operation deadline (default: {None})
 
         Raises:
             JunosRestError: Raised if status code is not 200
@@ -152,19 +445,64 @@ class Connection:
 
         if params is not None:
             request_config.update({"params": params})
-        try:
-            response = await self.session.post(endpoint, **request_config)
-
-            if response.status_code != 200:
-                status = httpx.status_codes.StatusCode(response.status_code)
-                raise JunosRestError(
-                    "{msg} - {url}",
-                    status=status.value,
-                    msg=status.name.replace("_", " "),
-                    url=response.url,
-                )
-        except httpx.HTTPError as http_err:
-            raise JunosRestError(str(http_err))
-
-        parsed = await parse_results(response)
+        if headers:
+            request_config.update({"headers": headers})
+
+        response = await self._send(
+            "POST",
+            endpoint,
+            idempotent=idempotent,
+            commit=commit,
+            deadline=deadline,
+            **request_config,
+        )
+        with metrics.time(self.device.name, "parse"):
+            parsed = await parse_results(response)
         return parsed
+
+    async def batch(
+        self,
+        rpcs,
+        stop_on_error=False,
+        endpoint="/rpc",
+        idempotent=False,
+        commit=False,
+        deadline=None,
+    ):
+        """Run several RPCs in a single HTTP POST.
+
+        Arguments:
+            rpcs {list} -- RPC XML for each RPC, e.g. from `build_rpc`
+
+        Keyword Arguments:
+            stop_on_error {bool} -- Don't run any further RPCs after one fails
+                (default: {False})
+            endpoint {str} -- HTTP URI (default: {"/rpc"})
+            idempotent {bool} -- The RPCs are safe to retry, e.g. operational
+                RPCs which don't change anything (default: {False})
+            commit {bool} -- The RPCs include a commit or commit check, so
+                allow for the device's commit timeout (default: {False})
+            deadline {object} -- Operation deadline (default: {None})
+
+        Raises:
+            JunosRestError: Raised if status code is not 200
+            JunosRestError: Raised on other HTTP/library errors
+
+        Returns:
+            {list} -- Result dict for each RPC, in order
+        """
+        request_config = {"data": "\n".join(rpcs)}
+
+        if stop_on_error:
+            request_config.update({"params": {"stop-on-error": 1}})
+
+        response = await self._send(
+            "POST",
+            endpoint,
+            idempotent=idempotent,
+            commit=commit,
+            deadline=deadline,
+            **request_config,
+        )
+        with metrics.time(self.device.name, "parse"):
+            return await parse_batch(response, count=len(rpcs))
@@ -1,5 +1,73 @@
 """Reusable static data."""
 
+# Default minimum log level
+LOG_LEVEL = "INFO"
+
+# Minimum seconds between checks for changes to the config file
+CONFIG_CHECK_INTERVAL = 1
+
+# Connection pool defaults
+POOL_SOFT_LIMIT = 4
+POOL_HARD_LIMIT = 8
+POOL_IDLE_TIMEOUT = 300
+
+# Device health defaults
+REACHABILITY_TIMEOUT = 5
+HEALTH_REACHABILITY_TTL = 60
+HEALTH_FAILURE_THRESHOLD = 3
+HEALTH_RESET_TIMEOUT = 30
+
+# Request timeout defaults, overridable per device
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+COMMIT_TIMEOUT = 120
+
+# Overall time budget for a single operation, including retries
+OPERATION_DEADLINE = 300
+
+# Retry defaults, for idempotent requests only
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 10
+
+# Payload sizes, in bytes, above which parsing & serialization are run in
+# a thread or a process. None disables offloading to that executor.
+OFFLOAD_THREAD_THRESHOLD = 64 * 1024
+OFFLOAD_PROCESS_THRESHOLD = None
+OFFLOAD_WORKERS = 4
+
+# Config request bodies larger than this many bytes are encoded & sent a
+# chunk at a time, rather than built in memory first. None always builds
+# them in memory.
+BODY_STREAM_THRESHOLD = 1024 ** 2
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Compress config request bodies with gzip. Only enable this for devices
+# which accept gzip-encoded requests.
+BODY_GZIP = False
+
+# Concurrent requests per device, unless set with the device's
+# `max_sessions`, & across all devices. Each device's limit is halved when
+# it's overloaded, & recovers gradually as requests succeed.
+DEVICE_SESSIONS = 8
+FLEET_SESSIONS = 256
+LIMIT_DECREASE = 0.5
+
+# A response this many times slower than a device's usual response time is
+# treated as a sign the device is overloaded
+LIMIT_LATENCY_FACTOR = 4
+
+# Operational RPC response cache defaults. The cache is disabled until
+# configured, & RPCs are only cached if they have a TTL.
+CACHE_TTL = None
+CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+# Seconds to wait for more configs to combine into each commit to a device
+COMMIT_WINDOW = 0.05
+
+# Maximum number of devices configured at once by fleet operations
+FLEET_CONCURRENCY = 50
+
 COMMIT = """
 <lock-configuration/>
 <commit/>
@@ -14,7 +82,7 @@ COMMIT_CHECK = """
 
 CONFIG_JSON = """
 <lock-configuration/>
-<load-configuration format="json">
+<load-configuration action="{action}" format="json">
     <configuration-json>
         {config}
     </configuration-json>
@@ -23,4 +91,41 @@ CONFIG_JSON = """
 <unlock-configuration/>
 """
 
+CONFIG_SET = """
+<lock-configuration/>
+<load-configuration action="set" format="text">
+    <configuration-set>
+        {config}
+    </configuration-set>
+</load-configuration>
+<commit/>
+<unlock-configuration/>
+"""
+
+LOCK = "<lock-configuration/>"
+
+UNLOCK = "<unlock-configuration/>"
+
+ROLLBACK = """
+<rollback-configuration>
+    <rollback>0</rollback>
+</rollback-configuration>
+"""
+
+LOAD_JSON = """
+<load-configuration action="{action}" format="json">
+    <configuration-json>
+        {config}
+    </configuration-json>
+</load-configuration>
+"""
+
+LOAD_SET = """
+<load-configuration action="set" format="text">
+    <configuration-set>
+        {config}
+    </configuration-set>
+</load-configuration>
+"""
+
 RESULTS = """<results>{results}</results>"""
@@ -0,0 +1,405 @@
+"""Compute minimal configuration changes client-side.
+
+Rather than sending an entire desired config & having JunOS compare all
+of it, only the hierarchies which differ from the device's current
+config are sent. Three styles of change are supported:
+
+    merge       Only new or changed values are sent, & merged into the
+                current config.
+    replace     Changed hierarchies are sent in full, tagged to replace
+                the matching hierarchy in the current config.
+    set         New or changed values are sent as `set` statements.
+"""
+
+# Standard Library Imports
+import re
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+
+ACTIONS = ("merge", "replace", "set")
+_ATTRIBUTES = "@"
+_REPLACE = {"operation": "replace"}
+_UNQUOTED = re.compile(r"^[\w.:/+\-]+$")
+
+# List elements whose keyword is implied in `set` statements, e.g.
+# `set interfaces ge-0/0/0` rather than `set interfaces interface ge-0/0/0`.
+_IMPLIED_KEYWORDS = {
+    "interfaces": "interface",
+    "vlans": "vlan",
+    "routing-instances": "instance",
+    "bridge-domains": "domain",
+}
+
+
+class _Replace:
+    """Marker for a value which can only be changed by replacing its parent."""
+
+
+_REPLACE_PARENT = _Replace()
+
+
+def _scalar_equal(current, desired):
+    """Compare scalars, as strings, since JunOS may return numbers as strings."""
+    return current == desired or str(current) == str(desired)
+
+
+def _named(items):
+    """Index a list of JunOS named list items by name, if they all have one.
+
+    Arguments:
+        items {list} -- List items
+
+    Returns:
+        {dict|None} -- Items keyed by name, or None
+    """
+    if not all(isinstance(item, dict) and "name" in item for item in items):
+        return None
+    return {str(item["name"]): item for item in items}
+
+
+def _merge_dict(current, desired):
+    """Get the keys of a desired dict which aren't in the current config."""
+    if not isinstance(current, dict):
+        return desired
+    delta = {}
+    for key, value in desired.items():
+        if key not in current:
+            delta[key] = value
+            continue
+        changed = merge_delta(current[key], value)
+        if changed is not None:
+            delta[key] = changed
+    return delta or None
+
+
+def _merge_list(current, desired):
+    """Get the items of a desired list which aren't in the current config.
+
+    Named items are compared with the current item of the same name, &
+    only their changes are kept. Other items are kept unless the current
+    list already contains them.
+    """
+    if not isinstance(current, list):
+        return desired
+    current_named = _named(current)
+    delta = []
+    for item in desired:
+        if isinstance(item, dict) and "name" in item and current_named:
+            match = current_named.get(str(item["name"]))
+            changed = merge_delta(match, item) if match is not None else item
+            if changed is not None:
+                delta.append({"name": item["name"], **changed})
+        elif not any(merge_delta(c, item) is None for c in current):
+            delta.append(item)
+    return delta or None
+
+
+def _scalar_delta(current, desired):
+    """Get a desired scalar, or None if the current config already has it."""
+    if current is not None and _scalar_equal(current, desired):
+        return None
+    return desired
+
+
+def merge_delta(current, desired):
+    """Get the parts of a desired config which aren't in the current config.
+
+    Arguments:
+        current {any} -- Current config (or a subtree of it)
+        desired {any} -- Desired config (or a subtree of it)
+
+    Returns:
+        {any} -- Desired values to merge, or None if nothing would change
+    """
+    if isinstance(desired, dict):
+        return _merge_dict(current, desired)
+    if isinstance(desired, list):
+        return _merge_list(current, desired)
+    return _scalar_delta(current, desired)
+
+
+def _strip_attributes(value):
+    """Get a dict's keys, other than JunOS attributes."""
+    return {key for key in value if key != _ATTRIBUTES}
+
+
+def _replace_dict(current, desired):
+    """Get a desired dict's changed hierarchies, tagging them to be replaced.
+
+    A dict with different keys than the current one is replaced in full.
+    """
+    same_keys = isinstance(current, dict) and (
+        _strip_attributes(current) == _strip_attributes(desired)
+    )
+    if not same_keys:
+        return {_ATTRIBUTES: _REPLACE, **desired}
+    delta = {}
+    for key, value in desired.items():
+        if key == _ATTRIBUTES:
+            continue
+        changed = _replace_delta(current[key], value)
+        if changed is _REPLACE_PARENT:
+            return {_ATTRIBUTES: _REPLACE, **desired}
+        if changed is not None:
+            delta[key] = changed
+    return delta or None
+
+
+def _replace_unnamed_list(current, desired):
+    """Compare lists without names, which can only be replaced whole."""
+    if len(current) != len(desired) or any(
+        merge_delta(c, d) is not None or merge_delta(d, c) is not None
+        for c, d in zip(current, desired)
+    ):
+        return _REPLACE_PARENT
+    return None
+
+
+def _replace_list(current, desired):
+    """Get a desired list's changed items, tagging them to be replaced.
+
+    Named items are compared with the current item of the same name. A
+    list with different names, or without names, which differs from the
+    current list can only be changed by replacing its parent.
+    """
+    if not isinstance(current, list):
+        return _REPLACE_PARENT
+    current_named, desired_named = _named(current), _named(desired)
+    if current_named is None or desired_named is None:
+        return _replace_unnamed_list(current, desired)
+    if set(current_named) != set(desired_named):
+        return _REPLACE_PARENT
+    delta = []
+    for name, item in desired_named.items():
+        changed = _replace_delta(current_named[name], item)
+        if changed is _REPLACE_PARENT:
+            return _REPLACE_PARENT
+        if changed is not None:
+            delta.append({"name": item["name"], **changed})
+    return delta or None
+
+
+def _replace_delta(current, desired):
+    """Get the hierarchies of a desired config which differ from the current.
+
+    Arguments:
+        current {any} -- Current config (or a subtree of it)
+        desired {any} -- Desired config (or a subtree of it)
+
+    Returns:
+        {any} -- Changed hierarchies, None if nothing would change, or
+            _REPLACE_PARENT if the parent hierarchy must be replaced
+    """
+    if isinstance(desired, dict):
+        return _replace_dict(current, desired)
+    if isinstance(desired, list):
+        return _replace_list(current, desired)
+    return _scalar_delta(current, desired)
+
+
+def replace_delta(current, desired):
+    """Get the hierarchies of a desired config which differ from the current.
+
+    Each top-level hierarchy in the desired config is authoritative, & is
+    compared with the same hierarchy in the current config. Changed
+    hierarchies are tagged with `"@": {"operation": "replace"}`, so they
+    replace the hierarchy in the current config in full. Top-level
+    hierarchies which aren't in the desired config are left alone.
+
+    Arguments:
+        current {dict} -- Current config
+        desired {dict} -- Desired config
+
+    Returns:
+        {dict} -- Changed hierarchies, or None if nothing would change
+    """
+    delta = {}
+    for key, value in desired.items():
+        changed = _replace_delta(current.get(key), value)
+        if changed is _REPLACE_PARENT:
+            changed = value
+        if changed is not None:
+            delta[key] = changed
+    return delta or None
+
+
+def _combine(base, fragment, path):
+    """Merge one desired config into another, noting conflicting values.
+
+    Arguments:
+        base {any} -- Desired config (or a subtree of it)
+        fragment {any} -- Desired config (or a subtree of it) to merge in
+        path {str} -- Path to the subtree, for reporting conflicts
+
+    Returns:
+        {tuple} -- Merged config, list of conflicting paths
+    """
+    if isinstance(base, dict) and isinstance(fragment, dict):
+        merged, conflicts = dict(base), []
+        for key, value in fragment.items():
+            if key in merged:
+                merged[key], found = _combine(merged[key], value, f"{path}/{key}")
+                conflicts += found
+            else:
+                merged[key] = value
+        return merged, conflicts
+
+    if isinstance(base, list) and isinstance(fragment, list):
+        base_named, fragment_named = _named(base), _named(fragment)
+        if base_named is None or fragment_named is None:
+            return base + [item for item in fragment if item not in base], []
+        merged, conflicts = list(base), []
+        positions = {name: i for i, name in enumerate(base_named)}
+        for name, item in fragment_named.items():
+            if name in positions:
+                i = positions[name]
+                merged[i], found = _combine(merged[i], item, f"{path}/{name}")
+                conflicts += found
+            else:
+                merged.append(item)
+        return merged, conflicts
+
+    if isinstance(base, (dict, list)) or isinstance(fragment, (dict, list)):
+        return fragment, [path]
+    if _scalar_equal(base, fragment):
+        return base, []
+    return fragment, [path]
+
+
+def combine_configs(base, fragment, action="merge"):
+    """Merge two desired configs into one, if they don't conflict.
+
+    Configs conflict if they set the same value differently. For the
+    'replace' action, configs also conflict if they both contain the same
+    top-level hierarchy, with different contents.
+
+    Arguments:
+        base {dict} -- Desired config, wrapped under `configuration`
+        fragment {dict} -- Desired config, wrapped under `configuration`
+
+    Keyword Arguments:
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+
+    Returns:
+        {tuple} -- Merged config (None if there are conflicts), list of
+            conflicting paths
+    """
+    base_config = base.get("configuration", {})
+    fragment_config = fragment.get("configuration", {})
+
+    if action == "replace":
+        conflicts = [
+            f"/{key}"
+            for key, value in fragment_config.items()
+            if key in base_config and base_config[key] != value
+        ]
+        merged = {**base_config, **fragment_config}
+    else:
+        merged, conflicts = _combine(base_config, fragment_config, "")
+
+    if conflicts:
+        return None, conflicts
+    return {"configuration": merged}, []
+
+
+def _quote(value):
+    """Quote a value for use in a `set` statement, if needed."""
+    value = str(value)
+    if _UNQUOTED.match(value):
+        return value
+    return '"{}"'.format(value.replace("\\", "\\\\").replace('"', '\\"'))
+
+
+def _set_statements(path, value):
+    """Flatten a config subtree into `set` statements.
+
+    Arguments:
+        path {list} -- Statement path to the subtree
+        value {any} -- Config subtree
+
+    Yields:
+        {str} -- `set` statement
+    """
+    if isinstance(value, dict):
+        name = [_quote(value["name"])] if "name" in value else []
+        children = [k for k in value if k not in ("name", _ATTRIBUTES)]
+        if not children:
+            yield " ".join(["set", *path, *name])
+        for key in children:
+            if path and not name and _IMPLIED_KEYWORDS.get(path[-1]) == key:
+                child_path = path
+            else:
+                child_path = [*path, *name, key]
+            yield from _set_statements(child_path, value[key])
+
+    elif isinstance(value, list):
+        for item in value:
+            yield from _set_statements(path, item)
+
+    elif value is None:
+        yield " ".join(["set", *path])
+
+    else:
+        yield " ".join(["set", *path, _quote(value)])
+
+
+def set_statements(config):
+    """Convert a config to `set` statements.
+
+    Arguments:
+        config {dict} -- Config, as JunOS JSON
+
+    Returns:
+        {list} -- `set` statements
+    """
+    return list(_set_statements([], config))
+
+
+def validate_action(action):
+    """Verify a change style is supported.
+
+    Arguments:
+        action {str} -- Change style
+
+    Raises:
+        JunosRestError: Raised if the action is invalid
+    """
+    if action not in ACTIONS:
+        raise JunosRestError(
+            "Action must be one of {a}", status=400, a=", ".join(ACTIONS)
+        )
+
+
+def config_delta(current, desired, action="merge"):
+    """Get the minimal change to make a device's config match a desired config.
+
+    Arguments:
+        current {dict} -- Current config, wrapped under `configuration`
+        desired {dict} -- Desired config, wrapped under `configuration`
+
+    Keyword Arguments:
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+
+    Raises:
+        JunosRestError: Raised if the action is invalid
+
+    Returns:
+        {dict|list|None} -- Config to load (`set` statements for the 'set'
+            action), or None if nothing would change
+    """
+    validate_action(action)
+
+    current_config = current.get("configuration", {})
+    desired_config = desired.get("configuration", {})
+
+    if action == "replace":
+        delta = replace_delta(current_config, desired_config)
+    else:
+        delta = merge_delta(current_config, desired_config)
+
+    if delta is None:
+        return None
+    if action == "set":
+        return set_statements(delta)
+    return {"configuration": delta}
@@ -3,12 +3,15 @@
 # Third Party Imports
 import ujson
 
-# Project Imports
-from junos_rest.log import log
-
 
 class JunosRestError(Exception):
-    """junos_rest base exception."""
+    """junos_rest base exception.
+
+    Errors aren't logged when they're raised, since callers often handle
+    them. Errors which are handled by junos_rest itself, e.g. a single
+    device failing during a fleet operation, are logged where they're
+    handled, at the level from `level`.
+    """
 
     def __init__(self, message="", status=500, **kwargs):
         """Initialize the junos_rest base exception class.
@@ -20,15 +23,6 @@ class JunosRestError(Exception):
         self._message = message.format(**kwargs)
         self._status = status
 
-        if self._status in range(400, 500):
-            log.error(repr(self))
-
-        elif self._status in range(500, 600):
-            log.critical(repr(self))
-
-        else:
-            log.info(repr(self))
-
     def __str__(self):
         """Return the instance's error message.
 
@@ -70,6 +64,19 @@ class JunosRestError(Exception):
         """
         return self._message
 
+    @property
+    def level(self):
+        """Return the log level matching the instance's status.
+
+        Returns:
+            {str} -- Log level
+        """
+        if self._status in range(400, 500):
+            return "ERROR"
+        elif self._status in range(500, 600):
+            return "CRITICAL"
+        return "INFO"
+
     @property
     def status(self):
         """Return the instance's `status` attribute.
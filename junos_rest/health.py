@@ -0,0 +1,219 @@
+"""Per-device reachability & health tracking."""
+
+# Standard Library Imports
+import asyncio
+import time
+
+# Project Imports
+from junos_rest.constants import HEALTH_FAILURE_THRESHOLD
+from junos_rest.constants import HEALTH_REACHABILITY_TTL
+from junos_rest.constants import HEALTH_RESET_TIMEOUT
+from junos_rest.constants import REACHABILITY_TIMEOUT
+from junos_rest.exceptions import JunosRestError
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+async def _test_reachability(host, port, timeout=REACHABILITY_TIMEOUT):
+    """Verify the target host & port are actually reachable and open.
+
+    Arguments:
+        host {str} -- Device hostname or IP address
+        port {int} -- Device listening TCP port
+
+    Keyword Arguments:
+        timeout {int} -- Seconds to wait for the connection
+
+    Raises:
+        JunosRestError: Raised if device is unreachable
+
+    Returns:
+        {bool} -- True if device is reachable
+    """
+    from socket import gaierror
+
+    try:
+        _reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(str(host), int(port)), timeout=timeout
+        )
+    except gaierror:
+        raise JunosRestError(f"{host}:{port} is unreachable/unresolvable.", status=502)
+    except (OSError, asyncio.TimeoutError):
+        raise JunosRestError(f"{host}:{port} is unreachable.", status=502)
+
+    writer.close()
+    return True
+
+
+class DeviceHealth:
+    """Health state of a single device."""
+
+    __slots__ = ("state", "failures", "reachable_until", "opened_at")
+
+    def __init__(self):
+        """Start out healthy, with no known reachability."""
+        self.state = CLOSED
+        self.failures = 0
+        self.reachable_until = 0.0
+        self.opened_at = 0.0
+
+
+class HealthTracker:
+    """Track device health & stop sending requests to failing devices.
+
+    Reachability is cached for `reachability_ttl` seconds, and refreshed
+    by every real request outcome. After `failure_threshold` consecutive
+    failures, a device's circuit opens & requests fail immediately. Once
+    `reset_timeout` seconds have passed, a single trial request is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        reachability_ttl=HEALTH_REACHABILITY_TTL,
+        failure_threshold=HEALTH_FAILURE_THRESHOLD,
+        reset_timeout=HEALTH_RESET_TIMEOUT,
+    ):
+        """Initialize the health tracker.
+
+        Keyword Arguments:
+            reachability_ttl {int} -- Seconds a reachability result is valid
+            failure_threshold {int} -- Consecutive failures to open a circuit
+            reset_timeout {int} -- Seconds before an open circuit is retried
+        """
+        self.reachability_ttl = reachability_ttl
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._devices = {}
+
+    def __getitem__(self, device_name):
+        """Get a device's health state, creating it if needed."""
+        health = self._devices.get(device_name)
+        if health is None:
+            health = self._devices[device_name] = DeviceHealth()
+        return health
+
+    def state(self, device_name):
+        """Get the circuit state of a device.
+
+        Arguments:
+            device_name {str} -- Device name
+
+        Returns:
+            {str} -- One of 'closed', 'open', or 'half-open'
+        """
+        return self[device_name].state
+
+    def allow(self, device_name):
+        """Determine if a request to a device should be attempted.
+
+        Arguments:
+            device_name {str} -- Device name
+
+        Returns:
+            {bool} -- True if the request may proceed
+        """
+        health = self[device_name]
+
+        if health.state == CLOSED:
+            return True
+
+        now = time.monotonic()
+        if now - health.opened_at < self.reset_timeout:
+            return False
+
+        # Let one trial request through, & hold off any others for
+        # another reset period in case it never reports back.
+        health.state = HALF_OPEN
+        health.opened_at = now
+        log.debug("Circuit for '{}' is half-open", device_name)
+        return True
+
+    def record_success(self, device_name):
+        """Record a successful interaction with a device.
+
+        Arguments:
+            device_name {str} -- Device name
+        """
+        health = self[device_name]
+        if health.state != CLOSED:
+            log.debug("Circuit for '{}' is closed", device_name)
+
+        health.state = CLOSED
+        health.failures = 0
+        health.reachable_until = time.monotonic() + self.reachability_ttl
+
+    def record_failure(self, device_name):
+        """Record a failed interaction with a device.
+
+        Arguments:
+            device_name {str} -- Device name
+        """
+        health = self[device_name]
+        health.failures += 1
+        health.reachable_until = 0.0
+
+        if health.state == HALF_OPEN or health.failures >= self.failure_threshold:
+            if health.state != OPEN:
+                log.debug("Circuit for '{}' is open", device_name)
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+
+    def record_status(self, device_name, status):
+        """Record the outcome of an HTTP request to a device.
+
+        Server errors & requests without a response count as failures,
+        anything else as a success.
+
+        Arguments:
+            device_name {str} -- Device name
+            status {int|None} -- HTTP status code, or None if the request
+                failed without a response
+        """
+        if status is None or status >= 500:
+            self.record_failure(device_name)
+        else:
+            self.record_success(device_name)
+
+    async def check(self, device):
+        """Verify a device is healthy enough to send requests to.
+
+        The device is only probed if its cached reachability has expired.
+
+        Arguments:
+            device {object} -- Device object
+
+        Raises:
+            JunosRestError: Raised if the device's circuit is open
+            JunosRestError: Raised if device is unreachable
+        """
+        if not self.allow(device.name):
+            raise JunosRestError(
+                "'{d}' has failed repeatedly & is temporarily unavailable",
+                status=503,
+                d=device.name,
+            )
+
+        if self[device.name].reachable_until > time.monotonic():
+            return
+
+        try:
+            with metrics.time(device.name, "reachability"):
+                await _test_reachability(
+                    device.host,
+                    device.port,
+                    timeout=device.connect_timeout or REACHABILITY_TIMEOUT,
+                )
+        except JunosRestError:
+            self.record_failure(device.name)
+            raise
+
+        self[device.name].reachable_until = time.monotonic() + self.reachability_ttl
+        log.debug("'{}' is reachable", device.name)
+
+
+health = HealthTracker()
@@ -0,0 +1,161 @@
+"""Indexed device inventory & device selectors.
+
+A selector is a string of whitespace-separated terms. Devices must match
+every term to be selected. A term is one of:
+
+    router1                 Device named 'router1'
+    name:router1,router2    Devices named 'router1' or 'router2'
+    site:nyc,lax            Devices at site 'nyc' or 'lax'
+    role:edge               Devices with role 'edge'
+    tag:core                Devices tagged 'core'
+    *                       All devices
+
+Prefixing a term with '!' excludes the devices it matches, e.g.
+'role:edge !tag:lab' selects all edge devices not tagged 'lab'.
+"""
+
+# Project Imports
+from junos_rest.config import get_params
+from junos_rest.exceptions import JunosRestError
+
+_ATTRIBUTES = ("site", "role")
+_INDEXES = ("name", "site", "role", "tag")
+
+
+class Inventory:
+    """Device inventory, indexed by name, site, role, & tag."""
+
+    def __init__(self, devices):
+        """Build the inventory's indexes in a single pass over the devices.
+
+        Arguments:
+            devices {list} -- Device objects
+        """
+        self._devices = []
+        self._by_name = {}
+        self._position = {}
+        self._indexes = {index: {} for index in _INDEXES if index != "name"}
+
+        for device in devices:
+            if device.name in self._by_name:
+                raise JunosRestError("Device {d} is defined twice", d=device.name)
+
+            self._position[device.name] = len(self._devices)
+            self._devices.append(device)
+            self._by_name[device.name] = device
+
+            for attribute in _ATTRIBUTES:
+                value = getattr(device, attribute)
+                if value is not None:
+                    self._indexes[attribute].setdefault(value, set()).add(device.name)
+
+            for tag in device.tags:
+                self._indexes["tag"].setdefault(tag, set()).add(device.name)
+
+    def __len__(self):
+        """Return the number of devices in the inventory."""
+        return len(self._devices)
+
+    def __iter__(self):
+        """Iterate through all devices in configured order."""
+        return iter(self._devices)
+
+    def __contains__(self, device_name):
+        """Determine if a device name is in the inventory."""
+        return device_name in self._by_name
+
+    def get(self, device_name):
+        """Get a device by name.
+
+        Arguments:
+            device_name {str} -- Device name
+
+        Raises:
+            JunosRestError: Raised if there is no matching device.
+
+        Returns:
+            {object} -- Matched device object
+        """
+        try:
+            return self._by_name[device_name]
+        except KeyError:
+            raise JunosRestError("No configured device matches {d}", d=device_name)
+
+    def _match(self, term):
+        """Get the names of all devices matching a single selector term.
+
+        Arguments:
+            term {str} -- Selector term
+
+        Raises:
+            JunosRestError: Raised if the term is invalid or names an
+                unknown device.
+
+        Returns:
+            {set} -- Matching device names
+        """
+        if term == "*":
+            return set(self._by_name)
+
+        index, sep, values = term.partition(":")
+        if not sep:
+            index, values = "name", term
+
+        if index not in _INDEXES:
+            raise JunosRestError(
+                "Invalid selector '{t}', must be one of: {i}",
+                t=term,
+                i=", ".join(_INDEXES),
+            )
+
+        matched = set()
+        for value in values.split(","):
+            if index == "name":
+                matched.add(self.get(value).name)
+            else:
+                matched.update(self._indexes[index].get(value, ()))
+        return matched
+
+    def select(self, selector):
+        """Get all devices matching a selector.
+
+        Arguments:
+            selector {str} -- Device selector
+
+        Returns:
+            {list} -- Matching device objects, in configured order
+        """
+        included = None
+        excluded = set()
+
+        for term in selector.split():
+            if term.startswith("!"):
+                excluded.update(self._match(term[1:]))
+            elif included is None:
+                included = self._match(term)
+            else:
+                included.intersection_update(self._match(term))
+
+        if included is None:
+            included = set(self._by_name) if excluded else set()
+
+        names = sorted(included - excluded, key=self._position.__getitem__)
+        return [self._by_name[name] for name in names]
+
+
+_inventory = {"params": None, "inventory": None}
+
+
+def get_inventory(path=None):
+    """Get the device inventory, rebuilding it if the config has changed.
+
+    Keyword Arguments:
+        path {str} -- Config file path (default: {None})
+
+    Returns:
+        {object} -- Device inventory
+    """
+    params = get_params(path)
+    if _inventory["params"] is not params:
+        _inventory.update({"params": params, "inventory": Inventory(params.devices)})
+    return _inventory["inventory"]
@@ -0,0 +1,298 @@
+"""Adaptive limits on concurrent requests, per device & across all devices.
+
+JunOS limits how many REST sessions each device accepts, & a busy routing
+engine answers slowly or with errors long before that. Each device starts
+at its `max_sessions` concurrent requests, or `DEVICE_SESSIONS`, & its
+limit adapts to how the device responds:
+
+    - Overloaded responses (503 or 429), connection errors, timeouts &
+      responses much slower than usual halve the limit, at most once per
+      round of requests.
+    - Successful responses raise the limit by one per round of requests,
+      back up to the starting limit.
+
+Requests beyond a device's limit, or beyond `FLEET_SESSIONS` across all
+devices, wait for a free slot. Time spent waiting is recorded as the
+`queue` phase.
+"""
+
+# Standard Library Imports
+import asyncio
+import time
+from collections import deque
+
+# Project Imports
+from junos_rest.constants import DEVICE_SESSIONS
+from junos_rest.constants import FLEET_SESSIONS
+from junos_rest.constants import LIMIT_DECREASE
+from junos_rest.constants import LIMIT_LATENCY_FACTOR
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+from junos_rest.retry import is_transient
+
+OVERLOADED_STATUSES = (429, 503)
+
+# Weight of each response time in a device's usual response time. Kept low,
+# so a device slowing down under load doesn't become its new normal.
+_LATENCY_WEIGHT = 0.01
+
+
+class _Gate:
+    """Counting semaphore, whose limit can change while it's in use."""
+
+    __slots__ = ("limit", "active", "_waiters")
+
+    def __init__(self, limit):
+        """Initialize the gate.
+
+        Arguments:
+            limit {int} -- Maximum holders at once
+        """
+        self.limit = limit
+        self.active = 0
+        self._waiters = deque()
+
+    async def acquire(self):
+        """Wait for & take a slot."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Give back a slot which was handed over as the waiter was cancelled.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Give back a slot."""
+        self.active -= 1
+        self.wake()
+
+    def wake(self):
+        """Hand free slots to waiters, in order."""
+        while self._waiters and self.active < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+
+
+class AdaptiveLimit:
+    """A single device's concurrency limit."""
+
+    __slots__ = ("name", "max_limit", "limit", "gate", "latency", "_decreased")
+
+    def __init__(self, name, max_limit):
+        """Initialize the limit at its maximum.
+
+        Arguments:
+            name {str} -- Device Name
+            max_limit {int} -- Starting & maximum limit
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.gate = _Gate(max_limit)
+        self.latency = {}
+        self._decreased = 0.0
+
+    def resize(self, max_limit):
+        """Change the maximum limit, e.g. when the device's config changes.
+
+        Arguments:
+            max_limit {int} -- Starting & maximum limit
+        """
+        if max_limit > self.max_limit:
+            self.limit = float(max_limit)
+        self.max_limit = max_limit
+        self._set(self.limit)
+
+    def _set(self, limit):
+        """Set the limit, within its bounds, & let waiters use any new slots."""
+        self.limit = min(max(limit, 1.0), self.max_limit)
+        self.gate.limit = int(self.limit)
+        self.gate.wake()
+
+    def succeeded(self, kind, elapsed, started):
+        """Adjust the limit after a successful response.
+
+        Arguments:
+            kind {str|None} -- Kind of request, since e.g. commits are always
+                slower than other requests, or None to ignore its duration
+            elapsed {float} -- Seconds the request took
+            started {float} -- When the request started
+        """
+        if kind is not None:
+            usual = self.latency.get(kind)
+            if usual is None or elapsed < usual:
+                self.latency[kind] = elapsed
+            else:
+                self.latency[kind] = usual + (elapsed - usual) * _LATENCY_WEIGHT
+                if elapsed > usual * LIMIT_LATENCY_FACTOR:
+                    self.overloaded(started, "latency")
+                    return
+        if self.limit < self.max_limit:
+            self._set(self.limit + 1 / self.limit)
+
+    def overloaded(self, started, reason):
+        """Decrease the limit after a sign the device is overloaded.
+
+        Requests started before the last decrease were sent at the old
+        limit, so they don't decrease it again.
+
+        Arguments:
+            started {float} -- When the request started
+            reason {str} -- Sign of overload, e.g. 'status'
+        """
+        if started <= self._decreased:
+            return
+        self._decreased = time.monotonic()
+        before = self.limit
+        self._set(self.limit * LIMIT_DECREASE)
+        metrics.count("limit_decreases_total", device=self.name, reason=reason)
+        log.debug(
+            "Decreased concurrency limit for '{}' from {:.1f} to {:.1f} ({})",
+            self.name,
+            before,
+            self.limit,
+            reason,
+        )
+
+
+class _Slot:
+    """Async context manager which holds a request slot for a device."""
+
+    __slots__ = ("limiter", "device", "kind", "limit", "started", "reason")
+
+    def __init__(self, limiter, device, kind):
+        """Set the device & kind of request to hold a slot for."""
+        self.limiter = limiter
+        self.device = device
+        self.kind = kind
+        self.limit = None
+        self.started = None
+        self.reason = None
+
+    def record(self, status):
+        """Record the response status, to detect overloaded responses.
+
+        Arguments:
+            status {int} -- HTTP status code
+        """
+        if status in OVERLOADED_STATUSES:
+            self.reason = "status"
+
+    async def __aenter__(self):
+        """Wait for a slot, both for the device & across all devices.
+
+        The device's slot is taken first, so requests waiting on a busy
+        device don't hold slots other devices could use.
+        """
+        self.limit = self.limiter.limit_for(self.device)
+        with metrics.time(self.device.name, "queue"):
+            await self.limit.gate.acquire()
+            try:
+                await self.limiter.fleet.acquire()
+            except BaseException:
+                self.limit.gate.release()
+                raise
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        """Release the slot, & adjust the device's limit."""
+        elapsed = time.monotonic() - self.started
+        self.limiter.fleet.release()
+        self.limit.gate.release()
+
+        if self.reason is not None:
+            self.limit.overloaded(self.started, self.reason)
+        elif exc is not None:
+            if is_transient(exc):
+                self.limit.overloaded(self.started, "error")
+        else:
+            self.limit.succeeded(self.kind, elapsed, self.started)
+
+
+class ConcurrencyLimiter:
+    """Adaptive per-device limits, under a fixed limit across all devices."""
+
+    def __init__(self, fleet_limit=FLEET_SESSIONS, device_limit=DEVICE_SESSIONS):
+        """Initialize the limiter.
+
+        Keyword Arguments:
+            fleet_limit {int} -- Concurrent requests across all devices
+            device_limit {int} -- Starting & maximum concurrent requests per
+                device, for devices without `max_sessions`
+        """
+        self._devices = {}
+        self.fleet = _Gate(fleet_limit)
+        self.device_limit = device_limit
+
+    def configure(self, fleet_limit=FLEET_SESSIONS, device_limit=DEVICE_SESSIONS):
+        """Change the limits.
+
+        Keyword Arguments:
+            fleet_limit {int} -- Concurrent requests across all devices
+            device_limit {int} -- Starting & maximum concurrent requests per
+                device, for devices without `max_sessions`
+        """
+        self.fleet.limit = fleet_limit
+        self.fleet.wake()
+        self.device_limit = device_limit
+
+    def limit_for(self, device):
+        """Get a device's limit, creating or resizing it as needed.
+
+        Arguments:
+            device {object} -- Device object
+
+        Returns:
+            {object} -- AdaptiveLimit
+        """
+        max_limit = device.max_sessions or self.device_limit
+        limit = self._devices.get(device.name)
+        if limit is None:
+            limit = self._devices[device.name] = AdaptiveLimit(device.name, max_limit)
+        elif limit.max_limit != max_limit:
+            limit.resize(max_limit)
+        return limit
+
+    def limit(self, device_name):
+        """Get a device's current limit.
+
+        Arguments:
+            device_name {str} -- Device Name
+
+        Returns:
+            {float|None} -- Concurrent requests, or None if the device
+                hasn't been used
+        """
+        limit = self._devices.get(device_name)
+        return None if limit is None else limit.limit
+
+    def slot(self, device, kind="request"):
+        """Hold a request slot for a device for the duration of an async context.
+
+        e.g. `async with limiter.slot(device) as slot: ...`. Call
+        `slot.record` with the response's status code.
+
+        Arguments:
+            device {object} -- Device object
+
+        Keyword Arguments:
+            kind {str|None} -- Kind of request, since e.g. commits are always
+                slower than other requests, or None to ignore its duration
+                (default: {"request"})
+
+        Returns:
+            {object} -- Async context manager
+        """
+        return _Slot(self, device, kind)
+
+
+limiter = ConcurrencyLimiter()
@@ -1,10 +1,25 @@
-"""Log handling."""
+"""Log handling.
+
+The log level is read from the `JUNOS_REST_LOG_LEVEL` environment
+variable, & defaults to `LOG_LEVEL`. Set `JUNOS_REST_LOG_FORMAT` to
+`json` to log structured JSON records instead of text, e.g. for shipping
+logs elsewhere. Both can also be set with `configure_logging`.
+
+Records are written by a background thread, so writing logs never blocks
+the event loop. Messages are only formatted if their level is enabled, so
+pass values to format as arguments rather than formatting them first, &
+use `log.opt(lazy=True)` for values which are expensive to compute.
+"""
 
 # Standard Library Imports
+import os
 import sys
 
-# Third Party Imports
-from loguru import logger as _loguru_logger
+# Project Imports
+from junos_rest.constants import LOG_LEVEL
+
+LOG_LEVEL_ENV = "JUNOS_REST_LOG_LEVEL"
+LOG_FORMAT_ENV = "JUNOS_REST_LOG_FORMAT"
 
 _LOG_FMT = (
     "<lvl><b>[{level}]</b> {time:YYYYMMDD} {time:HH:mm:ss} <lw>|</lw> {name}<lw>:</lw>"
@@ -19,13 +34,85 @@ _LOG_LEVELS = [
     {"name": "CRITICAL", "no": 50, "color": "<r>"},
 ]
 
-_LOG_HANDLER = {"sink": sys.stdout, "format": _LOG_FMT, "level": "DEBUG"}
 
+def _handler(level=None, json=None, sink=None, enqueue=True):
+    """Build the log handler, with defaults from the environment.
+
+    Keyword Arguments:
+        level {str} -- Minimum log level (default: {None})
+        json {bool} -- Log structured JSON records (default: {None})
+        sink {any} -- Log destination (default: {None})
+        enqueue {bool} -- Write records from a background thread
+            (default: {True})
+
+    Returns:
+        {dict} -- loguru handler
+    """
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV, LOG_LEVEL)
+    if json is None:
+        json = os.environ.get(LOG_FORMAT_ENV, "").lower() == "json"
+
+    handler = {
+        "sink": sys.stdout if sink is None else sink,
+        "level": str(level).upper(),
+        "enqueue": enqueue,
+    }
+    if json:
+        handler.update({"serialize": True, "format": "{message}"})
+    else:
+        handler.update({"format": _LOG_FMT})
+    return handler
+
+
+def _logger(**handler):
+    """Import & configure loguru.
+
+    Keyword Arguments:
+        handler {any} -- Handler options, see `configure_logging`
+
+    Returns:
+        {object} -- loguru logger
+    """
+    import atexit
+
+    from loguru import logger as _loguru_logger
 
-def _logger():
     _loguru_logger.remove()
-    _loguru_logger.configure(handlers=[_LOG_HANDLER], levels=_LOG_LEVELS)
+    _loguru_logger.configure(handlers=[_handler(**handler)], levels=_LOG_LEVELS)
+    if not _LazyLogger._flush_registered:
+        # Make sure enqueued records are written before the process exits.
+        atexit.register(_loguru_logger.remove)
+        _LazyLogger._flush_registered = True
     return _loguru_logger
 
 
-log = _logger()
+class _LazyLogger:
+    """Proxy which only imports & configures loguru when it's first used."""
+
+    _logger = None
+    _flush_registered = False
+
+    def __getattr__(self, name):
+        """Get an attribute of the configured loguru logger."""
+        if _LazyLogger._logger is None:
+            _LazyLogger._logger = _logger()
+        return getattr(_LazyLogger._logger, name)
+
+
+def configure_logging(level=None, json=None, sink=None, enqueue=True):
+    """Change how logs are written.
+
+    Keyword Arguments:
+        level {str} -- Minimum log level, e.g. 'DEBUG'. Defaults to
+            `JUNOS_REST_LOG_LEVEL`, or `LOG_LEVEL` (default: {None})
+        json {bool} -- Log structured JSON records. Defaults to True if
+            `JUNOS_REST_LOG_FORMAT` is `json` (default: {None})
+        sink {any} -- Log destination, e.g. a file path (default: {sys.stdout})
+        enqueue {bool} -- Write records from a background thread, so the
+            event loop is never blocked (default: {True})
+    """
+    _LazyLogger._logger = _logger(level=level, json=json, sink=sink, enqueue=enqueue)
+
+
+log = _LazyLogger()
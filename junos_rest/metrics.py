@@ -0,0 +1,344 @@
+"""Counters & latency histograms, per device & per phase.
+
+Every request to a device is broken down into phases, each timed
+separately:
+
+    queue           Waiting for a free request slot, see `junos_rest.limiter`
+    reachability    TCP probe before a device is first used
+    connect         Opening a pooled connection
+    get_config      Fetching the running config
+    serialize       Serializing a config to send, unless it's streamed as
+                    it's sent, see `junos_rest.body`
+    commit          Loading & committing a config
+    check           Loading & checking a config, without committing it
+    parse           Parsing a response
+
+Metrics can be exported in the Prometheus text format with `export`, or
+passed on as they're recorded to hooks, e.g. to forward them to StatsD.
+"""
+
+# Standard Library Imports
+import time
+
+# Project Imports
+from junos_rest.log import log
+
+PREFIX = "junos_rest_"
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+)
+
+_HELP = {
+    "phase_seconds": "Time spent in each phase of a request",
+    "requests_total": "HTTP requests sent, by response status",
+    "retries_total": "Requests retried after a transient failure",
+    "bytes_sent_total": "Request body bytes sent",
+    "bytes_received_total": "Response body bytes received",
+    "pool_hits_total": "Requests which reused a pooled connection",
+    "pool_misses_total": "Requests which opened a new connection",
+    "cache_hits_total": "RPC output served from the response cache",
+    "cache_misses_total": "RPC output fetched for the response cache",
+    "cache_shared_total": "Requests which shared another's in-flight fetch",
+    "cache_evictions_total": "Cached RPC output evicted to stay under the cap",
+    "limit_decreases_total": "Concurrency limit decreases, by sign of overload",
+}
+
+
+class MetricsHook:
+    """Receive metrics as they're recorded.
+
+    Subclass & override either method, then register the hook with
+    `metrics.add_hook`.
+    """
+
+    def count(self, name, value, labels):
+        """Handle a counter increment.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+            value {float} -- Increment
+            labels {dict} -- Metric labels
+        """
+
+    def observe(self, name, value, labels):
+        """Handle a histogram observation.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+            value {float} -- Observed value
+            labels {dict} -- Metric labels
+        """
+
+
+class Histogram:
+    """Cumulative histogram of observed values."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize an empty histogram.
+
+        Keyword Arguments:
+            buckets {tuple} -- Bucket upper bounds, ascending
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record a value.
+
+        Arguments:
+            value {float} -- Observed value
+        """
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class _Timer:
+    """Context manager which observes the time spent in its block."""
+
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        """Set the histogram to observe."""
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        """Start timing."""
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        """Observe the elapsed time."""
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+def _label_key(labels):
+    """Convert labels to a hashable key, in a stable order."""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    """Format labels for the Prometheus text format.
+
+    Arguments:
+        label_key {tuple} -- Label name & value pairs
+
+    Keyword Arguments:
+        extra {tuple} -- Additional label name & value pairs
+
+    Returns:
+        {str} -- Formatted labels, e.g. '{device="router1"}'
+    """
+    pairs = (*label_key, *extra)
+    if not pairs:
+        return ""
+    formatted = ",".join(
+        '{}="{}"'.format(
+            key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for key, value in pairs
+    )
+    return "{" + formatted + "}"
+
+
+def _format_value(value):
+    """Format a number for the Prometheus text format."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Metrics:
+    """Registry of counters & histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize the registry.
+
+        Keyword Arguments:
+            buckets {tuple} -- Histogram bucket upper bounds, in seconds
+        """
+        self.buckets = buckets
+        self.enabled = True
+        self._counters = {}
+        self._histograms = {}
+        self._hooks = []
+
+    def add_hook(self, hook):
+        """Pass metrics to a hook as they're recorded.
+
+        Arguments:
+            hook {object} -- MetricsHook instance
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop passing metrics to a hook.
+
+        Arguments:
+            hook {object} -- MetricsHook instance
+        """
+        self._hooks.remove(hook)
+
+    def reset(self):
+        """Clear all recorded metrics."""
+        self._counters.clear()
+        self._histograms.clear()
+
+    def _call_hooks(self, method, name, value, labels):
+        """Pass a metric to each hook, without letting a hook break a request."""
+        for hook in self._hooks:
+            try:
+                getattr(hook, method)(name, value, labels)
+            except Exception as err:
+                log.error("Metrics hook {!r} failed: {}", hook, err)
+
+    def count(self, name, value=1, **labels):
+        """Increment a counter.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+
+        Keyword Arguments:
+            value {float} -- Increment (default: {1})
+            labels {str} -- Metric labels
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        self._counters[key] = self._counters.get(key, 0) + value
+        if self._hooks:
+            self._call_hooks("count", name, value, labels)
+
+    def observe(self, name, value, **labels):
+        """Record a value in a histogram.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+            value {float} -- Observed value
+
+        Keyword Arguments:
+            labels {str} -- Metric labels
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+        if self._hooks:
+            self._call_hooks("observe", name, value, labels)
+
+    def time(self, device, phase):
+        """Time a phase of a request to a device.
+
+        e.g. `with metrics.time("router1", "commit"): ...`
+
+        Arguments:
+            device {str} -- Device name
+            phase {str} -- Phase name
+
+        Returns:
+            {object} -- Context manager
+        """
+        return _Timer(self, "phase_seconds", {"device": device, "phase": phase})
+
+    def value(self, name, **labels):
+        """Get a counter's value.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+
+        Keyword Arguments:
+            labels {str} -- Metric labels
+
+        Returns:
+            {float} -- Counter value
+        """
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def histogram(self, name, **labels):
+        """Get a histogram.
+
+        Arguments:
+            name {str} -- Metric name, without the `junos_rest_` prefix
+
+        Keyword Arguments:
+            labels {str} -- Metric labels
+
+        Returns:
+            {object|None} -- Histogram, or None if nothing has been observed
+        """
+        return self._histograms.get((name, _label_key(labels)))
+
+    def _header(self, name, metric_type):
+        """Format the HELP & TYPE lines for a metric."""
+        lines = []
+        if name in _HELP:
+            lines.append(f"# HELP {PREFIX}{name} {_HELP[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+        return lines
+
+    def export(self):
+        """Export all metrics in the Prometheus text format.
+
+        Returns:
+            {str} -- Prometheus text exposition
+        """
+        lines = []
+
+        counter_names = sorted({name for name, _ in self._counters})
+        for name in counter_names:
+            lines += self._header(name, "counter")
+            for (metric, label_key), value in sorted(self._counters.items()):
+                if metric == name:
+                    lines.append(
+                        f"{PREFIX}{name}{_format_labels(label_key)} "
+                        f"{_format_value(value)}"
+                    )
+
+        histogram_names = sorted({name for name, _ in self._histograms})
+        for name in histogram_names:
+            lines += self._header(name, "histogram")
+            for (metric, label_key), histogram in sorted(
+                self._histograms.items(), key=lambda item: item[0]
+            ):
+                if metric != name:
+                    continue
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    labels = _format_labels(label_key, (("le", str(bound)),))
+                    lines.append(f"{PREFIX}{name}_bucket{labels} {count}")
+                labels = _format_labels(label_key, (("le", "+Inf"),))
+                lines.append(f"{PREFIX}{name}_bucket{labels} {histogram.count}")
+                labels = _format_labels(label_key)
+                lines.append(
+                    f"{PREFIX}{name}_sum{labels} {_format_value(histogram.sum)}"
+                )
+                lines.append(f"{PREFIX}{name}_count{labels} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -1,11 +1,15 @@
 """Device Validation."""
 # Standard Library Imports
+from typing import List
+from typing import Optional
 from typing import Union
 
 # Third Party Imports
 from pydantic import AnyUrl
 from pydantic import BaseModel
 from pydantic import IPvAnyAddress
+from pydantic import PositiveFloat
+from pydantic import PositiveInt
 from pydantic import SecretStr
 from pydantic import StrictBool
 from pydantic import StrictInt
@@ -21,6 +25,13 @@ class Device(BaseModel):
     username: StrictStr
     password: SecretStr
     ssl: StrictBool = False
+    site: Optional[StrictStr] = None
+    role: Optional[StrictStr] = None
+    tags: List[StrictStr] = []
+    connect_timeout: Optional[PositiveFloat] = None
+    read_timeout: Optional[PositiveFloat] = None
+    commit_timeout: Optional[PositiveFloat] = None
+    max_sessions: Optional[PositiveInt] = None
 
     def url(self):
         """Construct formatted http URL for interacting with device.
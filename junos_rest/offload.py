@@ -0,0 +1,175 @@
+"""Run CPU-bound parsing & serialization off the event loop.
+
+Parsing a large response or serializing a large config can take long
+enough to stall every other in-flight request. Work on payloads larger
+than `thread_threshold` bytes is run in a thread pool, so the event loop
+keeps running between the interpreter's thread switches. Work on payloads
+larger than `process_threshold` bytes, if set, is run in a process pool
+instead, so it runs fully in parallel with the event loop. Small payloads
+are handled inline, since handing them off would cost more than it saves.
+
+Since threads share the interpreter lock, a thread only lets the event
+loop run if the work releases it periodically, as XML parsing does
+between chunks. JSON documents are decoded in a single call, so only the
+process pool keeps the event loop running while they're decoded.
+
+Functions run in the process pool, & their arguments, must be picklable.
+"""
+
+# Standard Library Imports
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Project Imports
+from junos_rest.constants import OFFLOAD_PROCESS_THRESHOLD
+from junos_rest.constants import OFFLOAD_THREAD_THRESHOLD
+from junos_rest.constants import OFFLOAD_WORKERS
+
+
+def estimate_size(value, limit):
+    """Estimate the serialized size of a JSON-like value, up to a limit.
+
+    Stops as soon as the limit is reached, so the cost of estimating is
+    bounded by the limit rather than the size of the value.
+
+    Arguments:
+        value {any} -- JSON-like value
+        limit {int} -- Bytes to stop counting at
+
+    Returns:
+        {int} -- Approximate size in bytes, at most `limit`
+    """
+    size = 0
+    stack = [value]
+    while stack and size < limit:
+        item = stack.pop()
+        if isinstance(item, dict):
+            size += 2 * len(item)
+            for key, child in item.items():
+                size += len(key) + 4
+                stack.append(child)
+        elif isinstance(item, (list, tuple)):
+            size += 2 + len(item)
+            stack.extend(item)
+        elif isinstance(item, str):
+            size += len(item) + 2
+        else:
+            size += 8
+    return min(size, limit)
+
+
+class Offloader:
+    """Run functions inline, in a thread pool, or in a process pool by size."""
+
+    def __init__(
+        self,
+        thread_threshold=OFFLOAD_THREAD_THRESHOLD,
+        process_threshold=OFFLOAD_PROCESS_THRESHOLD,
+        max_workers=OFFLOAD_WORKERS,
+    ):
+        """Initialize the offloader.
+
+        Keyword Arguments:
+            thread_threshold {int} -- Bytes above which work is run in a
+                thread, or None to always run inline
+            process_threshold {int} -- Bytes above which work is run in a
+                process, or None to never use processes
+            max_workers {int} -- Threads & processes in each pool
+        """
+        self._threads = None
+        self._processes = None
+        self.configure(
+            thread_threshold=thread_threshold,
+            process_threshold=process_threshold,
+            max_workers=max_workers,
+        )
+
+    def configure(
+        self,
+        thread_threshold=OFFLOAD_THREAD_THRESHOLD,
+        process_threshold=OFFLOAD_PROCESS_THRESHOLD,
+        max_workers=OFFLOAD_WORKERS,
+    ):
+        """Set the size thresholds & pool sizes.
+
+        Keyword Arguments:
+            thread_threshold {int} -- Bytes above which work is run in a
+                thread, or None to always run inline
+            process_threshold {int} -- Bytes above which work is run in a
+                process, or None to never use processes
+            max_workers {int} -- Threads & processes in each pool
+        """
+        self.shutdown(wait=False)
+        self.thread_threshold = thread_threshold
+        self.process_threshold = process_threshold
+        self.max_workers = max_workers
+
+    @property
+    def threshold(self):
+        """Get the smallest size which is offloaded at all.
+
+        Returns:
+            {int|None} -- Bytes, or None if nothing is offloaded
+        """
+        thresholds = [
+            t for t in (self.thread_threshold, self.process_threshold) if t is not None
+        ]
+        return min(thresholds) if thresholds else None
+
+    def _executor(self, size):
+        """Get the executor for a payload size.
+
+        Arguments:
+            size {int} -- Payload size in bytes
+
+        Returns:
+            {object|None} -- Executor, or None to run inline
+        """
+        if self.process_threshold is not None and size >= self.process_threshold:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._processes
+        if self.thread_threshold is not None and size >= self.thread_threshold:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="junos_rest"
+                )
+            return self._threads
+        return None
+
+    async def run(self, size, func, *args, **kwargs):
+        """Run a function, off the event loop if its payload is large.
+
+        Arguments:
+            size {int} -- Payload size in bytes
+            func {callable} -- Function to run
+
+        Keyword Arguments:
+            args {any} -- Function arguments
+            kwargs {any} -- Function keyword arguments
+
+        Returns:
+            {any} -- Function return value
+        """
+        executor = self._executor(size)
+        if executor is None:
+            return func(*args, **kwargs)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        """Shut down the thread & process pools, if they've been started.
+
+        Keyword Arguments:
+            wait {bool} -- Wait for running work to finish (default: {True})
+        """
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self._threads = None
+        self._processes = None
+
+
+offload = Offloader()
@@ -1,83 +1,319 @@
 """Parsing functions for JunOS XML/HTTP responses."""
 
+# Standard Library Imports
+import re
+from xml.etree.ElementTree import ParseError
+from xml.etree.ElementTree import XMLPullParser
+
 # Third Party Imports
-import xmltodict
-from boltons.iterutils import remap
+import ujson
 
 # Project Imports
 from junos_rest.constants import RESULTS
+from junos_rest.exceptions import JunosRestError
+from junos_rest.offload import offload
 
-_NAMESPACES = {
-    "http://xml.juniper.net/xnm/1.1/xnm:error": "error",
-    "http://xml.juniper.net/xnm/1.1/xnm:token": "token",
-    "http://xml.juniper.net/xnm/1.1/xnm:message": "message",
-    "@http://xml.juniper.net/junos/*/junos:style": "style",
-    "http://xml.juniper.net/xnm/1.1/xnm:line-number": "line-number",
-    "http://xml.juniper.net/xnm/1.1/xnm:column": "column",
-    "http://xml.juniper.net/xnm/1.1/xnm:statement": "statement",
-    "http://xml.juniper.net/xnm/1.1/xnm:edit-path": "edit-path",
-    "http://xml.juniper.net/xnm/1.1/xnm:source-daemon": "source-daemon",
-}
-
-_DELETE_KEYS = ("@xmlns",)
+_RESULTS_START, _RESULTS_END = RESULTS.split("{results}")
+_XML_DECLARATION = b"<?xml"
+_FEED_SIZE = 64 * 1024
+_PART_HEADERS_END = re.compile(rb"\r?\n\r?\n")
 
 
-def _fix_keys(path, key, value):
-    """Replace XML namespace keys with human-readable keys.
+def _local_name(name):
+    """Strip the namespace from an element or attribute name.
 
-    Also deletes unneeded keys. Used by remap function to iterate
-    through a dictionary, is run per-key.
+    e.g. `{http://xml.juniper.net/xnm/1.1/xnm}error` becomes `error`.
     """
-    if key in _NAMESPACES:
-        return _NAMESPACES[key], value
-    elif key in _DELETE_KEYS:
-        return False
-    return key, value
+    if name[0] == "{":
+        return name.rpartition("}")[2]
+    return name
+
+
+def _add_child(children, key, value):
+    """Add a child value, turning repeated keys into lists."""
+    if key not in children:
+        children[key] = value
+    elif isinstance(children[key], list):
+        children[key].append(value)
+    else:
+        children[key] = [children[key], value]
 
 
-def _remap_visit(path, key, value):
-    """Process input dictionary.
+class XMLStreamParser:
+    """Incrementally parse XML into a dict in a single pass.
 
-    Iterate through one level of child dictionaries, and one level of
-    list children.
+    Chunks of raw XML are passed to `feed` as they arrive, & parsed
+    immediately. Namespaces are removed from element & attribute names as
+    each element is parsed. The resulting dict has the same layout as
+    xmltodict's: attributes are prefixed with `@`, text alongside
+    attributes or child elements is under `#text`, repeated elements
+    become lists, & empty elements are None.
+
+    Since JunOS may return several sibling root elements, the input is
+    wrapped in a single `results` root element.
     """
-    if isinstance(value, dict):
-        fixed_value = remap(value, visit=_fix_keys)
-    elif isinstance(value, list):
-        fixed_value = []
-        for item in value:
-            if isinstance(item, dict):
-                fixed_item = remap(item, visit=_fix_keys)
+
+    def __init__(self):
+        """Initialize the parser."""
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._stack = [{}]
+        self._names = {}
+        self._head = b""
+        self._started = False
+        self._parser.feed(_RESULTS_START)
+
+    def _feed_head(self, data):
+        """Buffer the start of the input until any XML declaration is skipped.
+
+        Arguments:
+            data {bytes} -- Raw XML
+
+        Returns:
+            {bytes} -- Data ready to be parsed
+        """
+        self._head += data
+        head = self._head.lstrip()
+        if len(head) < len(_XML_DECLARATION):
+            return b""
+        if head.startswith(_XML_DECLARATION):
+            end = head.find(b"?>")
+            if end == -1:
+                return b""
+            head = head[end + 2 :]
+        self._started = True
+        self._head = b""
+        return head
+
+    def feed(self, data):
+        """Parse a chunk of raw XML.
+
+        Arguments:
+            data {bytes|str} -- Raw XML
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if not self._started:
+            data = self._feed_head(data)
+        if data:
+            self._parser.feed(data)
+            self._process()
+
+    def _local_name(self, name):
+        """Strip the namespace from a name, caching the result.
+
+        Element & attribute names repeat throughout large outputs, so each
+        is only stripped once.
+        """
+        local = self._names.get(name)
+        if local is None:
+            local = self._names[name] = _local_name(name)
+        return local
+
+    def _process(self):
+        """Build the dict from all pending parser events."""
+        stack = self._stack
+        local_name = self._local_name
+        for event, element in self._parser.read_events():
+            if event == "start":
+                stack.append({})
+                continue
+
+            children = stack.pop()
+            for name, attribute in element.attrib.items():
+                children["@" + local_name(name)] = attribute
+
+            text = element.text.strip() if element.text else None
+            if not children:
+                value = text or None
             else:
-                fixed_item = item
-            fixed_value.append(fixed_item)
+                if text:
+                    children["#text"] = text
+                value = children
 
-    if key in _NAMESPACES:
-        fixed_key = _NAMESPACES[key]
-        fixed_value = value
+            _add_child(stack[-1], local_name(element.tag), value)
+            element.clear()
+
+    def close(self):
+        """Finish parsing.
+
+        Returns:
+            {dict} -- Parsed XML
+        """
+        if self._head:
+            self._parser.feed(self._head)
+        self._parser.feed(_RESULTS_END)
+        self._parser.close()
+        self._process()
+        return self._stack[0]
 
-    elif key in _DELETE_KEYS:
-        return False
-    else:
-        fixed_key = key
-        fixed_value = value
 
-    return fixed_key, fixed_value
+def _parse_xml(xml):
+    """Parse raw XML to dict, synchronously.
+
+    Arguments:
+        xml {bytes|str|iterable} -- Raw XML, or an iterable of raw XML chunks
+
+    Returns:
+        {dict} -- XML as parsed dict, wrapped in a `results` key
+    """
+    parser = XMLStreamParser()
+    if isinstance(xml, (bytes, str)):
+        # Feed large documents in slices, so that when parsing in a thread,
+        # the event loop's thread gets to run between them.
+        for start in range(0, len(xml), _FEED_SIZE):
+            parser.feed(xml[start : start + _FEED_SIZE])
+    else:
+        for chunk in xml:
+            parser.feed(chunk)
+    return parser.close()
 
 
 async def parse_xml(xml):
-    """Parse raw XML string to dict.
+    """Parse raw XML to dict.
+
+    Large documents are parsed off the event loop, see `junos_rest.offload`.
+
+    Arguments:
+        xml {bytes|str|iterable} -- Raw XML, or an iterable of raw XML chunks
+
+    Returns:
+        {dict} -- XML as parsed dict, wrapped in a `results` key
+    """
+    if isinstance(xml, (bytes, str)):
+        return await offload.run(len(xml), _parse_xml, xml)
+    return _parse_xml(xml)
+
+
+def _strip_declaration(xml):
+    """Strip the XML declaration from the start of a document, if it has one.
+
+    Arguments:
+        xml {bytes} -- Raw XML
+
+    Returns:
+        {bytes} -- Raw XML without a declaration
+    """
+    stripped = xml.lstrip()
+    if stripped.startswith(_XML_DECLARATION):
+        end = stripped.find(b"?>")
+        if end != -1:
+            return stripped[end + 2 :]
+    return xml
+
+
+def _response_xml(response):
+    """Get the XML from a response, joining the parts of multipart responses.
+
+    Arguments:
+        response {object} -- Raw httpx response object
+
+    Returns:
+        {bytes} -- Raw XML
+    """
+    content = response.content
+    media_type, params = _parse_header(response.headers.get("content-type", ""))
+    if media_type.startswith("multipart/") and "boundary" in params:
+        # Several RPCs' output, one per part. Parse them as one document,
+        # which may only have a declaration at its start.
+        parts = _split_multipart(content, params["boundary"])
+        content = b"".join(_strip_declaration(part) for _, part in parts)
+    return content
+
+
+def _engines(commit_results):
+    """Get each routing engine's commit results.
+
+    Devices with two routing engines report results for each, as a list.
+    """
+    engines = commit_results.get("routing-engine") or []
+    if isinstance(engines, list):
+        return engines
+    return [engines]
+
+
+def _results_error(result, commit_results, load_results):
+    """Find an error in the results of loading or committing a config.
+
+    Arguments:
+        result {dict} -- Parsed results
+        commit_results {dict} -- Parsed `commit-results`
+        load_results {dict} -- Parsed `load-configuration-results`
+
+    Returns:
+        {any} -- Error details, or None
+    """
+    engines = _engines(commit_results)
+    return (
+        result.get("error")
+        or commit_results.get("error")
+        or load_results.get("error")
+        or next(
+            (e["error"] for e in engines if isinstance(e, dict) and "error" in e), None
+        )
+    )
+
+
+def _error_output(error):
+    """Build a result dict for an error.
+
+    Arguments:
+        error {any} -- Error details, e.g. from `_results_error`
+
+    Returns:
+        {dict} -- Constructed results dict
+    """
+    if isinstance(error, list) and len(error) == 2:
+        details, messages = error
+    elif isinstance(error, list):
+        details = messages = error[-1] if error else None
+    else:
+        details = messages = error
+
+    if isinstance(messages, dict):
+        return {"status": "fail", "data": messages.get("message"), "detail": details}
+    return {"status": "fail", "data": "An unknown error occured", "detail": []}
+
+
+def _committed(commit_results):
+    """Check whether every routing engine committed successfully.
 
     Arguments:
-        xml {str} -- Raw XML
+        commit_results {dict} -- Parsed `commit-results`
 
     Returns:
-        {dict} -- XML as parsed dict
+        {bool} -- True if the config was committed
     """
-    parsed = xmltodict.parse(xml, dict_constructor=dict, process_namespaces=True)
-    mapped = remap(parsed, visit=_remap_visit)
+    return all(
+        engine.get("commit-success") is None
+        for engine in _engines(commit_results)
+        if isinstance(engine, dict)
+    )
 
-    return mapped
+
+def _status_output(response, result):
+    """Build a result dict for a response without an error.
+
+    Arguments:
+        response {object} -- Raw httpx response object
+        result {dict} -- Parsed results
+
+    Returns:
+        {dict} -- Constructed results dict
+    """
+    status = response.status_code
+    text = response.text.strip()
+
+    if status == 200 and "commit-results" in result:
+        if _committed(result["commit-results"] or {}):
+            return {"status": "success", "data": None}
+    elif status == 200 and "load-configuration-results" in result:
+        load_results = result["load-configuration-results"] or {}
+        if load_results.get("load-success", 1) is None:
+            return {"status": "success", "data": None}
+    elif status in range(200, 300) and not text:
+        return {"status": "success", "data": None}
+
+    return {"status": "error", "message": text or f"Unexpected response ({status})"}
 
 
 async def parse_results(response):
@@ -86,46 +322,178 @@ async def parse_results(response):
     Arguments:
         response {object} -- Raw httpx response object
 
+    Raises:
+        JunosRestError: Raised if the response is unable to be parsed
+
     Returns:
         {dict} -- Constructed results dict
     """
-    parsed = await parse_xml(xml=RESULTS.format(results=response.content))
-    status = response.status_code
+    try:
+        parsed = await parse_xml(xml=_response_xml(response))
+    except (ValueError, ParseError) as err:
+        raise JunosRestError("Unable to parse RPC output: {e}", e=str(err))
+
     result = parsed.get("results")
+    if not isinstance(result, dict):
+        # Empty or plain text output.
+        result = {}
 
-    if "error" in result or "error" in result.get("commit-results", {}):
-        error = result.get("error") or result["commit-results"].get("error")
+    commit_results = result.get("commit-results") or {}
+    load_results = result.get("load-configuration-results") or {}
+    error = _results_error(result, commit_results, load_results)
+    if error is not None:
+        return _error_output(error)
+    return _status_output(response, result)
 
-        if error is not None:
-            details, messages = error
-            output = {"status": "fail", "data": messages["message"], "detail": details}
+
+def _parse_header(value):
+    """Split a header like Content-Type into its value & parameters.
+
+    Arguments:
+        value {str} -- Header value, e.g. 'multipart/mixed; boundary=abc'
+
+    Returns:
+        {tuple} -- Lowercase value, dict of parameters
+    """
+    main, *params = value.split(";")
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parsed[key.strip().lower()] = param_value.strip().strip('"')
+    return main.strip().lower(), parsed
+
+
+def _split_multipart(body, boundary):
+    """Split a multipart body into its parts.
+
+    Arguments:
+        body {bytes} -- Multipart body
+        boundary {str} -- Part boundary
+
+    Yields:
+        {tuple} -- Each part's Content-Type & content
+    """
+    delimiter = b"--" + boundary.encode()
+    for section in body.split(delimiter)[1:]:
+        if section.startswith(b"--"):
+            break
+        # Skip the remainder of the delimiter line.
+        section = section[section.find(b"\n") + 1 :]
+        headers_end = _PART_HEADERS_END.search(section)
+        if headers_end is None:
+            headers, content = section, b""
         else:
-            output = {
-                "status": "fail",
-                "data": "An unknown error occured",
-                "detail": [],
-            }
-
-    elif (
-        status == 200
-        and "commit-results" not in result
-        and "load-configuration-results" in result
-    ):
-        load_success = result["load-configuration-results"].get("load-success", 1)
-        if load_success is None:
-            output = {"status": "success", "data": None}
-        elif load_success == 1:
-            output = {"status": "error", "message": response.text.strip()}
-    elif (
-        status == 200
-        and result["commit-results"]["routing-engine"].get("commit-success") is None
-    ):
-        output = {"status": "success", "data": None}
-
-    elif status in range(200, 300) and not response.text:
-        output = {"status": "success", "data": None}
-
-    elif status in range(400, 600):
-        output = {"status": "error", "message": response.text}
-
-    return output
+            headers = section[: headers_end.start()]
+            content = section[headers_end.end() :]
+
+        content_type = "text/plain"
+        for line in headers.decode(errors="replace").splitlines():
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-type":
+                content_type = value.strip()
+
+        if content.endswith(b"\r\n"):
+            content = content[:-2]
+        elif content.endswith(b"\n"):
+            content = content[:-1]
+        yield content_type, content
+
+
+async def _parse_part(content_type, content):
+    """Parse a single RPC's output, according to its Content-Type.
+
+    Arguments:
+        content_type {str} -- Content-Type of the output
+        content {bytes} -- Raw output
+
+    Returns:
+        {any} -- Parsed output
+    """
+    media_type, _ = _parse_header(content_type)
+    if not content.strip():
+        return None
+    if media_type.endswith("json"):
+        return await offload.run(len(content), ujson.loads, content)
+    if media_type.endswith("xml"):
+        parsed = await parse_xml(xml=content)
+        return parsed.get("results")
+    return content.decode(errors="replace").strip()
+
+
+def _find_error(output):
+    """Find an RPC error, either at the top level or under the output's root.
+
+    e.g. errors from `commit-configuration` are under `commit-results`.
+
+    Arguments:
+        output {any} -- Parsed output
+
+    Returns:
+        {any} -- Error details, or None
+    """
+    if not isinstance(output, dict):
+        return None
+    if "error" in output:
+        return output["error"]
+    for value in output.values():
+        if isinstance(value, list) and value:
+            value = value[0]
+        if isinstance(value, dict) and "error" in value:
+            return value["error"]
+    return None
+
+
+def _rpc_result(output):
+    """Build a result dict for a single RPC's parsed output.
+
+    Arguments:
+        output {any} -- Parsed output
+
+    Returns:
+        {dict} -- Constructed result dict
+    """
+    details = _find_error(output)
+    if details is not None:
+        error = details[0] if isinstance(details, list) else details
+        message = error.get("message") if isinstance(error, dict) else error
+        return {"status": "fail", "data": message, "detail": details}
+    return {"status": "success", "data": output}
+
+
+async def parse_batch(response, count):
+    """Demultiplex the response to several RPCs into per-RPC results.
+
+    JunOS replies to several RPCs with a multipart/mixed response, with one
+    part per RPC, in order. A single RPC's output is returned as-is.
+
+    Arguments:
+        response {object} -- Raw httpx response object
+        count {int} -- Number of RPCs sent
+
+    Raises:
+        JunosRestError: Raised if an RPC's output is unable to be parsed
+
+    Returns:
+        {list} -- Result dict for each RPC, in order. RPCs which were not
+            run, due to an earlier error, have the status 'skipped'
+    """
+    content_type = response.headers.get("content-type", "text/plain")
+    media_type, params = _parse_header(content_type)
+
+    if media_type.startswith("multipart/") and "boundary" in params:
+        parts = _split_multipart(response.content, params["boundary"])
+    else:
+        parts = [(content_type, response.content)]
+
+    results = []
+    for part_type, content in parts:
+        try:
+            output = await _parse_part(part_type, content)
+        except (ValueError, ParseError) as err:
+            raise JunosRestError("Unable to parse RPC output: {e}", e=str(err))
+        results.append(_rpc_result(output))
+
+    results += [
+        {"status": "skipped", "data": None} for _ in range(count - len(results))
+    ]
+    return results
@@ -0,0 +1,245 @@
+"""Persistent, per-device connection management."""
+
+# Standard Library Imports
+import asyncio
+import time
+from collections import OrderedDict
+
+# Third Party Imports
+import httpx
+
+# Project Imports
+from junos_rest.connection import Connection
+from junos_rest.constants import POOL_HARD_LIMIT
+from junos_rest.constants import POOL_IDLE_TIMEOUT
+from junos_rest.constants import POOL_SOFT_LIMIT
+from junos_rest.health import health
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+
+
+class _PooledSession:
+    """Async context manager which borrows a pooled connection."""
+
+    def __init__(self, pool, device):
+        """Set the pool & device to borrow a connection for."""
+        self.pool = pool
+        self.device = device
+
+    async def __aenter__(self):
+        """Acquire the device's connection.
+
+        Returns:
+            {object} -- Connection
+        """
+        return await self.pool.acquire(self.device)
+
+    async def __aexit__(self, *args):
+        """Release the device's connection back to the pool."""
+        self.pool.release(self.device)
+
+
+class ConnectionPool:
+    """Hand out warm, keep-alive connections keyed by device name.
+
+    Idle connections are ordered by when they were last used, & a
+    background task closes each one once it has been idle for
+    `idle_timeout` seconds. The task only runs while there are idle
+    connections.
+    """
+
+    def __init__(
+        self,
+        soft_limit=POOL_SOFT_LIMIT,
+        hard_limit=POOL_HARD_LIMIT,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+    ):
+        """Initialize the connection pool.
+
+        Keyword Arguments:
+            soft_limit {int} -- Keep-alive connections per device
+            hard_limit {int} -- Maximum connections per device
+            idle_timeout {int} -- Seconds before an idle connection is closed
+        """
+        self._connections = {}
+        self._last_used = OrderedDict()
+        self._active = {}
+        self._locks = {}
+        self._sweeper = None
+        self.configure(
+            soft_limit=soft_limit, hard_limit=hard_limit, idle_timeout=idle_timeout
+        )
+
+    def configure(
+        self,
+        soft_limit=POOL_SOFT_LIMIT,
+        hard_limit=POOL_HARD_LIMIT,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+    ):
+        """Set the pool's limits. Applies to newly opened connections.
+
+        Keyword Arguments:
+            soft_limit {int} -- Keep-alive connections per device
+            hard_limit {int} -- Maximum connections per device
+            idle_timeout {int} -- Seconds before an idle connection is closed
+        """
+        self.idle_timeout = idle_timeout
+        self.pool_limits = httpx.PoolLimits(
+            soft_limit=soft_limit, hard_limit=hard_limit
+        )
+
+    async def __aenter__(self):
+        """Enter the pool's async context.
+
+        Returns:
+            {object} -- Connection pool
+        """
+        return self
+
+    async def __aexit__(self, *args):
+        """Close all pooled connections when leaving the async context."""
+        await self.close()
+
+    def __contains__(self, device_name):
+        """Determine if an open connection exists for a device."""
+        return device_name in self._connections
+
+    def __len__(self):
+        """Return the number of pooled connections."""
+        return len(self._connections)
+
+    async def _connect(self, device):
+        """Get or open the connection for a device.
+
+        Only one connection attempt per device is made at a time, so
+        concurrent callers wait on & share the same new connection.
+
+        Arguments:
+            device {object} -- Device object
+
+        Returns:
+            {object} -- Connection
+        """
+        name = device.name
+        lock = self._locks.setdefault(name, asyncio.Lock())
+
+        async with lock:
+            connection = self._connections.get(name)
+
+            if connection is not None and (
+                connection.is_closed or connection.device != device
+            ):
+                await self._discard(name)
+                connection = None
+
+            if connection is None:
+                metrics.count("pool_misses_total", device=name)
+                with metrics.time(name, "connect"):
+                    connection = await Connection.new(
+                        device=device, pool_limits=self.pool_limits
+                    )
+                self._connections[name] = connection
+                log.debug("Added '{}' to connection pool", name)
+            else:
+                metrics.count("pool_hits_total", device=name)
+
+        return connection
+
+    async def _discard(self, device_name):
+        """Remove a device's connection from the pool & close it.
+
+        Arguments:
+            device_name {str} -- Device name
+        """
+        connection = self._connections.pop(device_name, None)
+        self._last_used.pop(device_name, None)
+
+        if connection is not None and not connection.is_closed:
+            await connection.close()
+
+    async def acquire(self, device):
+        """Get a device's connection & mark it as in use.
+
+        Every call must be paired with a call to `release`.
+
+        Arguments:
+            device {object} -- Device object
+
+        Raises:
+            JunosRestError: Raised if the device is known to be unhealthy
+
+        Returns:
+            {object} -- Connection
+        """
+        await health.check(device)
+
+        connection = await self._connect(device)
+        self._active[device.name] = self._active.get(device.name, 0) + 1
+        self._last_used.pop(device.name, None)
+        return connection
+
+    def release(self, device):
+        """Mark one use of a device's connection as finished.
+
+        Once a connection has no uses left, it's idle, & is closed if it
+        isn't used again within the idle timeout.
+
+        Arguments:
+            device {object} -- Device object
+        """
+        name = device.name
+        self._active[name] -= 1
+        if self._active[name] or name not in self._connections:
+            return
+
+        self._last_used[name] = time.monotonic()
+        self._last_used.move_to_end(name)
+        if self._sweeper is None:
+            self._sweeper = asyncio.ensure_future(self._sweep())
+
+    def session(self, device):
+        """Borrow a device's connection for the duration of an async context.
+
+        Arguments:
+            device {object} -- Device object
+
+        Returns:
+            {object} -- Async context manager yielding the connection
+        """
+        return _PooledSession(self, device)
+
+    async def evict_idle(self):
+        """Close connections which have not been used within the idle timeout.
+
+        Connections with in-flight requests are never evicted. Only the
+        expired connections are visited, oldest first.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        while self._last_used:
+            name, last_used = next(iter(self._last_used.items()))
+            if last_used >= deadline:
+                break
+            log.debug("Evicting idle connection to '{}'", name)
+            await self._discard(name)
+
+    async def _sweep(self):
+        """Evict each idle connection when it expires, until none are idle."""
+        try:
+            while self._last_used:
+                oldest = next(iter(self._last_used.values()))
+                delay = oldest + self.idle_timeout - time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+                await self.evict_idle()
+        finally:
+            self._sweeper = None
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for name in list(self._connections):
+            await self._discard(name)
+
+
+pool = ConnectionPool()
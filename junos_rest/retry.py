@@ -0,0 +1,96 @@
+"""Deadlines & retries for requests to JunOS devices.
+
+Only idempotent requests, like GETs & operational RPCs, are ever retried,
+since a request which timed out may still have been applied by the device.
+Retries are spaced out with jittered exponential backoff, so devices
+recovering from a blip aren't hit by every waiting request at once, & are
+abandoned once an operation's deadline would be exceeded.
+"""
+
+# Standard Library Imports
+import random
+import time
+
+# Third Party Imports
+import httpx
+from httpx.exceptions import NetworkError
+
+# Project Imports
+from junos_rest.constants import RETRY_BASE_DELAY
+from junos_rest.constants import RETRY_MAX_DELAY
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class Deadline:
+    """Time budget shared by every request made for an operation."""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, budget=None):
+        """Start the deadline.
+
+        Keyword Arguments:
+            budget {float} -- Seconds until the deadline, or None for no
+                deadline (default: {None})
+        """
+        self.expires = None if budget is None else time.monotonic() + budget
+
+    def remaining(self):
+        """Get the time left before the deadline.
+
+        Returns:
+            {float|None} -- Seconds remaining, or None if there's no deadline
+        """
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0)
+
+    @property
+    def expired(self):
+        """Determine if the deadline has passed."""
+        return self.remaining() == 0
+
+    def limit(self, timeout):
+        """Shorten a timeout so it doesn't extend past the deadline.
+
+        Arguments:
+            timeout {float} -- Seconds
+
+        Returns:
+            {float} -- Seconds
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
+
+
+def backoff(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Get the delay before a retry, with full jitter.
+
+    Arguments:
+        attempt {int} -- Number of attempts made so far, starting at 1
+
+    Keyword Arguments:
+        base_delay {float} -- Seconds, doubled for each attempt
+        max_delay {float} -- Maximum seconds
+
+    Returns:
+        {float} -- Seconds to wait
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+def is_transient(error):
+    """Determine if a request error is likely to succeed if retried.
+
+    Arguments:
+        error {Exception} -- Error raised by the request
+
+    Returns:
+        {bool} -- True if the error is transient
+    """
+    return isinstance(
+        error, (httpx.TimeoutException, NetworkError, ConnectionError, TimeoutError)
+    )
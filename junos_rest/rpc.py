@@ -0,0 +1,99 @@
+"""Build JunOS RPC invocations."""
+
+# Standard Library Imports
+from xml.sax.saxutils import escape
+
+
+def build_rpc(name, **args):
+    """Build the XML for an RPC invocation.
+
+    Argument names use underscores in place of hyphens, e.g.
+    `build_rpc("get-interface-information", interface_name="ge-0/0/0",
+    terse=True)`. Arguments set to True become empty elements, & arguments
+    set to False or None are left out.
+
+    Arguments:
+        name {str} -- RPC name, e.g. 'get-interface-information'
+
+    Keyword Arguments:
+        args {any} -- RPC arguments
+
+    Returns:
+        {str} -- RPC XML
+    """
+    elements = []
+    for key, value in args.items():
+        tag = key.replace("_", "-")
+        if value is True:
+            elements.append(f"<{tag}/>")
+        elif value is not None and value is not False:
+            elements.append(f"<{tag}>{escape(str(value))}</{tag}>")
+
+    if not elements:
+        return f"<{name}/>"
+    return "<{name}>{args}</{name}>".format(name=name, args="".join(elements))
+
+
+def as_rpc(rpc):
+    """Get the XML for an RPC given either as XML or as a bare RPC name.
+
+    Arguments:
+        rpc {str} -- RPC XML, or an RPC name with no arguments
+
+    Returns:
+        {str} -- RPC XML
+    """
+    rpc = rpc.strip()
+    if rpc.startswith("<"):
+        return rpc
+    return build_rpc(rpc)
+
+
+def _filter_tree(paths):
+    """Combine config paths into a tree of keys.
+
+    A path ending at a key covers everything under it, so other paths
+    under the same key are dropped.
+    """
+    tree = {}
+    for path in paths:
+        keys = path.split("/") if isinstance(path, str) else path
+        keys = [key for key in keys if key]
+        node = tree
+        for i, key in enumerate(keys):
+            if i == len(keys) - 1:
+                node[key] = None
+            elif key in node and node[key] is None:
+                break
+            else:
+                node = node.setdefault(key, {})
+    return tree
+
+
+def _filter_xml(tree):
+    """Build the XML for a tree of config keys."""
+    return "".join(
+        f"<{key}/>" if children is None else f"<{key}>{_filter_xml(children)}</{key}>"
+        for key, children in tree.items()
+    )
+
+
+def config_filter(paths):
+    """Build a `get-configuration` RPC for only some hierarchies of a config.
+
+    e.g. `config_filter(["system/time-zone", "interfaces"])` gets only
+    the time zone & the interfaces, as JSON.
+
+    Arguments:
+        paths {list} -- Hierarchies to get, each as keys separated by '/',
+            or as a tuple of keys
+
+    Returns:
+        {str} -- RPC XML
+    """
+    config = _filter_xml(_filter_tree(paths))
+    return (
+        '<get-configuration format="json">'
+        f"<configuration>{config}</configuration>"
+        "</get-configuration>"
+    )
@@ -0,0 +1,122 @@
+"""Per-device running configuration cache."""
+
+# Third Party Imports
+import ujson
+
+# Project Imports
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+
+
+def _first(value):
+    """Unwrap the single-element lists JunOS wraps JSON values in.
+
+    Arguments:
+        value {any} -- JunOS JSON value
+
+    Returns:
+        {any} -- First element if value is a list, otherwise value
+    """
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def commit_marker(commit_information):
+    """Get a marker which changes whenever a device's config is committed.
+
+    Arguments:
+        commit_information {dict} -- Parsed `get-commit-information` output
+
+    Returns:
+        {str|None} -- Latest commit details, or None if there are none
+    """
+    info = _first(commit_information.get("commit-information")) or {}
+    latest = _first(info.get("commit-history"))
+    if not latest:
+        return None
+    return ujson.dumps(latest, sort_keys=True)
+
+
+class RunningConfigCache:
+    """Cache each device's running config until the next commit.
+
+    Before a cached config is used, the device's latest commit is checked
+    with the much cheaper `get-commit-information` RPC. The config is only
+    fetched again if there's been a commit since it was cached.
+
+    Only the top-level hierarchies a change touches need to be compared,
+    so only those hierarchies are fetched, & cached. Hierarchies which
+    aren't cached yet are fetched as they're needed.
+    """
+
+    def __init__(self):
+        """Initialize the cache."""
+        self._configs = {}
+
+    def __contains__(self, device_name):
+        """Determine if a device has a cached config."""
+        return device_name in self._configs
+
+    def invalidate(self, device_name):
+        """Drop a device's cached config.
+
+        Arguments:
+            device_name {str} -- Device name
+        """
+        self._configs.pop(device_name, None)
+
+    async def get(self, session, hierarchies=None, deadline=None):
+        """Get a device's running config, from the cache if it's current.
+
+        Arguments:
+            session {object} -- Device connection
+
+        Keyword Arguments:
+            hierarchies {list} -- Top-level hierarchies needed, e.g.
+                ['system', 'interfaces'], or None for the whole config
+                (default: {None})
+            deadline {object} -- Operation deadline (default: {None})
+
+        Returns:
+            {dict} -- Running config, without top-level attributes. Other
+                hierarchies may be included, if they're cached.
+        """
+        name = session.device.name
+        marker = commit_marker(
+            await session.get(item="get-commit-information", deadline=deadline)
+        )
+
+        cached = self._configs.get(name)
+        if cached is None or marker is None or cached[0] != marker:
+            cached = (marker, {}, set())
+        # Hierarchies cached, or None if the whole config is.
+        _, config, fetched = cached
+
+        # Hierarchies to fetch, or None for the whole config.
+        if fetched is None:
+            missing = []
+        elif hierarchies is None:
+            missing = None
+        else:
+            missing = [key for key in hierarchies if key not in fetched]
+        if missing == []:
+            log.debug("Using cached running config for '{}'", name)
+            return {"configuration": config}
+
+        with metrics.time(name, "get_config"):
+            current_config = await session.get_config(missing, deadline=deadline)
+        # There may be no `configuration` if none of the hierarchies exist.
+        current = current_config.get("configuration") or {}
+        current.pop("@", None)
+
+        if missing is None:
+            config, fetched = current, None
+        else:
+            config = {**config, **current}
+            fetched = fetched | set(missing)
+        self._configs[name] = (marker, config, fetched)
+        return {"configuration": config}
+
+
+running_configs = RunningConfigCache()
@@ -0,0 +1,287 @@
+"""Per-device commit scheduling.
+
+Each commit locks a device's config & can take several seconds, so
+concurrent pushes to the same device would otherwise collide on the
+config lock, or wait on each other's commits. Instead, pushes to a device
+are queued, & the configs queued within a short window are combined &
+loaded with a single commit.
+
+Configs are combined in the order they were queued. If a config conflicts
+with those before it, e.g. by setting the same value differently, it &
+every config queued after it are deferred to the next commit, so later
+configs still take precedence over earlier ones.
+"""
+
+# Standard Library Imports
+import asyncio
+
+# Project Imports
+from junos_rest.body import bodies
+from junos_rest.cache import cache
+from junos_rest.constants import COMMIT_WINDOW
+from junos_rest.constants import CONFIG_JSON
+from junos_rest.constants import CONFIG_SET
+from junos_rest.constants import OPERATION_DEADLINE
+from junos_rest.diff import combine_configs
+from junos_rest.diff import config_delta
+from junos_rest.exceptions import JunosRestError
+from junos_rest.log import log
+from junos_rest.metrics import metrics
+from junos_rest.pool import pool
+from junos_rest.retry import Deadline
+from junos_rest.running import running_configs
+from junos_rest.util import find_device
+
+
+async def push_config(
+    device_name, config_data, action="merge", deadline=OPERATION_DEADLINE
+):
+    """Send an already built configuration to a device, immediately.
+
+    Only the difference between the device's running config & the new
+    configuration is sent. If there is no difference, nothing is sent.
+
+    Arguments:
+        device_name {str} -- Device Name
+        config_data {dict} -- Wrapped configuration
+
+    Keyword Arguments:
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        deadline {float} -- Seconds the whole push may take, including
+            retries, or None for no deadline (default: {OPERATION_DEADLINE})
+
+    Returns:
+        {dict} -- Response Details, with the change sent under `delta`
+    """
+    deadline = Deadline(deadline)
+    device = await find_device(device_name=device_name)
+
+    async with pool.session(device) as session:
+        hierarchies = list(config_data.get("configuration", {}))
+        current_config = await running_configs.get(
+            session, hierarchies=hierarchies, deadline=deadline
+        )
+
+        delta = config_delta(current_config, config_data, action=action)
+        if delta is None:
+            return {"status": "success", "data": None, "changed": False}
+
+        template = CONFIG_SET if action == "set" else CONFIG_JSON
+        with metrics.time(device_name, "serialize"):
+            data, headers = await bodies.build(template, delta, action)
+
+        running_configs.invalidate(device_name)
+        cache.invalidate(device_name)
+        with metrics.time(device_name, "commit"):
+            result = await session.post(
+                data=data, headers=headers, commit=True, deadline=deadline
+            )
+    return {**result, "delta": delta}
+
+
+class _Pending:
+    """A queued configuration, & the future its result is set on."""
+
+    __slots__ = ("config", "action", "future", "deadline", "conflicts")
+
+    def __init__(self, config, action, future, deadline):
+        """Set the queued configuration."""
+        self.config = config
+        self.action = action
+        self.future = future
+        self.deadline = deadline
+        self.conflicts = []
+
+
+def _next_batch(pending):
+    """Combine as many queued configs as possible, in order.
+
+    Arguments:
+        pending {list} -- Queued configs, in order
+
+    Returns:
+        {tuple} -- Combined config, configs in the batch, deferred configs
+    """
+    first = pending[0]
+    combined = first.config
+
+    for i, item in enumerate(pending[1:], start=1):
+        if item.action != first.action:
+            return combined, pending[:i], pending[i:]
+        merged, conflicts = combine_configs(combined, item.config, first.action)
+        if conflicts:
+            item.conflicts = conflicts
+            return combined, pending[:i], pending[i:]
+        combined = merged
+
+    return combined, pending, []
+
+
+def _remaining(batch):
+    """Get the time left before the earliest deadline of any config in a batch.
+
+    Arguments:
+        batch {list} -- Queued configs
+
+    Returns:
+        {float|None} -- Seconds remaining, or None if there's no deadline
+    """
+    remaining = [item.deadline.remaining() for item in batch]
+    remaining = [seconds for seconds in remaining if seconds is not None]
+    return min(remaining) if remaining else None
+
+
+def _fail(pending, err):
+    """Give each queued config that's still waiting an error.
+
+    Arguments:
+        pending {list} -- Queued configs
+        err {Exception} -- Error
+    """
+    for item in pending:
+        if not item.future.done():
+            item.future.set_exception(err)
+
+
+class CommitScheduler:
+    """Serialize & coalesce configuration pushes to each device."""
+
+    def __init__(self, window=COMMIT_WINDOW):
+        """Initialize the scheduler.
+
+        Keyword Arguments:
+            window {float} -- Seconds to wait for more configs before each
+                commit (default: {COMMIT_WINDOW})
+        """
+        self.window = window
+        self._queues = {}
+        self._workers = {}
+
+    def __len__(self):
+        """Get the number of queued configs."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def submit(
+        self, device_name, config_data, action="merge", deadline=OPERATION_DEADLINE
+    ):
+        """Queue a configuration for a device, & wait for it to be committed.
+
+        The deadline starts when the configuration is queued, & a commit
+        which includes several configurations is bounded by the earliest of
+        their deadlines.
+
+        Arguments:
+            device_name {str} -- Device Name
+            config_data {dict} -- Wrapped configuration
+
+        Keyword Arguments:
+            action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+            deadline {float} -- Seconds the whole push may take, including
+                time spent queued & retries, or None for no deadline
+                (default: {OPERATION_DEADLINE})
+
+        Returns:
+            {dict} -- Response Details for the commit which included this
+                configuration, with the number of configs it included under
+                `coalesced`. If the configuration was deferred due to a
+                conflict, the conflicting paths are under `conflicts`.
+        """
+        future = asyncio.get_event_loop().create_future()
+        item = _Pending(config_data, action, future, Deadline(deadline))
+        queue = self._queues.setdefault(device_name, [])
+        queue.append(item)
+
+        if device_name not in self._workers:
+            self._workers[device_name] = asyncio.ensure_future(self._run(device_name))
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            queue = self._queues.get(device_name, [])
+            if item in queue:
+                queue.remove(item)
+            raise
+
+    async def _run(self, device_name):
+        """Commit a device's queued configs until its queue is empty.
+
+        Arguments:
+            device_name {str} -- Device Name
+        """
+        try:
+            while self._queues.get(device_name):
+                await asyncio.sleep(self.window)
+
+                pending = self._queues.pop(device_name, [])
+                if not pending:
+                    continue
+                try:
+                    await self._commit_next(device_name, pending)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as err:
+                    # Nothing queued can be committed in order once a batch
+                    # fails to be built, so every waiting caller gets the error.
+                    log.exception("'{}': Unable to commit queued configs", device_name)
+                    _fail(pending + self._queues.pop(device_name, []), err)
+        finally:
+            self._workers.pop(device_name, None)
+
+    async def _commit_next(self, device_name, pending):
+        """Commit the next batch of a device's queued configs.
+
+        Configs whose deadline passed while they were queued are dropped.
+        Configs deferred from the batch are queued again, ahead of any
+        configs queued since.
+
+        Arguments:
+            device_name {str} -- Device Name
+            pending {list} -- Queued configs, in order
+        """
+        expired = [item for item in pending if item.deadline.expired]
+        if expired:
+            _fail(
+                expired,
+                JunosRestError("Deadline exceeded for {d}", status=504, d=device_name),
+            )
+            pending = [item for item in pending if item not in expired]
+            if not pending:
+                return
+
+        combined, batch, deferred = _next_batch(pending)
+        if deferred:
+            later = self._queues.get(device_name, [])
+            self._queues[device_name] = deferred + later
+
+        log.debug("Committing {} config(s) to '{}'", len(batch), device_name)
+        await self._commit(device_name, combined, batch)
+
+    async def _commit(self, device_name, combined, batch):
+        """Push a combined config, & give each caller in the batch the result.
+
+        Arguments:
+            device_name {str} -- Device Name
+            combined {dict} -- Combined configuration
+            batch {list} -- Queued configs included in the combined config
+        """
+        try:
+            result = await push_config(
+                device_name=device_name,
+                config_data=combined,
+                action=batch[0].action,
+                deadline=_remaining(batch),
+            )
+        except Exception as err:
+            _fail(batch, err)
+            return
+
+        for item in batch:
+            if item.future.done():
+                continue
+            item_result = {**result, "coalesced": len(batch)}
+            if item.conflicts:
+                item_result["conflicts"] = item.conflicts
+            item.future.set_result(item_result)
+
+
+scheduler = CommitScheduler()
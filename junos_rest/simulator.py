@@ -0,0 +1,757 @@
+"""Simulate JunOS devices' REST API locally, for testing & benchmarks.
+
+Each simulated device listens on its own port & implements enough of the
+JunOS REST API for every junos_rest operation:
+
+    GET  /rpc/<rpc>     Run a single RPC, with arguments as query parameters
+    POST /rpc           Run one or more RPCs. Several RPCs are answered
+                        with one multipart/mixed part per RPC
+
+The configuration RPCs (`get-configuration`, `lock-configuration`,
+`load-configuration`, `commit-configuration`, `rollback-configuration` &
+`unlock-configuration`) change the device's simulated configuration, &
+`get-commit-information` reports its commit history. `get-configuration`
+accepts a `<configuration>` filter, to get only some hierarchies. Other
+RPCs return canned output set with `responses`, & fail like an unknown
+RPC otherwise.
+
+Configurations loaded as `set` statements are applied literally, without
+a schema, e.g. `set system host-name r1` is stored as
+`{"system": {"host-name": "r1"}}`.
+
+Latency, commit duration, errors & connection limits are configurable, so
+junos_rest's behavior under load & failure can be measured with no network:
+
+    async with Simulator(devices=10, latency=0.01) as simulator:
+        Path("junos_rest.yaml").write_text(simulator.inventory())
+"""
+
+# Standard Library Imports
+import asyncio
+import copy
+import gzip
+import json
+import random
+import shlex
+import time
+import uuid
+from urllib.parse import parse_qsl
+from urllib.parse import unquote
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+# Project Imports
+from junos_rest.log import log
+
+XNM = "http://xml.juniper.net/xnm/1.1/xnm"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class RPCError(Exception):
+    """Error returned to the client as an `xnm:error` element."""
+
+
+def _xnm_error(message):
+    """Format an RPC error.
+
+    Arguments:
+        message {str} -- Error message
+
+    Returns:
+        {str} -- xnm:error XML
+    """
+    return (
+        f'<xnm:error xmlns="{XNM}" xmlns:xnm="{XNM}">'
+        f"<message>{escape(message)}</message></xnm:error>"
+    )
+
+
+def _to_xml(value):
+    """Convert JunOS-style JSON output to XML.
+
+    Arguments:
+        value {any} -- JSON output, e.g. `{"name": [{"data": "ge-0/0/0"}]}`
+
+    Returns:
+        {str} -- XML
+    """
+    if not isinstance(value, dict):
+        return "" if value is None else escape(str(value))
+    if "data" in value:
+        return _to_xml(value["data"])
+    elements = []
+    for key, children in value.items():
+        if key in ("@", "attributes"):
+            continue
+        for child in children if isinstance(children, list) else [children]:
+            elements.append(f"<{key}>{_to_xml(child)}</{key}>")
+    return "".join(elements)
+
+
+def _name(item):
+    """Get a named list member's name, if it has one."""
+    if isinstance(item, dict):
+        return item.get("name")
+    return None
+
+
+def _operation(value):
+    """Get an element's `operation` attribute, e.g. 'replace' or 'delete'."""
+    if isinstance(value, dict) and isinstance(value.get("@"), dict):
+        return value["@"].get("operation")
+    return None
+
+
+def _loaded(value):
+    """Copy a loaded element, as it's stored in the configuration.
+
+    `operation` attributes only apply while loading, so they're removed,
+    along with any elements they delete.
+    """
+    if isinstance(value, list):
+        return [_loaded(item) for item in value if _operation(item) != "delete"]
+    if not isinstance(value, dict):
+        return value
+
+    loaded = {}
+    for key, child in value.items():
+        if key == "@" and isinstance(child, dict):
+            attributes = {k: v for k, v in child.items() if k != "operation"}
+            if attributes:
+                loaded["@"] = attributes
+        elif _operation(child) != "delete":
+            loaded[key] = _loaded(child)
+    return loaded
+
+
+def _merge_list(base, update):
+    """Merge a named list into another, by name.
+
+    Arguments:
+        base {list} -- Existing list, modified in place
+        update {list} -- List to merge
+    """
+    members = {_name(item): i for i, item in enumerate(base) if _name(item)}
+    deleted = set()
+    for item in update:
+        index = members.get(_name(item))
+        operation = _operation(item)
+        if index is None:
+            if operation != "delete":
+                base.append(_loaded(item))
+        elif operation == "delete":
+            deleted.add(index)
+        elif operation == "replace" or not isinstance(item, dict):
+            base[index] = _loaded(item)
+        else:
+            merge_config(base[index], item)
+    if deleted:
+        base[:] = [item for i, item in enumerate(base) if i not in deleted]
+
+
+def merge_config(base, update):
+    """Merge a JSON configuration into another, as `load merge` would.
+
+    Named lists, e.g. interfaces, are merged by name. Elements with a
+    `replace` operation replace the existing element, & elements with a
+    `delete` operation are removed. Operations aren't stored.
+
+    Arguments:
+        base {dict} -- Existing configuration, modified in place
+        update {dict} -- Configuration to merge
+
+    Returns:
+        {dict} -- Merged configuration
+    """
+    for key, value in update.items():
+        if key == "@":
+            continue
+        operation = _operation(value)
+        if operation == "delete":
+            base.pop(key, None)
+        elif operation == "replace" or key not in base:
+            base[key] = _loaded(value)
+        elif isinstance(value, dict) and isinstance(base[key], dict):
+            merge_config(base[key], value)
+        elif isinstance(value, list) and isinstance(base[key], list):
+            _merge_list(base[key], value)
+        else:
+            base[key] = _loaded(value)
+    return base
+
+
+def _parse_statement(line):
+    """Split a `set` or `delete` statement into its parts.
+
+    Arguments:
+        line {str} -- Statement
+
+    Raises:
+        RPCError: Raised if the statement is invalid.
+
+    Returns:
+        {tuple} -- Command, parent keys, key & value
+    """
+    try:
+        command, *path = shlex.split(line)
+    except ValueError as err:
+        raise RPCError(f"syntax error: {err}")
+    if command not in ("set", "delete") or not path:
+        raise RPCError(f"syntax error: {line}")
+
+    if command == "delete":
+        *parents, key = path
+        return command, parents, key, None
+    if len(path) == 1:
+        return command, [], path[0], [None]
+    # The last word is the value of the element before it.
+    *parents, key, value = path
+    return command, parents, key, value
+
+
+def apply_set(config, statements):
+    """Apply `set` & `delete` statements to a configuration.
+
+    Arguments:
+        config {dict} -- Existing configuration, modified in place
+        statements {str} -- Newline separated statements
+
+    Raises:
+        RPCError: Raised if a statement is invalid.
+
+    Returns:
+        {dict} -- Updated configuration
+    """
+    for line in statements.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        command, parents, key, value = _parse_statement(line)
+
+        node = config
+        for name in parents:
+            child = node.get(name)
+            if not isinstance(child, dict):
+                child = node[name] = {}
+            node = child
+        if command == "delete":
+            node.pop(key, None)
+        else:
+            node[key] = value
+    return config
+
+
+def filter_config(config, element):
+    """Get the parts of a configuration matching a `get-configuration` filter.
+
+    Arguments:
+        config {dict} -- Configuration, or part of it
+        element {object} -- Filter element, e.g. `<configuration>`
+
+    Returns:
+        {dict} -- Matching configuration
+    """
+    filtered = {}
+    for child in element:
+        if child.tag not in config:
+            continue
+        value = config[child.tag]
+        if len(child) and isinstance(value, dict):
+            value = filter_config(value, child)
+        elif len(child) and isinstance(value, list):
+            name = child.findtext("name")
+            if name is not None:
+                value = [item for item in value if _name(item) == name]
+        filtered[child.tag] = value
+    return filtered
+
+
+class SimulatedDevice:
+    """A single simulated JunOS device."""
+
+    def __init__(
+        self,
+        name,
+        config=None,
+        latency=0,
+        commit_duration=0,
+        error_rate=0,
+        reject=None,
+        max_connections=None,
+        responses=None,
+    ):
+        """Initialize a simulated device.
+
+        Arguments:
+            name {str} -- Device name
+
+        Keyword Arguments:
+            config {dict} -- Initial configuration, without the
+                `configuration` wrapper (default: {None})
+            latency {float} -- Seconds added to every response (default: {0})
+            commit_duration {float} -- Seconds a commit or commit check
+                takes (default: {0})
+            error_rate {float} -- Fraction of requests answered with a 503
+                error, from 0 to 1 (default: {0})
+            reject {str} -- Fail commits & commit checks of any config which
+                contains this string (default: {None})
+            max_connections {int} -- Refuse connections beyond this many
+                at once with a 503 error (default: {None})
+            responses {dict} -- Output of other RPCs, keyed by RPC name.
+                Values may be callables, called with the RPC's arguments
+                (default: {None})
+        """
+        self.name = name
+        self.config = copy.deepcopy(config or {})
+        self.latency = latency
+        self.commit_duration = commit_duration
+        self.error_rate = error_rate
+        self.reject = reject
+        self.max_connections = max_connections
+        self.responses = responses or {}
+
+        self.host = None
+        self.port = None
+        self.commits = []
+        self.requests = 0
+        self.connections = 0
+        self.locked = False
+        self._server = None
+        self._writers = set()
+        self._changed = time.time()
+        self._handlers = {
+            "lock-configuration": self._lock,
+            "unlock-configuration": self._unlock,
+            "rollback-configuration": self._rollback,
+            "load-configuration": self._load,
+            "commit-configuration": self._commit,
+            "commit": self._commit,
+        }
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening.
+
+        Keyword Arguments:
+            host {str} -- Listen address (default: {"127.0.0.1"})
+            port {int} -- Listen port, or 0 for any free port (default: {0})
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        log.debug("Simulating '{}' on {}:{}", self.name, self.host, self.port)
+
+    async def stop(self):
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            for writer in self._writers:
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _check(self, candidate):
+        """Verify a candidate config would be accepted.
+
+        Raises:
+            RPCError: Raised if the config contains the rejected string.
+        """
+        if self.reject is not None and self.reject in json.dumps(candidate):
+            raise RPCError(f"commit check failed: '{self.reject}' is not allowed")
+
+    def _commit_information(self):
+        """Build `get-commit-information` output, most recent commit first."""
+        history = [
+            {
+                "sequence-number": [{"data": str(i)}],
+                "user": [{"data": "junos_rest"}],
+                "client": [{"data": "rest"}],
+                "date-time": [
+                    {
+                        "data": time.strftime(
+                            "%Y-%m-%d %H:%M:%S UTC", time.gmtime(commit["time"])
+                        ),
+                        "attributes": {"junos:seconds": str(int(commit["time"]))},
+                    }
+                ],
+                "comment": [{"data": f"simulated commit {commit['number']}"}],
+            }
+            for i, commit in enumerate(reversed(self.commits))
+        ]
+        return {"commit-information": [{"commit-history": history}]}
+
+    def _configuration(self, element):
+        """Build `get-configuration` output, filtered if a filter is given."""
+        changed = str(int(self._changed))
+        config = self.config
+        config_filter = element.find("configuration")
+        if config_filter is not None and len(config_filter):
+            config = filter_config(config, config_filter)
+        return {"configuration": {"@": {"junos:changed-seconds": changed}, **config}}
+
+    def _check_lock(self, session):
+        """Verify the configuration isn't locked by another session.
+
+        Raises:
+            RPCError: Raised if another session holds the lock.
+        """
+        if self.locked and not session["lock"]:
+            raise RPCError("configuration database locked by another session")
+
+    async def _lock(self, element, args, session):
+        """Run `lock-configuration`."""
+        self._check_lock(session)
+        self.locked = session["lock"] = True
+        return "application/xml", ""
+
+    async def _unlock(self, element, args, session):
+        """Run `unlock-configuration`."""
+        if session["lock"]:
+            self.locked = session["lock"] = False
+        return "application/xml", ""
+
+    async def _rollback(self, element, args, session):
+        """Run `rollback-configuration`, discarding the candidate config."""
+        session["candidate"] = None
+        return "application/xml", ""
+
+    async def _load(self, element, args, session):
+        """Run `load-configuration`, into the session's candidate config."""
+        self._check_lock(session)
+        action = element.get("action", "merge")
+        candidate = session["candidate"]
+        if candidate is None:
+            candidate = session["candidate"] = copy.deepcopy(self.config)
+
+        if action == "set" or element.find("configuration-set") is not None:
+            apply_set(candidate, args.get("configuration-set", ""))
+        else:
+            try:
+                loaded = json.loads(args.get("configuration-json") or "{}")
+            except ValueError as err:
+                raise RPCError(f"syntax error: {err}")
+            if action == "override":
+                candidate.clear()
+            merge_config(candidate, loaded.get("configuration", loaded))
+        return (
+            "application/xml",
+            "<load-configuration-results><load-success/>"
+            "</load-configuration-results>",
+        )
+
+    async def _commit(self, element, args, session):
+        """Run `commit-configuration`, or a commit check with `<check/>`."""
+        self._check_lock(session)
+        candidate = session["candidate"]
+        if candidate is None:
+            candidate = copy.deepcopy(self.config)
+        if self.commit_duration:
+            await asyncio.sleep(self.commit_duration)
+
+        try:
+            self._check(candidate)
+        except RPCError as err:
+            return (
+                "application/xml",
+                "<commit-results><routing-engine><name>re0</name>"
+                f"</routing-engine>{_xnm_error(str(err))}</commit-results>",
+            )
+
+        if element.find("check") is not None:
+            success = "<commit-check-success/>"
+        else:
+            self.config = candidate
+            session["candidate"] = None
+            self._changed = time.time()
+            self.commits.append(
+                {"number": len(self.commits) + 1, "time": self._changed}
+            )
+            success = "<commit-success/>"
+        return (
+            "application/xml",
+            "<commit-results><routing-engine><name>re0</name>"
+            f"{success}</routing-engine></commit-results>",
+        )
+
+    def _output(self, element, args):
+        """Get the output of an RPC which doesn't change the configuration.
+
+        Raises:
+            RPCError: Raised if the RPC is unknown.
+        """
+        name = element.tag
+        if name == "get-configuration":
+            return self._configuration(element)
+        if name == "get-commit-information":
+            return self._commit_information()
+        if name not in self.responses:
+            raise RPCError(f"syntax error, expecting <rpc> element: {name}")
+        output = self.responses[name]
+        if callable(output):
+            output = output(**args)
+        return output
+
+    async def _rpc(self, element, session, accept_json):
+        """Run a single RPC.
+
+        Arguments:
+            element {object} -- RPC element
+            session {dict} -- Request state, i.e. the candidate config &
+                whether this request holds the configuration lock
+            accept_json {bool} -- Return JSON output if possible
+
+        Raises:
+            RPCError: Raised if the RPC fails.
+
+        Returns:
+            {tuple} -- Output Content-Type & body
+        """
+        args = {child.tag: (child.text or "").strip() for child in element}
+        args.update(element.attrib)
+
+        handler = self._handlers.get(element.tag)
+        if handler is not None:
+            return await handler(element, args, session)
+
+        output = self._output(element, args)
+        if accept_json or element.get("format") == "json":
+            return "application/json", json.dumps(output)
+        return "application/xml", _to_xml(output)
+
+    async def _run(self, elements, accept_json, stop_on_error):
+        """Run RPCs in order, releasing the lock afterwards.
+
+        Returns:
+            {list} -- Each RPC's output Content-Type & body
+        """
+        session = {"candidate": None, "lock": False}
+        outputs = []
+        try:
+            for element in elements:
+                try:
+                    outputs.append(await self._rpc(element, session, accept_json))
+                except RPCError as err:
+                    outputs.append(("application/xml", _xnm_error(str(err))))
+                    if stop_on_error:
+                        break
+        finally:
+            # Like any JunOS session, the lock is released when it ends.
+            if session["lock"]:
+                self.locked = False
+        return outputs
+
+    async def _respond(self, method, target, headers, body):
+        """Handle a single HTTP request.
+
+        Returns:
+            {tuple} -- Status code, Content-Type, body
+        """
+        path, _, query = target.partition("?")
+        params = dict(parse_qsl(query))
+        accept_json = "json" in headers.get("accept", "")
+
+        if path.rstrip("/") == "/rpc":
+            if method != "POST":
+                return 405, "text/plain", "Method Not Allowed"
+            try:
+                root = ElementTree.fromstring(f"<rpcs>{body.decode()}</rpcs>")
+            except ElementTree.ParseError as err:
+                return 400, "application/xml", _xnm_error(f"syntax error: {err}")
+            elements = list(root)
+        elif path.startswith("/rpc/"):
+            if method != "GET":
+                return 405, "text/plain", "Method Not Allowed"
+            element = ElementTree.Element(unquote(path[5:]))
+            for key, value in params.items():
+                ElementTree.SubElement(element, key).text = value
+            elements = [element]
+        else:
+            return 404, "text/plain", "Not Found"
+
+        stop_on_error = params.get("stop-on-error") == "1"
+        outputs = await self._run(elements, accept_json, stop_on_error)
+
+        if len(outputs) == 1:
+            content_type, output = outputs[0]
+            status = 400 if method == "GET" and "xnm:error" in output else 200
+            return status, content_type, output
+
+        boundary = uuid.uuid4().hex
+        parts = "".join(
+            f"--{boundary}\r\nContent-Type: {content_type}\r\n\r\n{output}\r\n"
+            for content_type, output in outputs
+        )
+        return (
+            200,
+            f"multipart/mixed; boundary={boundary}",
+            f"{parts}--{boundary}--\r\n",
+        )
+
+    async def _read_request(self, reader):
+        """Read an HTTP request.
+
+        Returns:
+            {tuple|None} -- Method, target, headers & body, or None if the
+                client closed the connection
+        """
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return method, target, headers, body
+
+    @staticmethod
+    def _write_response(writer, status, content_type, body, headers, close=False):
+        """Write an HTTP response."""
+        body = body.encode()
+        extra = ""
+        if "gzip" in headers.get("accept-encoding", "") and len(body) > 1024:
+            body = gzip.compress(body, compresslevel=1)
+            extra += "Content-Encoding: gzip\r\n"
+        if close:
+            extra += "Connection: close\r\n"
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n{extra}\r\n"
+            ).encode()
+            + body
+        )
+
+    async def _handle(self, reader, writer):
+        """Serve requests on a connection until it's closed."""
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            if self.max_connections is not None and (
+                self.connections > self.max_connections
+            ):
+                await self._read_request(reader)
+                self._write_response(
+                    writer, 503, "text/plain", "Too many connections", {}, close=True
+                )
+                await writer.drain()
+                return
+
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                self.requests += 1
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                if self.error_rate and random.random() < self.error_rate:  # noqa: S311
+                    response = (503, "text/plain", "Simulated error")
+                else:
+                    response = await self._respond(method, target, headers, body)
+
+                close = headers.get("connection", "").lower() == "close"
+                self._write_response(writer, *response, headers, close=close)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+
+class Simulator:
+    """Several simulated JunOS devices, each on its own port."""
+
+    def __init__(self, devices=1, host="127.0.0.1", base_port=0, **options):
+        """Initialize the simulated devices.
+
+        Keyword Arguments:
+            devices {int} -- Number of devices (default: {1})
+            host {str} -- Listen address (default: {"127.0.0.1"})
+            base_port {int} -- First device's port, with each following
+                device on the next port, or 0 for any free ports
+                (default: {0})
+            options {any} -- SimulatedDevice options, applied to every device
+        """
+        self.host = host
+        self.base_port = base_port
+        self.devices = [
+            SimulatedDevice(name=f"sim{i}", **options) for i in range(devices)
+        ]
+
+    async def start(self):
+        """Start every device."""
+        for i, device in enumerate(self.devices):
+            port = self.base_port + i if self.base_port else 0
+            await device.start(host=self.host, port=port)
+
+    async def stop(self):
+        """Stop every device."""
+        await asyncio.gather(*(device.stop() for device in self.devices))
+
+    async def __aenter__(self):
+        """Start every device."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        """Stop every device."""
+        await self.stop()
+
+    def inventory(self, **attrs):
+        """Build a junos_rest config file for the simulated devices.
+
+        Keyword Arguments:
+            attrs {any} -- Additional attributes for every device, e.g.
+                `read_timeout`
+
+        Returns:
+            {str} -- YAML config file
+        """
+        import yaml
+
+        devices = [
+            {
+                "name": device.name,
+                "host": device.host,
+                "port": device.port,
+                "username": "junos_rest",
+                "password": "junos_rest",
+                **attrs,
+            }
+            for device in self.devices
+        ]
+        return yaml.safe_dump({"devices": devices}, sort_keys=False)
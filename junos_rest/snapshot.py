@@ -0,0 +1,381 @@
+"""Compiled inventory snapshots.
+
+Parsing & validating a large YAML inventory is slow, so the validated
+inventory is saved to a binary snapshot keyed by the config file's hash.
+As long as the config file is unchanged, later loads read the snapshot
+instead, without importing YAML or pydantic at all.
+
+Passwords aren't saved in snapshots, but in a separate file next to each
+snapshot, which is only read the first time a password is used. Both are
+only readable by the current user.
+"""
+
+# Standard Library Imports
+import hashlib
+import os
+import pickle  # noqa: S403
+from functools import partial
+from pathlib import Path
+
+# Project Imports
+from junos_rest.log import log
+
+SNAPSHOT_ENV = "JUNOS_REST_SNAPSHOT_DIR"
+SNAPSHOT_VERSION = 5
+# Files saved for each snapshot, the snapshot itself & its passwords.
+_SUFFIXES = (".pickle", ".passwords")
+_FIELDS = (
+    "name",
+    "host",
+    "port",
+    "username",
+    "password",
+    "ssl",
+    "site",
+    "role",
+    "tags",
+    "connect_timeout",
+    "read_timeout",
+    "commit_timeout",
+    "max_sessions",
+)
+
+
+def _snapshot_dir():
+    """Get the directory snapshots are stored in.
+
+    Returns:
+        {Path} -- Snapshot directory
+    """
+    path = os.environ.get(SNAPSHOT_ENV)
+    if path is None:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        path = Path(cache_home) / "junos_rest"
+    return Path(path)
+
+
+class Secret:
+    """Compact stand-in for pydantic's SecretStr."""
+
+    __slots__ = ("_value", "_source", "_key")
+    __hash__ = None
+
+    def __init__(self, value=None, source=None, key=None):
+        """Set the secret value, or a function to get it with when it's used.
+
+        Keyword Arguments:
+            value {str} -- Secret value (default: {None})
+            source {callable} -- Function returning the secret value
+                (default: {None})
+            key {tuple} -- Identifies the secret value, so secrets can be
+                compared without getting their values (default: {None})
+        """
+        self._value = value
+        self._source = source
+        self._key = key
+
+    def __repr__(self):
+        """Hide the secret value."""
+        return "Secret('**********')"
+
+    def __str__(self):
+        """Hide the secret value."""
+        return "**********"
+
+    def __eq__(self, other):
+        """Compare secret values, by their keys if both have the same key."""
+        if not isinstance(other, Secret):
+            return False
+        if self._key is not None and self._key == other._key:
+            return True
+        return self.get_secret_value() == other.get_secret_value()
+
+    def get_secret_value(self):
+        """Get the secret value.
+
+        Returns:
+            {str} -- Secret value
+        """
+        if self._source is not None:
+            self._value = self._source()
+            self._source = None
+        return self._value
+
+
+class DeviceRecord:
+    """Compact, validated device, with the same interface as the Device model."""
+
+    __slots__ = _FIELDS
+    __hash__ = None
+
+    def __init__(
+        self,
+        name,
+        host,
+        port,
+        username,
+        password,
+        ssl,
+        site,
+        role,
+        tags,
+        connect_timeout=None,
+        read_timeout=None,
+        commit_timeout=None,
+        max_sessions=None,
+    ):
+        """Set the device attributes."""
+        self.name = name
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password if isinstance(password, Secret) else Secret(password)
+        self.ssl = ssl
+        self.site = site
+        self.role = role
+        self.tags = tags
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.commit_timeout = commit_timeout
+        self.max_sessions = max_sessions
+
+    def __repr__(self):
+        """Represent the device by name & URL."""
+        return f"DeviceRecord(name={self.name!r}, url={self.url()!r})"
+
+    def __eq__(self, other):
+        """Compare all device attributes."""
+        return isinstance(other, DeviceRecord) and self._values() == other._values()
+
+    def _values(self):
+        """Get the device's attributes as a tuple, in field order.
+
+        Returns:
+            {tuple} -- Device attributes
+        """
+        return (
+            self.name,
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            self.ssl,
+            self.site,
+            self.role,
+            self.tags,
+            self.connect_timeout,
+            self.read_timeout,
+            self.commit_timeout,
+            self.max_sessions,
+        )
+
+    def url(self):
+        """Construct formatted http URL for interacting with device.
+
+        Returns:
+            {str} -- Formatted URL
+        """
+        if self.ssl:
+            protocol = "https://"
+        else:
+            protocol = "http://"
+        return f"{protocol}{self.host}:{self.port}"
+
+    def dict(self, exclude=None):
+        """Get the device's attributes as a dictionary.
+
+        Keyword Arguments:
+            exclude {set} -- Attribute names to leave out (default: {None})
+
+        Returns:
+            {dict} -- Device attributes
+        """
+        exclude = exclude or set()
+        return {
+            field: getattr(self, field) for field in _FIELDS if field not in exclude
+        }
+
+
+class Passwords:
+    """Device passwords, read the first time one is used.
+
+    Passwords are read from the file saved next to the snapshot. Only if
+    that's missing is the whole config file parsed again.
+    """
+
+    __slots__ = ("raw", "passwords_file", "_passwords")
+
+    def __init__(self, raw, passwords_file):
+        """Set where the passwords are read from.
+
+        Arguments:
+            raw {bytes} -- Config file contents
+            passwords_file {Path} -- Passwords file path
+        """
+        self.raw = raw
+        self.passwords_file = passwords_file
+        self._passwords = None
+
+    def get(self, index):
+        """Get a device's password.
+
+        Arguments:
+            index {int} -- Position of the device in the config file
+
+        Returns:
+            {str} -- Password
+        """
+        if self._passwords is None:
+            passwords = _read(self.passwords_file)
+            if passwords is None:
+                import yaml
+
+                devices = yaml.safe_load(self.raw)["devices"]
+                passwords = [str(device["password"]) for device in devices]
+            self._passwords, self.raw = passwords, None
+        return self._passwords[index]
+
+
+class Snapshot:
+    """Compact, validated config."""
+
+    __slots__ = ("devices",)
+
+    def __init__(self, devices):
+        """Set the config's devices."""
+        self.devices = devices
+
+
+def _compile(raw):
+    """Parse & validate a raw config file into rows of device attributes.
+
+    Arguments:
+        raw {bytes} -- Config file contents
+
+    Returns:
+        {list} -- Device attribute tuples, in field order
+    """
+    import yaml
+
+    from junos_rest.models.config import Config
+
+    params = Config(**yaml.safe_load(raw))
+    return [
+        (
+            d.name,
+            str(d.host),
+            d.port,
+            d.username,
+            d.password.get_secret_value(),
+            d.ssl,
+            d.site,
+            d.role,
+            tuple(d.tags),
+            d.connect_timeout,
+            d.read_timeout,
+            d.commit_timeout,
+            d.max_sessions,
+        )
+        for d in params.devices
+    ]
+
+
+def _read(snapshot_file):
+    """Read a snapshot or passwords file, if it's usable.
+
+    Arguments:
+        snapshot_file {Path} -- Snapshot or passwords file path
+
+    Returns:
+        {list|None} -- Device attribute tuples or passwords, or None
+    """
+    try:
+        with snapshot_file.open("rb") as f:
+            # Snapshots are only ever written by this module, to a
+            # directory owned by the current user.
+            version, rows = pickle.load(f)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        log.debug("Ignoring unreadable snapshot {}: {}", snapshot_file, err)
+        return None
+
+    if version != SNAPSHOT_VERSION:
+        return None
+    return rows
+
+
+def _dump(snapshot_file, rows):
+    """Save a snapshot or passwords file, only readable by the current user.
+
+    Arguments:
+        snapshot_file {Path} -- Snapshot or passwords file path
+        rows {list} -- Device attribute tuples or passwords
+    """
+    temp_file = snapshot_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        temp_file.unlink()
+    except FileNotFoundError:
+        pass
+    fd = os.open(temp_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump((SNAPSHOT_VERSION, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, snapshot_file)
+
+
+def _write(snapshot_file, rows):
+    """Save device rows to a snapshot file, replacing older snapshots.
+
+    Failing to write a snapshot is not an error, the config is simply
+    compiled again next time. Passwords are saved to their own file, which
+    is written first, so a usable snapshot always has its passwords.
+
+    Arguments:
+        snapshot_file {Path} -- Snapshot file path
+        rows {list} -- Device attribute tuples
+    """
+    prefix = snapshot_file.name.split("-")[0]
+    passwords_file = snapshot_file.with_suffix(".passwords")
+    try:
+        snapshot_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _dump(passwords_file, [row[4] for row in rows])
+        _dump(snapshot_file, [row[:4] + (None,) + row[5:] for row in rows])
+
+        for stale in snapshot_file.parent.glob(f"{prefix}-*"):
+            if stale.suffix in _SUFFIXES and stale.stem != snapshot_file.stem:
+                stale.unlink()
+
+    except OSError as err:
+        log.debug("Unable to write snapshot {}: {}", snapshot_file, err)
+
+
+def load(file_path):
+    """Load a config file, from its snapshot if it's unchanged.
+
+    Arguments:
+        file_path {Path} -- Config file path
+
+    Returns:
+        {object} -- Validated config
+    """
+    raw = file_path.read_bytes()
+
+    path_key = hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()[:16]
+    content_key = hashlib.sha256(raw).hexdigest()
+    snapshot_file = _snapshot_dir() / f"{path_key}-{content_key}.pickle"
+
+    rows = _read(snapshot_file)
+    if rows is None:
+        rows = _compile(raw)
+        _write(snapshot_file, rows)
+        log.debug("Compiled {} to snapshot {}", file_path, snapshot_file)
+    else:
+        passwords = Passwords(raw, snapshot_file.with_suffix(".passwords"))
+        rows = [
+            row[:4]
+            + (Secret(source=partial(passwords.get, i), key=(content_key, i)),)
+            + row[5:]
+            for i, row in enumerate(rows)
+        ]
+
+    return Snapshot([DeviceRecord(*row) for row in rows])
@@ -0,0 +1,302 @@
+"""Incremental extraction of records from large JSON documents.
+
+JunOS JSON output wraps nearly every value in a list, e.g.:
+
+    {"route-information": [{"route-table": [{"rt": [{...}, {...}]}]}]}
+
+So when matching a path like `route-information/route-table/rt`, lists
+are transparent: each of their items is matched against the rest of the
+path. If the value at the end of the path is a list, each of its items is
+a record, otherwise the value itself is a record.
+
+Only the records themselves are decoded, everything else is scanned &
+discarded, so memory use depends on the size of a single record rather
+than the size of the document.
+"""
+
+# Standard Library Imports
+import re
+from json import JSONDecodeError
+from json import JSONDecoder
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN = re.compile(
+    r"[ \t\n\r]*(?:(" + _STRING + r')|([{}\[\]:,])|([^ \t\n\r{}\[\]:,"]+))'
+)
+_SKIP = re.compile(r'(?:[^"{}\[\]]+|' + _STRING + r")*")
+_OFF_PATH = -1
+# Values which are known to be complete once decoded, & the characters
+# which end other values.
+_COMPLETE = (dict, list, str)
+_DELIMITERS = " \t\n\r,]}"
+_decoder = JSONDecoder()
+
+
+class _Frame:
+    """Parsing state of a single JSON object or array."""
+
+    __slots__ = ("is_object", "matched", "key", "expect_key", "records")
+
+    def __init__(self, is_object, matched, records=False):
+        """Set the container's type & how much of the path it has matched."""
+        self.is_object = is_object
+        self.matched = matched
+        self.records = records
+        self.key = None
+        self.expect_key = is_object
+
+
+class JSONPathStreamer:
+    """Yield the records at a path in a JSON document, as it's received."""
+
+    def __init__(self, path):
+        """Initialize the streamer.
+
+        Arguments:
+            path {str|tuple} -- Keys to the records, e.g. 'route-table/rt'
+        """
+        if isinstance(path, str):
+            path = path.strip("/").split("/")
+        self._path = tuple(path)
+        self._buffer = ""
+        self._pos = 0
+        self._stack = []
+        self._started = False
+        self._retry_at = 0
+        self._handlers = {
+            "{": self._on_open,
+            "[": self._on_open,
+            "}": self._on_close,
+            "]": self._on_close,
+            ":": self._on_colon,
+            ",": self._on_comma,
+        }
+
+    def _value_frame(self, frame, is_object):
+        """Create the frame for a container at the current value position.
+
+        Arguments:
+            frame {object} -- Parent frame, or None at the document root
+            is_object {bool} -- True if the new container is an object
+
+        Returns:
+            {object} -- New frame
+        """
+        if frame is None:
+            return _Frame(is_object, 0)
+
+        if not frame.is_object:
+            return _Frame(is_object, frame.matched)
+
+        matched = frame.matched
+        if matched == _OFF_PATH or frame.key != self._path[matched]:
+            return _Frame(is_object, _OFF_PATH)
+
+        matched += 1
+        records = matched == len(self._path) and not is_object
+        return _Frame(is_object, matched, records=records)
+
+    def _at_record(self, frame):
+        """Determine if the value at the current position is a record."""
+        if frame is None:
+            return False
+        if not frame.is_object:
+            return frame.records
+        return (
+            not frame.expect_key
+            and frame.matched == len(self._path) - 1
+            and frame.key == self._path[-1]
+        )
+
+    def _decode_record(self, final):
+        """Decode the record at the current position, if it's complete.
+
+        Arguments:
+            final {bool} -- True if no more data will be received
+
+        Raises:
+            JunosRestError: Raised if the record is invalid
+
+        Returns:
+            {tuple|None} -- (record,) or None if more data is needed
+        """
+        buffer = self._buffer
+        available = len(buffer) - self._pos
+        if not final and available < self._retry_at:
+            return None
+        try:
+            record, end = _decoder.raw_decode(buffer, self._pos)
+        except JSONDecodeError as err:
+            if final:
+                raise JunosRestError(f"Invalid JSON record: {err}")
+            # Wait for the buffer to double before trying again, so large
+            # records are decoded in linear time.
+            self._retry_at = available * 2
+            return None
+
+        if not final and not isinstance(record, _COMPLETE) and (
+            end == len(buffer) or buffer[end] not in _DELIMITERS
+        ):
+            # A number or literal is only complete once it's followed by a
+            # delimiter, e.g. '-500.' is the start of '-500.0'.
+            return None
+
+        self._retry_at = 0
+        self._pos = end
+        return (record,)
+
+    def _skip(self, final):
+        """Skip ahead to the next bracket in a container off the path.
+
+        Nothing inside the container can match the path, so everything up
+        to the next bracket outside of a string is skipped unparsed.
+
+        Arguments:
+            final {bool} -- True if no more data will be received
+
+        Raises:
+            JunosRestError: Raised if the document is incomplete
+
+        Returns:
+            {bool} -- False if more data is needed
+        """
+        buffer = self._buffer
+        pos = self._pos = _SKIP.match(buffer, self._pos).end()
+        if pos == len(buffer) or buffer[pos] == '"':
+            if final:
+                raise JunosRestError("Incomplete JSON document")
+            return False
+        self._pos += 1
+        if buffer[pos] in "{[":
+            self._stack.append(_Frame(buffer[pos] == "{", _OFF_PATH))
+        else:
+            self._stack.pop()
+        return True
+
+    def _starts_record(self, frame, char):
+        """Determine if a record starts with the character at the current position.
+
+        A list under the last key of the path isn't a record itself, each
+        of its items is.
+        """
+        if char in ",]}" or (char == "[" and frame is not None and frame.is_object):
+            return False
+        return self._at_record(frame)
+
+    def _on_string(self, frame, string):
+        """Handle a string, which is the current key if one is expected."""
+        if frame is not None and frame.is_object and frame.expect_key:
+            frame.key = _decoder.decode(string)
+
+    def _on_open(self, frame, char):
+        """Handle the start of an object or array."""
+        if frame is None and self._started:
+            raise JunosRestError("Multiple JSON documents in response")
+        self._started = True
+        self._stack.append(self._value_frame(frame, char == "{"))
+
+    def _on_close(self, frame, char):
+        """Handle the end of an object or array."""
+        self._stack.pop()
+
+    def _on_colon(self, frame, char):
+        """Handle the separator between an object's key & value."""
+        frame.expect_key = False
+
+    def _on_comma(self, frame, char):
+        """Handle the separator between members, after which a key follows."""
+        if frame.is_object:
+            frame.expect_key = True
+
+    def _next_token(self, frame, final):
+        """Parse the next token, other than a record.
+
+        Arguments:
+            frame {object} -- Current frame, or None at the document root
+            final {bool} -- True if no more data will be received
+
+        Raises:
+            JunosRestError: Raised if the document is invalid
+
+        Returns:
+            {bool} -- False if more data is needed
+        """
+        buffer = self._buffer
+        match = _TOKEN.match(buffer, self._pos)
+        if match is None or (
+            match.group(3) is not None and match.end() == len(buffer) and not final
+        ):
+            # A scalar at the end of the buffer may continue in the next chunk.
+            if final:
+                raise JunosRestError("Invalid or incomplete JSON document")
+            return False
+
+        self._pos = match.end()
+        string, char, _scalar = match.groups()
+        if string is not None:
+            self._on_string(frame, string)
+        elif char is not None:
+            self._handlers[char](frame, char)
+        return True
+
+    def _parse(self, final):
+        """Parse as much of the buffer as possible.
+
+        Arguments:
+            final {bool} -- True if no more data will be received
+
+        Yields:
+            {any} -- Decoded records
+        """
+        buffer, stack = self._buffer, self._stack
+
+        while True:
+            frame = stack[-1] if stack else None
+
+            if frame is not None and frame.matched == _OFF_PATH:
+                if not self._skip(final):
+                    return
+                continue
+
+            pos = self._pos = _WHITESPACE.match(buffer, self._pos).end()
+            if pos == len(buffer):
+                return
+
+            if self._starts_record(frame, buffer[pos]):
+                decoded = self._decode_record(final)
+                if decoded is None:
+                    return
+                yield decoded[0]
+            elif not self._next_token(frame, final):
+                return
+
+    def feed(self, text):
+        """Parse a chunk of the JSON document.
+
+        Arguments:
+            text {str} -- JSON text
+
+        Returns:
+            {list} -- Records completed by this chunk
+        """
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return list(self._parse(final=False))
+
+    def close(self):
+        """Finish parsing the JSON document.
+
+        Raises:
+            JunosRestError: Raised if the document is incomplete
+
+        Returns:
+            {list} -- Any remaining records
+        """
+        records = list(self._parse(final=True))
+        if self._stack:
+            raise JunosRestError("Incomplete JSON document")
+        return records
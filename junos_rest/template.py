@@ -0,0 +1,288 @@
+"""Render per-device configs from a single template.
+
+A template is a config with placeholders in its strings, in the same
+format as `str.format`. Placeholders are filled in from each device's
+variables, or from the device's `name`, `host`, `port`, `site`, `role`
+& `tags` as `device.<field>`, e.g.:
+
+    template = ConfigTemplate({
+        "system": {
+            "host-name": "{device.name}",
+            "ntp": {"server": "{ntp_servers}"},
+        },
+        "interfaces": {
+            "interface": [{"name": "lo0", "description": "{site} loopback"}]
+        },
+    })
+    config = template.render(device, variables={"site": "nyc"}, defaults=...)
+
+A string which is only a placeholder, like `"{ntp_servers}"` above, is
+replaced by the variable's value as-is, e.g. a list. Other placeholders
+are formatted into their string. Literal braces are written as `{{` & `}}`.
+Placeholders are only ever looked up by their full name, so attributes
+& items of variables, e.g. `{site.upper}` or `{servers[0]}`, can't be
+reached from a template.
+
+The template is compiled once, so rendering only fills in placeholders.
+Parts of the template without placeholders aren't copied, & are shared
+by every rendered config, so rendered configs must not be modified.
+"""
+
+# Standard Library Imports
+from string import Formatter
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+from junos_rest.inventory import get_inventory
+from junos_rest.util import device_names
+
+# Device attributes available to templates as `device.<field>`.
+_DEVICE_FIELDS = ("name", "host", "port", "site", "role", "tags")
+_DEVICE_KEYS = tuple((f"device.{field}", field) for field in _DEVICE_FIELDS)
+
+# Values which are kept as-is when a string is only a placeholder. Other
+# values, e.g. a device's IP address, are converted to strings.
+_JSON_TYPES = (str, int, float, bool, list, dict, type(None))
+
+
+class _FlatFormatter(Formatter):
+    """Formatter which looks up each placeholder by its full name.
+
+    `str.format` resolves `{a.b}` & `{a[b]}` by getting attributes &
+    items of `a`, which would let a template reach anything reachable
+    from its variables. Here, `a.b` is just the name of a variable.
+    """
+
+    def get_field(self, field_name, args, kwargs):
+        """Get a placeholder's value from the context, by its full name."""
+        return kwargs[field_name], field_name
+
+
+_FORMATTER = _FlatFormatter()
+
+
+def _check_fields(text, fields):
+    """Verify a string's placeholders are named, & exist if they're device fields.
+
+    Raises:
+        JunosRestError: Raised if a placeholder is invalid.
+    """
+    for field in fields:
+        if not field or field[0].isdigit():
+            raise JunosRestError(
+                "Template placeholders must be named: '{t}'", status=400, t=text
+            )
+        if field.startswith("device.") and field[7:] not in _DEVICE_FIELDS:
+            raise JunosRestError(
+                "Template placeholder '{f}' isn't a device field, which are: {d}",
+                status=400,
+                f=field,
+                d=", ".join(_DEVICE_FIELDS),
+            )
+
+
+def _value_renderer(field):
+    """Build a function rendering a string which is only a placeholder.
+
+    The variable's value is used as-is if it's a JSON type.
+    """
+
+    def render_value(context):
+        value = context[field]
+        if isinstance(value, tuple):
+            return list(value)
+        return value if isinstance(value, _JSON_TYPES) else str(value)
+
+    return render_value
+
+
+def _text_renderer(parsed):
+    """Build a function formatting placeholders into a string.
+
+    Arguments:
+        parsed {list} -- The string's parts, from `Formatter.parse`
+    """
+
+    def render_text(context):
+        rendered = []
+        for literal, field, spec, conversion in parsed:
+            rendered.append(literal)
+            if field is None:
+                continue
+            value = context[field]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            if "{" in spec:
+                spec = _FORMATTER.vformat(spec, (), context)
+            rendered.append(format(value, spec))
+        return "".join(rendered)
+
+    return render_text
+
+
+def _compile_str(text):
+    """Compile a string, which may have placeholders.
+
+    Returns:
+        {tuple} -- Static value, or a function rendering the string from
+            a context & None
+    """
+    try:
+        parsed = list(_FORMATTER.parse(text))
+    except ValueError as err:
+        raise JunosRestError(
+            "Invalid template string '{t}': {e}", status=400, t=text, e=str(err)
+        )
+
+    fields = [field for _, field, _, _ in parsed if field is not None]
+    if not fields:
+        return "".join(literal for literal, _, _, _ in parsed), None
+    _check_fields(text, fields)
+
+    literal, field, spec, conversion = parsed[0]
+    if len(parsed) == 1 and not literal and not spec and not conversion:
+        return None, _value_renderer(field)
+    return None, _text_renderer(parsed)
+
+
+def _compile_dict(value):
+    """Compile a dict, whose keys & values may have placeholders.
+
+    Returns:
+        {tuple} -- Static dict, or a function rendering the dict from a
+            context & None
+    """
+    members = []
+    for key, child in value.items():
+        key, render_key = _compile_str(key) if isinstance(key, str) else (key, None)
+        child, render_child = _compile(child)
+        members.append((key, render_key, child, render_child))
+    if all(m[1] is None and m[3] is None for m in members):
+        return {key: child for key, _, child, _ in members}, None
+
+    def render_dict(context):
+        rendered = {}
+        for key, render_key, child, render_child in members:
+            if render_key is not None:
+                key = render_key(context)
+            if render_child is not None:
+                child = render_child(context)
+            rendered[key] = child
+        return rendered
+
+    return None, render_dict
+
+
+def _compile_list(value):
+    """Compile a list, whose items may have placeholders.
+
+    Returns:
+        {tuple} -- Static list, or a function rendering the list from a
+            context & None
+    """
+    items = [_compile(item) for item in value]
+    if all(render is None for _, render in items):
+        return [item for item, _ in items], None
+
+    def render_list(context):
+        return [item if render is None else render(context) for item, render in items]
+
+    return None, render_list
+
+
+def _compile(value):
+    """Compile part of a template.
+
+    Returns:
+        {tuple} -- Static value, or a function rendering the value from a
+            context & None
+    """
+    if isinstance(value, str):
+        return _compile_str(value)
+    if isinstance(value, dict):
+        return _compile_dict(value)
+    if isinstance(value, (list, tuple)):
+        return _compile_list(value)
+    return value, None
+
+
+class ConfigTemplate:
+    """A config with placeholders, compiled once & rendered per device."""
+
+    def __init__(self, config):
+        """Compile a template.
+
+        Arguments:
+            config {dict} -- Config with placeholders
+
+        Raises:
+            JunosRestError: Raised if a placeholder is invalid.
+        """
+        self.config = config
+        self._static, self._render = _compile(config)
+
+    def render(self, device, variables=None, defaults=None):
+        """Render the config for a device.
+
+        Arguments:
+            device {object} -- Device object
+
+        Keyword Arguments:
+            variables {dict} -- The device's variables (default: {None})
+            defaults {dict} -- Variables for devices which don't set them
+                (default: {None})
+
+        Raises:
+            JunosRestError: Raised if a placeholder's variable isn't set.
+
+        Returns:
+            {dict} -- Rendered config
+        """
+        if self._render is None:
+            return self._static
+
+        context = dict(defaults or {})
+        context.update(variables or {})
+        for key, field in _DEVICE_KEYS:
+            context[key] = getattr(device, field)
+        try:
+            return self._render(context)
+        except KeyError as err:
+            raise JunosRestError(
+                "Template variable '{v}' isn't set for {d}",
+                status=400,
+                v=err.args[0],
+                d=device.name,
+            )
+        except (AttributeError, IndexError, TypeError, ValueError) as err:
+            raise JunosRestError(
+                "Unable to render template for {d}: {e}",
+                status=400,
+                d=device.name,
+                e=str(err),
+            )
+
+    def render_many(self, devices, variables=None, defaults=None):
+        """Render the config for many devices, one device at a time.
+
+        Configs are rendered as they're iterated, so only the configs in
+        use are held in memory at once.
+
+        Arguments:
+            devices {list|str} -- Device Names, or a device selector
+
+        Keyword Arguments:
+            variables {dict} -- Each device's variables, keyed by device
+                name (default: {None})
+            defaults {dict} -- Variables for devices which don't set them
+                (default: {None})
+
+        Yields:
+            {tuple} -- Device Name & rendered config
+        """
+        inventory = get_inventory()
+        variables = variables or {}
+
+        for device_name in device_names(devices):
+            device = inventory.get(device_name)
+            yield device_name, self.render(device, variables.get(device_name), defaults)
@@ -0,0 +1,115 @@
+"""Validate configuration changes across many devices before committing.
+
+Each REST request runs in its own session, so a candidate config can't
+be held open between requests. Instead, each device's change is loaded,
+checked with `commit check` & discarded within a single request. Only if
+the check passes on every device is the change loaded & committed.
+"""
+
+# Standard Library Imports
+import asyncio
+
+# Project Imports
+from junos_rest.body import config_text
+from junos_rest.constants import COMMIT_CHECK
+from junos_rest.constants import LOAD_JSON
+from junos_rest.constants import LOAD_SET
+from junos_rest.constants import LOCK
+from junos_rest.constants import OPERATION_DEADLINE
+from junos_rest.constants import ROLLBACK
+from junos_rest.constants import UNLOCK
+from junos_rest.diff import config_delta
+from junos_rest.metrics import metrics
+from junos_rest.offload import estimate_size
+from junos_rest.offload import offload
+from junos_rest.pool import pool
+from junos_rest.retry import Deadline
+from junos_rest.running import running_configs
+from junos_rest.util import device_result
+from junos_rest.util import find_device
+
+
+def _check_rpcs(delta, action):
+    """Build the RPCs to load, check & discard a change.
+
+    Arguments:
+        delta {dict|list} -- Config to load (`set` statements for 'set')
+        action {str} -- One of 'merge', 'replace', or 'set'
+
+    Returns:
+        {list} -- RPC XML
+    """
+    template = LOAD_SET if action == "set" else LOAD_JSON
+    load = config_text(template, delta, action)
+    return [LOCK, load, COMMIT_CHECK.strip(), ROLLBACK.strip(), UNLOCK]
+
+
+async def check_config(
+    device_name, config_data, action="merge", deadline=OPERATION_DEADLINE
+):
+    """Verify a device would accept a configuration, without committing it.
+
+    The candidate config is always rolled back & unlocked afterwards, even
+    if loading or checking the configuration fails.
+
+    Arguments:
+        device_name {str} -- Device Name
+        config_data {dict} -- Wrapped configuration
+
+    Keyword Arguments:
+        action {str} -- One of 'merge', 'replace', or 'set' (default: {"merge"})
+        deadline {float} -- Seconds the whole check may take, including
+            retries, or None for no deadline (default: {OPERATION_DEADLINE})
+
+    Returns:
+        {dict} -- Response Details, with the change checked under `delta`
+    """
+    deadline = Deadline(deadline)
+    device = await find_device(device_name=device_name)
+
+    async with pool.session(device) as session:
+        hierarchies = list(config_data.get("configuration", {}))
+        current_config = await running_configs.get(
+            session, hierarchies=hierarchies, deadline=deadline
+        )
+
+        delta = config_delta(current_config, config_data, action=action)
+        if delta is None:
+            return {"status": "success", "data": None, "changed": False}
+
+        with metrics.time(device_name, "serialize"):
+            size = estimate_size(delta, limit=offload.threshold or 0)
+            rpcs = await offload.run(size, _check_rpcs, delta, action)
+        with metrics.time(device_name, "check"):
+            results = await session.batch(rpcs, commit=True, deadline=deadline)
+
+    for result in results:
+        if result["status"] != "success":
+            return {**result, "delta": delta}
+    return {"status": "success", "data": None, "delta": delta}
+
+
+async def run_phase(device_names, operation, concurrency, **kwargs):
+    """Run an operation on many devices concurrently, & collect the results.
+
+    Arguments:
+        device_names {list} -- Device Names
+        operation {coroutine} -- Operation, called with `device_name` & kwargs
+        concurrency {int} -- Maximum devices in progress at once
+
+    Keyword Arguments:
+        kwargs {any} -- Operation arguments
+
+    Returns:
+        {dict} -- Response Details, keyed by device name, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(device_name):
+        async with semaphore:
+            return await device_result(
+                device_name, operation(device_name=device_name, **kwargs)
+            )
+
+    results = await asyncio.gather(*(_run(name) for name in device_names))
+    return dict(zip(device_names, results))
@@ -1,14 +1,15 @@
 """Utility functions."""
 
 # Standard Library Imports
+import asyncio
 import sys
 
 # Third Party Imports
 import ujson
 
 # Project Imports
-from junos_rest.config import params
 from junos_rest.exceptions import JunosRestError
+from junos_rest.inventory import get_inventory
 from junos_rest.log import log
 
 
@@ -47,14 +48,47 @@ async def find_device(device_name):
     Returns:
         {object} -- Matched device objcet
     """
-    matched = None
-    for device in params.devices:
-        if device.name == device_name:
-            matched = device
-            break
-    if matched is None:
-        raise JunosRestError("No configured device matches {d}", d=device_name)
-    return matched
+    return get_inventory().get(device_name)
+
+
+def device_names(devices):
+    """Get the names of the devices to run a fleet operation on.
+
+    Arguments:
+        devices {list|str} -- Device Names, or a device selector
+
+    Returns:
+        {list} -- Device Names
+    """
+    if isinstance(devices, str):
+        return [device.name for device in get_inventory().select(devices)]
+    return devices
+
+
+async def device_result(device_name, operation):
+    """Run one device's part of a fleet operation, turning failures into results.
+
+    Any failure is logged & returned as an error result, so one device's
+    failure, or a bug it hits, doesn't abandon the rest of the fleet.
+
+    Arguments:
+        device_name {str} -- Device Name
+        operation {coroutine} -- The device's operation, returning its
+            Response Details
+
+    Returns:
+        {dict} -- Response Details
+    """
+    try:
+        return await operation
+    except (JunosRestError, OSError) as err:
+        log.log(getattr(err, "level", "ERROR"), "'{}': {}", device_name, err)
+        return {"status": "error", "message": str(err)}
+    except asyncio.CancelledError:
+        raise
+    except Exception as err:
+        log.exception("'{}': Unexpected error", device_name)
+        return {"status": "error", "message": repr(err)}
 
 
 async def build_config(config):
@@ -74,5 +108,8 @@ async def build_config(config):
     else:
         parsed.update(config)
 
-    log.debug("Pending Config:\n{c}", c=parsed)
+    log.opt(lazy=True).debug(
+        "Pending Config: {c}",
+        c=lambda: ujson.dumps(parsed, escape_forward_slashes=False),
+    )
     return parsed
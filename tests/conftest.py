@@ -0,0 +1,81 @@
+"""Shared fixtures, running junos_rest against simulated devices."""
+
+# Standard Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.cache import cache
+from junos_rest.health import health
+from junos_rest.limiter import limiter
+from junos_rest.pool import pool
+from junos_rest.running import running_configs
+from junos_rest.simulator import Simulator
+
+
+@pytest.fixture(scope="session")
+def loop():
+    """Run every test on one event loop, which junos_rest's state is bound to."""
+    event_loop = asyncio.new_event_loop()
+    yield event_loop
+    event_loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine to completion.
+
+    Returns:
+        {callable} -- Function taking a coroutine & returning its result
+    """
+    return loop.run_until_complete
+
+
+class _Simulated:
+    """Async context manager running simulated devices as the inventory."""
+
+    def __init__(self, tmp_path, monkeypatch, **options):
+        """Set where the inventory is written, & the Simulator options."""
+        self.tmp_path = tmp_path
+        self.monkeypatch = monkeypatch
+        self.simulator = Simulator(**options)
+
+    async def __aenter__(self):
+        """Start the devices & point junos_rest at them.
+
+        Returns:
+            {object} -- Simulator
+        """
+        await self.simulator.start()
+        config_file = self.tmp_path / "junos_rest.yaml"
+        config_file.write_text(self.simulator.inventory())
+        self.monkeypatch.setenv("JUNOS_REST_CONFIG", str(config_file))
+        self.monkeypatch.setenv("JUNOS_REST_SNAPSHOT_DIR", str(self.tmp_path))
+        return self.simulator
+
+    async def __aexit__(self, *args):
+        """Stop the devices, & forget everything cached about them."""
+        await pool.close()
+        await self.simulator.stop()
+        for device in self.simulator.devices:
+            running_configs.invalidate(device.name)
+            cache.invalidate(device.name)
+            health._devices.pop(device.name, None)
+            limiter._devices.pop(device.name, None)
+
+
+@pytest.fixture
+def simulated(tmp_path, monkeypatch):
+    """Start simulated devices, e.g. `async with simulated(devices=2) as sim`.
+
+    Returns:
+        {callable} -- Function taking Simulator options & returning an
+            async context manager
+    """
+
+    def _simulated(**options):
+        return _Simulated(tmp_path, monkeypatch, **options)
+
+    return _simulated
@@ -0,0 +1,124 @@
+"""Tests for building config request bodies, in memory or streamed."""
+
+# Standard Library Imports
+import gzip
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.actions import set_config
+from junos_rest.body import BodyBuilder
+from junos_rest.body import StreamedBody
+from junos_rest.body import bodies
+from junos_rest.body import config_text
+from junos_rest.body import iter_config
+from junos_rest.constants import CONFIG_JSON
+from junos_rest.constants import LOAD_SET
+
+
+def interfaces(count):
+    """Build an interfaces config, with text needing escaping in XML."""
+    return {
+        "configuration": {
+            "interfaces": {
+                "interface": [
+                    {
+                        "name": f"ge-0/0/{i}",
+                        "description": f"<link> & 'uplink' {i}/\"a\"",
+                        "unit": [{"name": unit, "vlan-id": unit} for unit in range(5)],
+                    }
+                    for i in range(count)
+                ]
+            },
+            "system": {"host-name": "r1"},
+        }
+    }
+
+
+async def collect(body):
+    """Read every chunk of a streamed body."""
+    return [chunk async for chunk in body]
+
+
+@pytest.mark.parametrize("limit", [1, 16, 100, 1000, 1_000_000])
+def test_pieces_join_to_whole(limit):
+    """A config serialized in pieces is the same as serialized at once."""
+    config = interfaces(20)
+    pieces = list(iter_config(CONFIG_JSON, config, "merge", limit=limit))
+    assert "".join(pieces) == config_text(CONFIG_JSON, config, "merge")
+
+
+def test_pieces_bounded():
+    """Large containers are split, so no piece is much larger than the limit."""
+    pieces = list(iter_config(CONFIG_JSON, interfaces(200), "merge", limit=1000))
+    assert len(pieces) > 20
+    assert max(len(piece) for piece in pieces) < 2000
+
+
+def test_set_statements():
+    """`set` statements are loaded one per line, escaped."""
+    text = config_text(LOAD_SET, ["set system host-name r1", "set a b<c"], "set")
+    assert "set system host-name r1\nset a b&lt;c" in text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 4096])
+def test_streamed_chunks(run, chunk_size):
+    """Streamed bodies are sent in chunks of at least `chunk_size` bytes."""
+    config = interfaces(50)
+    pieces = iter_config(CONFIG_JSON, config, "merge", limit=chunk_size)
+    body = StreamedBody(pieces, chunk_size, compress=False)
+    chunks = run(collect(body))
+    assert all(len(chunk) >= chunk_size for chunk in chunks[:-1])
+    assert b"".join(chunks) == config_text(CONFIG_JSON, config, "merge").encode()
+    assert body.sent == sum(len(chunk) for chunk in chunks)
+
+
+def test_streamed_gzip(run):
+    """Compressed streamed bodies decompress to the whole body."""
+    config = interfaces(50)
+    pieces = iter_config(CONFIG_JSON, config, "merge", limit=256)
+    body = StreamedBody(pieces, 256, compress=True)
+    data = b"".join(run(collect(body)))
+    assert gzip.decompress(data) == config_text(CONFIG_JSON, config, "merge").encode()
+    assert body.sent == len(data)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_build_in_memory(run, compress):
+    """Bodies below the threshold are built in memory, compressed if enabled."""
+    builder = BodyBuilder(stream_threshold=1_000_000, gzip=compress)
+    config = interfaces(5)
+    data, headers = run(builder.build(CONFIG_JSON, config, "merge"))
+    expected = config_text(CONFIG_JSON, config, "merge").encode()
+    assert isinstance(data, bytes)
+    assert (gzip.decompress(data) if compress else data) == expected
+    assert headers == ({"Content-Encoding": "gzip"} if compress else {})
+
+
+@pytest.mark.parametrize("stream_threshold, streamed", [(100, True), (None, False)])
+def test_build_streamed_above_threshold(run, stream_threshold, streamed):
+    """Bodies at or above the threshold are streamed, unless it's None."""
+    builder = BodyBuilder(stream_threshold=stream_threshold, chunk_size=256)
+    data, _ = run(builder.build(CONFIG_JSON, interfaces(5), "merge"))
+    assert isinstance(data, StreamedBody) is streamed
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_streamed_push(run, simulated, compress):
+    """Devices load configs sent as streamed bodies, compressed or not."""
+    config = interfaces(30)
+
+    async def push():
+        async with simulated() as simulator:
+            device = simulator.devices[0]
+            result = await set_config(device.name, config=config)
+            return result, device.config
+
+    bodies.configure(stream_threshold=1024, chunk_size=256, gzip=compress)
+    try:
+        result, device_config = run(push())
+    finally:
+        bodies.configure()
+    assert result["status"] == "success"
+    assert device_config == config["configuration"]
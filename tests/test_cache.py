@@ -0,0 +1,218 @@
+"""Tests for the operational RPC response cache."""
+
+# Standard Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+import junos_rest.cache
+from junos_rest.actions import run_rpc
+from junos_rest.actions import set_config
+from junos_rest.cache import ResponseCache
+from junos_rest.cache import cache as response_cache
+
+
+class FakeClock:
+    """Stand-in for the `time` module, which only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at an arbitrary time."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        """Get the current time."""
+        return self.now
+
+
+class Fetcher:
+    """Fetch function counting its calls, returning output of a given size."""
+
+    def __init__(self, size=10, delay=0):
+        """Set the output's size, & how long each fetch takes."""
+        self.size = size
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        """Fetch the output."""
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"call": self.calls}, self.size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's clock with a fake one.
+
+    Returns:
+        {object} -- FakeClock
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(junos_rest.cache, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def cache(clock):
+    """Build a cache caching every RPC for 10 seconds, up to 100 bytes.
+
+    Returns:
+        {object} -- ResponseCache
+    """
+    enabled = ResponseCache()
+    enabled.configure(ttl=10, max_bytes=100)
+    return enabled
+
+
+def test_disabled(run):
+    """Nothing is cached until the cache is configured."""
+    fetch = Fetcher()
+    disabled = ResponseCache()
+    run(disabled.get("r1", "get-alarm-information", None, fetch))
+    run(disabled.get("r1", "get-alarm-information", None, fetch))
+    assert fetch.calls == 2
+
+
+def test_ttl(run, cache, clock):
+    """Output is cached until its TTL expires."""
+    fetch = Fetcher()
+    assert run(cache.get("r1", "get-alarm-information", None, fetch)) == {"call": 1}
+    clock.now += 9.9
+    assert run(cache.get("r1", "get-alarm-information", None, fetch)) == {"call": 1}
+    clock.now += 0.1
+    assert run(cache.get("r1", "get-alarm-information", None, fetch)) == {"call": 2}
+    assert cache.size == 10
+
+
+@pytest.mark.parametrize(
+    "rpc, ttl",
+    [
+        ("get-alarm-information", 2),
+        ("get-route-information", None),
+        ("get-interface-information", 10),
+        ("get-configuration", None),
+        ("get-commit-information", None),
+        ("", None),
+    ],
+)
+def test_ttl_for(cache, rpc, ttl):
+    """RPCs have their own TTL, or the default, & 0 disables caching."""
+    cache.ttls = {"get-alarm-information": 2, "get-route-information": 0}
+    assert cache.ttl_for(rpc) == ttl
+
+
+def test_params_keyed(run, cache):
+    """Output is cached separately for each set of parameters, in any order."""
+    fetch = Fetcher()
+    rpc = "get-interface-information"
+    run(cache.get("r1", rpc, {"terse": "", "interface-name": "ge-0/0/0"}, fetch))
+    run(cache.get("r1", rpc, {"interface-name": "ge-0/0/0", "terse": ""}, fetch))
+    run(cache.get("r1", rpc, {"interface-name": "ge-0/0/1"}, fetch))
+    run(cache.get("r2", rpc, {"interface-name": "ge-0/0/1"}, fetch))
+    assert fetch.calls == 3
+
+
+def test_lru_byte_eviction(run, cache):
+    """The least recently used output is evicted to stay within `max_bytes`."""
+    fetches = {rpc: Fetcher(size=40) for rpc in ("a", "b", "c")}
+
+    def get(rpc):
+        return run(cache.get("r1", rpc, None, fetches[rpc]))
+
+    get("a")
+    get("b")
+    get("a")
+    get("c")
+    assert cache.size == 80
+    get("a")
+    get("b")
+    assert [fetch.calls for fetch in fetches.values()] == [1, 2, 1]
+
+
+def test_oversized_not_cached(run, cache):
+    """Output larger than the whole cache isn't cached, & evicts nothing."""
+    small, large = Fetcher(size=40), Fetcher(size=101)
+    run(cache.get("r1", "small", None, small))
+    run(cache.get("r1", "large", None, large))
+    run(cache.get("r1", "large", None, large))
+    run(cache.get("r1", "small", None, small))
+    assert (small.calls, large.calls, cache.size) == (1, 2, 40)
+
+
+def test_single_flight(run, cache):
+    """Concurrent identical requests share a single fetch."""
+    fetch = Fetcher(delay=0.01)
+
+    async def get_all():
+        return await asyncio.gather(
+            *(cache.get("r1", "get-alarm-information", None, fetch) for _ in range(5))
+        )
+
+    assert run(get_all()) == [{"call": 1}] * 5
+    assert fetch.calls == 1
+
+
+def test_failed_fetch_not_cached(run, cache):
+    """A failed fetch is raised to every caller sharing it, & isn't cached."""
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("unreachable")
+
+    async def get_all():
+        return await asyncio.gather(
+            *(cache.get("r1", "get-alarm-information", None, fail) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, ValueError) for result in run(get_all()))
+    run(cache.get("r1", "get-alarm-information", None, Fetcher()))
+    assert len(calls) == 1
+
+
+def test_invalidate(run, cache):
+    """Invalidating a device drops its output, & any fetch already under way."""
+    fetch, slow = Fetcher(), Fetcher(delay=0.01)
+    run(cache.get("r1", "a", None, fetch))
+    run(cache.get("r2", "a", None, fetch))
+
+    async def invalidate_during_fetch():
+        pending = asyncio.ensure_future(cache.get("r1", "b", None, slow))
+        await asyncio.sleep(0)
+        cache.invalidate("r1")
+        return await pending
+
+    assert run(invalidate_during_fetch()) == {"call": 1}
+    run(cache.get("r1", "b", None, slow))
+    run(cache.get("r1", "a", None, fetch))
+    run(cache.get("r2", "a", None, fetch))
+    assert (fetch.calls, slow.calls) == (3, 2)
+
+
+def test_commit_invalidates(run, simulated):
+    """Committing a config to a device drops its cached output."""
+    calls = []
+
+    def alarms():
+        calls.append(1)
+        return {"alarm-information": [{"alarm-summary": [{}]}]}
+
+    async def poll():
+        async with simulated(responses={"get-alarm-information": alarms}) as sim:
+            name = sim.devices[0].name
+            await run_rpc(name, "get-alarm-information")
+            await run_rpc(name, "get-alarm-information")
+            await set_config(name, config={"system": {"host-name": "r1"}})
+            await run_rpc(name, "get-alarm-information")
+
+    response_cache.configure(ttl=60)
+    try:
+        run(poll())
+    finally:
+        response_cache.disable()
+    assert len(calls) == 2
@@ -0,0 +1,115 @@
+"""Tests for finding, lazily loading & reloading the config file."""
+
+# Standard Library Imports
+import os
+import subprocess
+import sys
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+import junos_rest.config
+from junos_rest.config import get_params
+from junos_rest.exceptions import JunosRestError
+
+# Config file modification time, in nanoseconds
+MTIME = 1_600_000_000_000_000_000
+
+
+def inventory(*names):
+    """Build a config file's contents, with one device per name."""
+    return "devices:\n" + "".join(
+        f"  - name: {name}\n"
+        "    host: 192.0.2.1\n"
+        "    username: admin\n"
+        "    password: secret\n"
+        for name in names
+    )
+
+
+def write(path, text, mtime_ns):
+    """Write a config file, with a given modification time."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class FakeClock:
+    """Stand-in for the `time` module, which only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at an arbitrary time."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    """Start with nothing loaded, & replace the config module's clock.
+
+    Returns:
+        {object} -- FakeClock
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(junos_rest.config, "time", fake)
+    monkeypatch.setattr(junos_rest.config, "_loaded", {})
+    monkeypatch.setattr(junos_rest.config, "_checked", {})
+    monkeypatch.setenv("JUNOS_REST_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    return fake
+
+
+def test_import_is_lazy(tmp_path):
+    """Importing junos_rest reads no config, & imports neither YAML nor pydantic."""
+    code = (
+        "import sys, junos_rest.actions, junos_rest.config\n"
+        "assert 'yaml' not in sys.modules, 'yaml'\n"
+        "assert 'pydantic' not in sys.modules, 'pydantic'\n"
+    )
+    env = dict(os.environ, JUNOS_REST_CONFIG=str(tmp_path / "missing.yaml"))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_params_loaded_on_access(tmp_path, clock, monkeypatch):
+    """`junos_rest.config.params` loads the config when it's accessed."""
+    monkeypatch.setenv("JUNOS_REST_CONFIG", str(tmp_path / "missing.yaml"))
+    with pytest.raises(JunosRestError):
+        junos_rest.config.params  # noqa: B018
+
+    config_file = tmp_path / "junos_rest.yaml"
+    write(config_file, inventory("r1"), MTIME)
+    monkeypatch.setenv("JUNOS_REST_CONFIG", str(config_file))
+    assert [device.name for device in junos_rest.config.params.devices] == ["r1"]
+
+
+def test_config_env(tmp_path, clock, monkeypatch):
+    """The environment variable's path is used, unless a path is given."""
+    env_file, path_file = tmp_path / "env.yaml", tmp_path / "path.yaml"
+    write(env_file, inventory("env1"), MTIME)
+    write(path_file, inventory("path1"), MTIME)
+    monkeypatch.setenv("JUNOS_REST_CONFIG", str(env_file))
+    assert get_params().devices[0].name == "env1"
+    assert get_params(str(path_file)).devices[0].name == "path1"
+
+
+def test_reload_on_mtime_change(tmp_path, clock, monkeypatch):
+    """The config is reloaded when its modification time changes."""
+    config_file = tmp_path / "junos_rest.yaml"
+    write(config_file, inventory("r1"), MTIME)
+    monkeypatch.setenv("JUNOS_REST_CONFIG", str(config_file))
+    first = get_params()
+
+    clock.now += 5
+    assert get_params() is first
+
+    write(config_file, inventory("r1", "r2"), MTIME + 1)
+    clock.now += 0.5
+    assert get_params() is first
+
+    clock.now += 0.5
+    reloaded = get_params()
+    assert [device.name for device in reloaded.devices] == ["r1", "r2"]
+    clock.now += 5
+    assert get_params() is reloaded
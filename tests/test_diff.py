@@ -0,0 +1,153 @@
+"""Tests for computing minimal config deltas."""
+
+# Project Imports
+from junos_rest.actions import set_config
+from junos_rest.body import config_text
+from junos_rest.constants import CONFIG_JSON
+from junos_rest.diff import config_delta
+from junos_rest.diff import set_statements
+
+INTERFACES = {
+    "interface": [
+        {"name": "ge-0/0/0", "description": "uplink", "mtu": 9192},
+        {"name": "ge-0/0/1", "description": "spare"},
+    ]
+}
+
+
+def wrap(config):
+    """Wrap a config under `configuration`, as pushed & fetched."""
+    return {"configuration": config}
+
+
+def test_merge_sends_only_changed_named_items():
+    """Named list items are matched by name, & only changes are sent."""
+    desired = {
+        "interfaces": {
+            "interface": [
+                {"name": "ge-0/0/0", "description": "uplink", "mtu": "9192"},
+                {"name": "ge-0/0/1", "description": "downlink"},
+                {"name": "ge-0/0/2", "description": "new"},
+            ]
+        }
+    }
+    delta = config_delta(wrap({"interfaces": INTERFACES}), wrap(desired))
+    assert delta == wrap(
+        {
+            "interfaces": {
+                "interface": [
+                    {"name": "ge-0/0/1", "description": "downlink"},
+                    {"name": "ge-0/0/2", "description": "new"},
+                ]
+            }
+        }
+    )
+
+
+def test_merge_without_changes_is_none():
+    """A config already contained in the current config changes nothing."""
+    desired = {"interfaces": {"interface": [{"name": "ge-0/0/1"}]}}
+    assert config_delta(wrap({"interfaces": INTERFACES}), wrap(desired)) is None
+
+
+def test_replace_tags_only_changed_hierarchies():
+    """Items with different keys are replaced, & changed values merged."""
+    current = {"interfaces": INTERFACES, "system": {"host-name": "r1"}}
+    desired = {
+        "interfaces": {
+            "interface": [
+                {"name": "ge-0/0/0", "description": "uplink"},
+                {"name": "ge-0/0/1", "description": "downlink"},
+            ]
+        },
+        "system": {"host-name": "r1"},
+    }
+    delta = config_delta(wrap(current), wrap(desired), action="replace")
+    assert delta == wrap(
+        {
+            "interfaces": {
+                "interface": [
+                    {
+                        "name": "ge-0/0/0",
+                        "@": {"operation": "replace"},
+                        "description": "uplink",
+                    },
+                    {"name": "ge-0/0/1", "description": "downlink"},
+                ]
+            }
+        }
+    )
+
+
+def test_replace_removed_item_replaces_parent():
+    """Removing a named item replaces the list's parent in full."""
+    desired = {"interfaces": {"interface": [INTERFACES["interface"][0]]}}
+    delta = config_delta(wrap({"interfaces": INTERFACES}), wrap(desired), "replace")
+    assert delta == wrap(
+        {"interfaces": {"@": {"operation": "replace"}, **desired["interfaces"]}}
+    )
+
+
+def test_set_statements_quote_values():
+    """Values are quoted & escaped, & implied keywords are left out."""
+    statements = set_statements(
+        {
+            "interfaces": {
+                "interface": [
+                    {"name": "ge-0/0/0", "description": 'core "a" \\ b'},
+                    {"name": "ge-0/0/1", "disable": None},
+                ]
+            },
+            "system": {"host-name": "r1.example.com"},
+        }
+    )
+    assert statements == [
+        'set interfaces ge-0/0/0 description "core \\"a\\" \\\\ b"',
+        "set interfaces ge-0/0/1 disable",
+        "set system host-name r1.example.com",
+    ]
+
+
+def test_config_is_xml_escaped():
+    """JSON config is XML-escaped inside `configuration-json`."""
+    delta = wrap({"system": {"location": {"building": "A&B <1>"}}})
+    text = config_text(CONFIG_JSON, delta, "merge")
+    assert "A&amp;B &lt;1&gt;" in text
+    assert "A&B" not in text
+
+
+def test_push_applies_delta(run, simulated):
+    """Deltas pushed with each action leave the device with the desired config."""
+
+    async def push():
+        initial = {"interfaces": INTERFACES, "system": {"host-name": "r1"}}
+        async with simulated(config=initial) as simulator:
+            device = simulator.devices[0]
+
+            location = {"building": 'core "a" & <b>'}
+            desired = {"system": {"location": location}}
+            for action in ("set", "merge"):
+                result = await set_config(device.name, config=desired, action=action)
+                assert result["status"] == "success"
+            assert result["changed"] is False
+            assert device.config["system"]["location"] == location
+
+            desired = {"interfaces": {"interface": [{"name": "ge-0/0/1", "mtu": 1500}]}}
+            result = await set_config(device.name, config=desired)
+            assert result["delta"] == wrap(desired)
+            assert device.config["interfaces"]["interface"][1] == {
+                "name": "ge-0/0/1",
+                "description": "spare",
+                "mtu": 1500,
+            }
+
+            desired = {"system": {"host-name": "r2"}}
+            result = await set_config(device.name, config=desired, action="replace")
+            assert result["status"] == "success"
+            assert result["delta"] == wrap(
+                {"system": {"@": {"operation": "replace"}, "host-name": "r2"}}
+            )
+            assert device.config["system"] == {"host-name": "r2"}
+            assert len(device.commits) == 3
+
+    run(push())
@@ -0,0 +1,161 @@
+"""Tests for device health tracking & the circuit breaker."""
+
+# Standard Library Imports
+from types import SimpleNamespace
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+import junos_rest.connection
+from junos_rest.actions import run_rpc
+from junos_rest.exceptions import JunosRestError
+from junos_rest.health import CLOSED
+from junos_rest.health import HALF_OPEN
+from junos_rest.health import OPEN
+from junos_rest.health import HealthTracker
+from junos_rest.health import health
+
+DEVICE = SimpleNamespace(name="r1", host="192.0.2.1", port=443, connect_timeout=None)
+
+
+class FakeClock:
+    """Stand-in for the `time` module, which only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at an arbitrary time."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the health tracker's clock with a fake one.
+
+    Returns:
+        {object} -- FakeClock
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(junos_rest.health, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def tracker(clock):
+    """Build a health tracker using the fake clock.
+
+    Returns:
+        {object} -- HealthTracker
+    """
+    return HealthTracker(reachability_ttl=60, failure_threshold=3, reset_timeout=30)
+
+
+def test_opens_after_consecutive_failures(tracker):
+    """The circuit opens after `failure_threshold` failures in a row."""
+    tracker.record_failure("r1")
+    tracker.record_failure("r1")
+    tracker.record_success("r1")
+    tracker.record_failure("r1")
+    tracker.record_failure("r1")
+    assert tracker.state("r1") == CLOSED
+    assert tracker.allow("r1")
+    tracker.record_failure("r1")
+    assert tracker.state("r1") == OPEN
+    assert not tracker.allow("r1")
+
+
+@pytest.mark.parametrize(
+    "status, state", [(None, OPEN), (500, OPEN), (503, OPEN), (404, CLOSED)]
+)
+def test_record_status(tracker, status, state):
+    """Server errors & missing responses are failures, others successes."""
+    for _ in range(3):
+        tracker.record_status("r1", status)
+    assert tracker.state("r1") == state
+
+
+def test_half_open_after_reset_timeout(tracker, clock):
+    """Once the reset timeout passes, a single trial request is let through."""
+    for _ in range(3):
+        tracker.record_failure("r1")
+    clock.now += 29.9
+    assert not tracker.allow("r1")
+    clock.now += 0.1
+    assert tracker.allow("r1")
+    assert tracker.state("r1") == HALF_OPEN
+    assert not tracker.allow("r1")
+    clock.now += 30
+    assert tracker.allow("r1")
+
+
+def test_half_open_success_closes(tracker, clock):
+    """A successful trial request closes the circuit."""
+    for _ in range(3):
+        tracker.record_failure("r1")
+    clock.now += 30
+    assert tracker.allow("r1")
+    tracker.record_success("r1")
+    assert tracker.state("r1") == CLOSED
+    assert tracker["r1"].failures == 0
+    assert tracker.allow("r1")
+
+
+def test_half_open_failure_reopens(tracker, clock):
+    """A failed trial request re-opens the circuit for another reset period."""
+    for _ in range(3):
+        tracker.record_failure("r1")
+    clock.now += 30
+    assert tracker.allow("r1")
+    clock.now += 5
+    tracker.record_failure("r1")
+    assert tracker.state("r1") == OPEN
+    clock.now += 29
+    assert not tracker.allow("r1")
+    clock.now += 1
+    assert tracker.allow("r1")
+
+
+def test_check_rejects_open_circuit(run, tracker):
+    """Requests to a device with an open circuit fail immediately."""
+    for _ in range(3):
+        tracker.record_failure(DEVICE.name)
+    with pytest.raises(JunosRestError) as err:
+        run(tracker.check(DEVICE))
+    assert err.value.status == 503
+
+
+def test_check_caches_reachability(run, tracker, clock, monkeypatch):
+    """Devices are only probed once their cached reachability expires."""
+    probes = []
+
+    async def probe(host, port, timeout):
+        probes.append(host)
+        return True
+
+    monkeypatch.setattr(junos_rest.health, "_test_reachability", probe)
+    run(tracker.check(DEVICE))
+    clock.now += 59
+    run(tracker.check(DEVICE))
+    assert len(probes) == 1
+    clock.now += 1
+    run(tracker.check(DEVICE))
+    assert len(probes) == 2
+
+
+def test_retried_request_counts_once(run, simulated, monkeypatch):
+    """A request which fails on every retry is a single failure."""
+    monkeypatch.setattr(junos_rest.connection, "backoff", lambda attempt: 0)
+
+    async def fail():
+        async with simulated(error_rate=1) as simulator:
+            device = simulator.devices[0]
+            with pytest.raises(JunosRestError):
+                await run_rpc(device.name, "get-software-information")
+            return health[device.name]
+
+    device_health = run(fail())
+    assert device_health.state == CLOSED
+    assert device_health.failures == 1
@@ -0,0 +1,106 @@
+"""Tests for the indexed inventory & device selectors."""
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+from junos_rest.inventory import Inventory
+from junos_rest.models.device import Device
+
+DEVICES = [
+    ("nyc-edge1", "nyc", "edge", ["core"]),
+    ("nyc-edge2", "nyc", "edge", ["lab"]),
+    ("nyc-core1", "nyc", "core", ["core"]),
+    ("lax-edge1", "lax", "edge", []),
+    ("lax-core1", "lax", "core", ["core", "lab"]),
+    ("spare1", None, None, []),
+]
+
+
+@pytest.fixture(scope="module")
+def inventory():
+    """Build an inventory across two sites & two roles.
+
+    Returns:
+        {object} -- Inventory
+    """
+    return Inventory(
+        [
+            Device(
+                name=name,
+                host="192.0.2.1",
+                username="admin",
+                password="secret",
+                site=site,
+                role=role,
+                tags=tags,
+            )
+            for name, site, role, tags in DEVICES
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("nyc-edge1", ["nyc-edge1"]),
+        ("name:lax-core1,nyc-edge1", ["nyc-edge1", "lax-core1"]),
+        ("site:lax", ["lax-edge1", "lax-core1"]),
+        ("site:nyc,lax", [name for name, *_ in DEVICES[:5]]),
+        ("role:core", ["nyc-core1", "lax-core1"]),
+        ("tag:lab", ["nyc-edge2", "lax-core1"]),
+        ("tag:core,lab", ["nyc-edge1", "nyc-edge2", "nyc-core1", "lax-core1"]),
+        ("*", [name for name, *_ in DEVICES]),
+        ("site:nyc role:edge", ["nyc-edge1", "nyc-edge2"]),
+        ("site:nyc role:edge tag:core", ["nyc-edge1"]),
+        ("role:edge !tag:lab", ["nyc-edge1", "lax-edge1"]),
+        ("!site:nyc", ["lax-edge1", "lax-core1", "spare1"]),
+        ("* !site:nyc !role:core", ["lax-edge1", "spare1"]),
+        (
+            "!spare1 !name:nyc-edge1",
+            ["nyc-edge2", "nyc-core1", "lax-edge1", "lax-core1"],
+        ),
+        ("site:ams", []),
+        ("tag:unknown", []),
+        ("site:nyc site:lax", []),
+        ("role:edge !role:edge", []),
+        ("", []),
+        ("  ", []),
+    ],
+)
+def test_select(inventory, selector, expected):
+    """Devices matching every term, less any negated ones, in configured order."""
+    assert [device.name for device in inventory.select(selector)] == expected
+
+
+@pytest.mark.parametrize(
+    "selector, message",
+    [
+        ("router9", "No configured device matches router9"),
+        ("name:nyc-edge1,router9", "No configured device matches router9"),
+        ("!router9", "No configured device matches router9"),
+        ("vendor:juniper", "Invalid selector 'vendor:juniper'"),
+        ("site:nyc platform:mx", "Invalid selector 'platform:mx'"),
+    ],
+)
+def test_select_errors(inventory, selector, message):
+    """Unknown terms & device names raise errors, rather than matching nothing."""
+    with pytest.raises(JunosRestError) as err:
+        inventory.select(selector)
+    assert str(err.value).startswith(message)
+
+
+def test_lookup(inventory):
+    """Devices are found by name, & membership is checked by name."""
+    assert inventory.get("lax-core1").site == "lax"
+    assert "spare1" in inventory
+    assert "router9" not in inventory
+    assert len(inventory) == len(DEVICES)
+
+
+def test_duplicate_names():
+    """A device may only be defined once."""
+    device = Device(name="r1", host="192.0.2.1", username="admin", password="x")
+    with pytest.raises(JunosRestError):
+        Inventory([device, device])
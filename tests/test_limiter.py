@@ -0,0 +1,195 @@
+"""Tests for adaptive per-device & fleet-wide concurrency limits."""
+
+# Standard Library Imports
+import asyncio
+from types import SimpleNamespace
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Project Imports
+import junos_rest.limiter
+from junos_rest.limiter import ConcurrencyLimiter
+
+R1 = SimpleNamespace(name="r1", max_sessions=None)
+
+
+class FakeClock:
+    """Stand-in for the `time` module, which only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at an arbitrary time."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the limiter's clock with a fake one.
+
+    Returns:
+        {object} -- FakeClock
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(junos_rest.limiter, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def limiter(clock):
+    """Build a limiter starting devices at 8 concurrent requests.
+
+    Returns:
+        {object} -- ConcurrencyLimiter
+    """
+    return ConcurrencyLimiter(fleet_limit=256, device_limit=8)
+
+
+def request(run, limiter, clock, status=200, elapsed=0.1, error=None, device=R1):
+    """Make a single request through the limiter, advancing the clock."""
+
+    async def _request():
+        async with limiter.slot(device) as slot:
+            clock.now += elapsed
+            if error is not None:
+                raise error
+            slot.record(status)
+
+    run(_request())
+    clock.now += 0.001
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_overloaded_status_halves(run, limiter, clock, status):
+    """Overloaded responses halve the limit."""
+    request(run, limiter, clock)
+    request(run, limiter, clock, status=status)
+    assert limiter.limit("r1") == 4
+    request(run, limiter, clock, status=status)
+    assert limiter.limit("r1") == 2
+
+
+@pytest.mark.parametrize("status", [200, 400, 404, 500, 502])
+def test_other_statuses_keep_limit(run, limiter, clock, status):
+    """Responses other than overloaded ones don't decrease the limit."""
+    request(run, limiter, clock, status=status)
+    assert limiter.limit("r1") == 8
+
+
+def test_transient_errors_halve(run, limiter, clock):
+    """Timeouts & connection errors halve the limit, other errors don't."""
+    with pytest.raises(httpx.ReadTimeout):
+        request(run, limiter, clock, error=httpx.ReadTimeout("timed out"))
+    assert limiter.limit("r1") == 4
+    with pytest.raises(ValueError):
+        request(run, limiter, clock, error=ValueError("bug"))
+    assert limiter.limit("r1") == 4
+
+
+def test_slow_responses_halve(run, limiter, clock):
+    """Responses much slower than the device's usual response time halve it."""
+    for _ in range(5):
+        request(run, limiter, clock, elapsed=1)
+    request(run, limiter, clock, elapsed=3.9)
+    assert limiter.limit("r1") == 8
+    request(run, limiter, clock, elapsed=4.5)
+    assert limiter.limit("r1") == 4
+
+
+def test_once_per_round(run, limiter, clock):
+    """Requests sent before a decrease don't decrease the limit again."""
+
+    async def burst():
+        async def overloaded():
+            async with limiter.slot(R1) as slot:
+                await asyncio.sleep(0)
+                slot.record(503)
+
+        await asyncio.gather(*(overloaded() for _ in range(4)))
+
+    run(burst())
+    assert limiter.limit("r1") == 4
+
+
+def test_additive_recovery(run, limiter, clock):
+    """Successes raise the limit by one per round, back up to the maximum."""
+    request(run, limiter, clock, status=503)
+    request(run, limiter, clock, status=503)
+    assert limiter.limit("r1") == 2
+    request(run, limiter, clock)
+    request(run, limiter, clock)
+    assert limiter.limit("r1") == pytest.approx(2.9, abs=0.01)
+    for _ in range(100):
+        request(run, limiter, clock)
+    assert limiter.limit("r1") == 8
+
+
+def test_floor(run, limiter, clock):
+    """The limit is never decreased below one request."""
+    for _ in range(6):
+        request(run, limiter, clock, status=503)
+    assert limiter.limit("r1") == 1
+
+
+def test_max_sessions(run, limiter, clock):
+    """Devices start at their own `max_sessions`, & follow changes to it."""
+    device = SimpleNamespace(name="r2", max_sessions=4)
+    request(run, limiter, clock, device=device)
+    assert limiter.limit("r2") == 4
+    device.max_sessions = 2
+    request(run, limiter, clock, device=device)
+    assert limiter.limit("r2") == 2
+    device.max_sessions = 6
+    request(run, limiter, clock, device=device)
+    assert limiter.limit("r2") == 6
+    assert limiter.limit("r3") is None
+
+
+async def peak_active(limiter, devices, hold=0.01):
+    """Hold a slot for each device at once, & find the most held at once."""
+    active = peak = 0
+
+    async def hold_slot(device):
+        nonlocal active, peak
+        async with limiter.slot(device, kind=None):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(hold)
+            active -= 1
+
+    await asyncio.gather(*(hold_slot(device) for device in devices))
+    return peak
+
+
+def test_device_limit_enforced(run, limiter, clock):
+    """No more than a device's current limit of requests run at once."""
+    request(run, limiter, clock, status=503)
+    assert run(peak_active(limiter, [R1] * 10)) == 4
+
+
+def test_fleet_cap(run, limiter):
+    """No more than the fleet limit of requests run at once, across devices."""
+    limiter.configure(fleet_limit=3, device_limit=8)
+    devices = [SimpleNamespace(name=f"r{i}", max_sessions=None) for i in range(6)]
+    assert run(peak_active(limiter, devices * 2)) == 3
+
+
+def test_cancelled_waiter(run, limiter):
+    """A request cancelled while waiting for a slot doesn't keep it."""
+    limiter.configure(fleet_limit=1)
+
+    async def cancel_waiter():
+        holder = asyncio.ensure_future(peak_active(limiter, [R1], hold=0.01))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(peak_active(limiter, [R1]))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await holder
+        return await peak_active(limiter, [R1])
+
+    assert run(cancel_waiter()) == 1
+    assert limiter.fleet.active == 0
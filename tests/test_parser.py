@@ -0,0 +1,258 @@
+"""Tests for parsing JunOS XML & RPC replies."""
+
+# Standard Library Imports
+from xml.etree.ElementTree import ParseError
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+from junos_rest.parser import XMLStreamParser
+from junos_rest.parser import parse_batch
+from junos_rest.parser import parse_results
+
+XNM = "http://xml.juniper.net/xnm/1.1/xnm"
+JUNOS = "http://xml.juniper.net/junos/*/junos"
+
+DOCUMENT = (
+    b'<?xml version="1.0" encoding="us-ascii"?>\n'
+    b'<interface-information xmlns:junos="' + JUNOS.encode() + b'">'
+    b'<physical-interface junos:style="brief">'
+    b"<name>ge-0/0/0</name><mtu>9192</mtu><description/>"
+    b'<oper-status junos:format="Up">up</oper-status>'
+    b"</physical-interface>"
+    b"<physical-interface><name>ge-0/0/1</name></physical-interface>"
+    b"</interface-information>"
+    b"<cli><banner/></cli>"
+)
+
+PARSED = {
+    "results": {
+        "interface-information": {
+            "physical-interface": [
+                {
+                    "@style": "brief",
+                    "name": "ge-0/0/0",
+                    "mtu": "9192",
+                    "description": None,
+                    "oper-status": {"@format": "Up", "#text": "up"},
+                },
+                {"name": "ge-0/0/1"},
+            ]
+        },
+        "cli": {"banner": None},
+    }
+}
+
+
+def parse(chunks):
+    """Feed each chunk to a new parser, & return the parsed dict."""
+    parser = XMLStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def response(content, status=200, content_type="application/xml"):
+    """Build a reply to an RPC."""
+    headers = {"content-type": content_type} if content_type else {}
+    request = httpx.Request("POST", "https://sim0/rpc")
+    return httpx.Response(status, content=content, headers=headers, request=request)
+
+
+def test_layout():
+    """Output has xmltodict's layout, without namespaces, in a results root."""
+    assert parse([DOCUMENT]) == PARSED
+
+
+def test_every_split_point():
+    """Output is the same wherever the document is split, even mid-declaration."""
+    for cut in range(len(DOCUMENT) + 1):
+        assert parse([DOCUMENT[:cut], DOCUMENT[cut:]]) == PARSED
+
+
+def test_single_bytes():
+    """Output is the same when the document arrives a byte at a time."""
+    chunks = [DOCUMENT[i : i + 1] for i in range(len(DOCUMENT))]
+    assert parse(chunks) == PARSED
+
+
+@pytest.mark.parametrize(
+    "xml, expected",
+    [
+        ("", {"results": None}),
+        ("  \n", {"results": None}),
+        ('<?xml version="1.0"?>', {"results": None}),
+        ('\n  <?xml version="1.0"?>\n<a>1</a>', {"results": {"a": "1"}}),
+        ("<a/>", {"results": {"a": None}}),
+        ("<a>  </a>", {"results": {"a": None}}),
+        ("<a>x<b/></a>", {"results": {"a": {"b": None, "#text": "x"}}}),
+        ("<a/><a>1</a><a/>", {"results": {"a": [None, "1", None]}}),
+    ],
+)
+def test_edge_cases(xml, expected):
+    """Declarations, whitespace, empty & repeated elements are handled."""
+    assert parse([xml]) == expected
+
+
+def test_invalid_xml():
+    """Malformed XML raises an error."""
+    parser = XMLStreamParser()
+    with pytest.raises(ParseError):
+        parser.feed("<a><b></a>")
+        parser.close()
+
+
+def commit_results(*engines):
+    """Build `commit-results`, with one `routing-engine` per engine body."""
+    return "<commit-results>{}</commit-results>".format(
+        "".join(f"<routing-engine>{engine}</routing-engine>" for engine in engines)
+    )
+
+
+SUCCESS = {"status": "success", "data": None}
+
+
+@pytest.mark.parametrize(
+    "xml, expected",
+    [
+        (commit_results("<name>re0</name><commit-success/>"), SUCCESS),
+        (
+            commit_results(
+                "<name>re0</name><commit-success/>", "<name>re1</name><commit-success/>"
+            ),
+            SUCCESS,
+        ),
+        (
+            commit_results(
+                "<name>re0</name><commit-success/>",
+                "<name>re1</name><error><message>re1 failed</message></error>",
+            ),
+            {
+                "status": "fail",
+                "data": "re1 failed",
+                "detail": {"message": "re1 failed"},
+            },
+        ),
+        (
+            "<load-configuration-results><load-success/>"
+            "</load-configuration-results>",
+            SUCCESS,
+        ),
+        (
+            "<load-configuration-results><error>"
+            "<message>syntax error</message></error>"
+            "</load-configuration-results>",
+            {
+                "status": "fail",
+                "data": "syntax error",
+                "detail": {"message": "syntax error"},
+            },
+        ),
+        (
+            f'<xnm:error xmlns:xnm="{XNM}"><message>bad rpc</message></xnm:error>',
+            {"status": "fail", "data": "bad rpc", "detail": {"message": "bad rpc"}},
+        ),
+        (
+            "<error><line>3</line></error><error><message>bad</message></error>",
+            {"status": "fail", "data": "bad", "detail": {"line": "3"}},
+        ),
+    ],
+)
+def test_parse_results(run, xml, expected):
+    """Commit & load successes & errors are found, on any routing engine."""
+    assert run(parse_results(response(xml.encode()))) == expected
+
+
+@pytest.mark.parametrize(
+    "status, content, expected",
+    [
+        (200, b"", SUCCESS),
+        (204, b"", SUCCESS),
+        (500, b"Internal error\n", {"status": "error", "message": "Internal error"}),
+        (503, b"", {"status": "error", "message": "Unexpected response (503)"}),
+        (200, b"<commit-results/>", SUCCESS),
+    ],
+)
+def test_parse_results_status(run, status, content, expected):
+    """Replies without RPC results are judged on their status."""
+    reply = response(content, status=status, content_type=None)
+    assert run(parse_results(reply)) == expected
+
+
+def test_parse_results_invalid(run):
+    """Malformed replies raise JunosRestError."""
+    with pytest.raises(JunosRestError):
+        run(parse_results(response(b"<commit-results><oops></commit-results>")))
+
+
+def multipart(*parts, boundary="batch"):
+    """Build a multipart/mixed reply, with one part per (Content-Type, body)."""
+    body = b"".join(
+        f"--{boundary}\r\nContent-Type: {content_type}\r\n\r\n".encode()
+        + content
+        + b"\r\n"
+        for content_type, content in parts
+    )
+    body += f"--{boundary}--\r\n".encode()
+    return response(body, content_type=f'multipart/mixed; boundary="{boundary}"')
+
+
+def test_parse_batch(run):
+    """Each part is parsed according to its Content-Type, in order."""
+    reply = multipart(
+        ("application/json", b'{"software-information": [{"host-name": "sim0"}]}'),
+        ("application/xml", b"<chassis-inventory><chassis/></chassis-inventory>"),
+        ("text/plain", b"\nHostname: sim0\n"),
+    )
+    assert run(parse_batch(reply, 3)) == [
+        {
+            "status": "success",
+            "data": {"software-information": [{"host-name": "sim0"}]},
+        },
+        {"status": "success", "data": {"chassis-inventory": {"chassis": None}}},
+        {"status": "success", "data": "Hostname: sim0"},
+    ]
+
+
+def test_parse_batch_single(run):
+    """A single RPC's output is returned as-is, without a multipart wrapper."""
+    reply = response(b"<chassis-inventory/>")
+    assert run(parse_batch(reply, 1)) == [
+        {"status": "success", "data": {"chassis-inventory": None}}
+    ]
+
+
+def test_parse_batch_skipped(run):
+    """RPCs after an error are skipped, each with its own result dict."""
+    error = f'<xnm:error xmlns:xnm="{XNM}"><message>bad rpc</message></xnm:error>'
+    reply = multipart(("application/xml", b"<a/>"), ("application/xml", error.encode()))
+    results = run(parse_batch(reply, 4))
+    assert results == [
+        {"status": "success", "data": {"a": None}},
+        {"status": "fail", "data": "bad rpc", "detail": {"message": "bad rpc"}},
+        {"status": "skipped", "data": None},
+        {"status": "skipped", "data": None},
+    ]
+    results[2]["data"] = "changed"
+    assert results[3]["data"] is None
+
+
+def test_parse_results_multipart(run):
+    """Every part of a multipart reply is checked, each with its own declaration."""
+    declaration = b'<?xml version="1.0"?>\n'
+    load = b"<load-configuration-results><load-success/></load-configuration-results>"
+    commit = commit_results("<name>re0</name><commit-success/>").encode()
+    failed = commit_results("<error><message>commit failed</message></error>")
+    success = multipart(
+        ("application/xml", declaration + load),
+        ("application/xml", declaration + commit),
+    )
+    assert run(parse_results(success)) == SUCCESS
+    failure = multipart(
+        ("application/xml", declaration + load),
+        ("application/xml", declaration + failed.encode()),
+    )
+    assert run(parse_results(failure))["data"] == "commit failed"
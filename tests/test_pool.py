@@ -0,0 +1,129 @@
+"""Tests for the per-device connection pool."""
+
+# Standard Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.actions import run_rpc
+from junos_rest.pool import pool
+from junos_rest.util import find_device
+
+
+@pytest.fixture
+def limits():
+    """Configure the pool's limits, restoring the defaults afterwards.
+
+    Returns:
+        {callable} -- `pool.configure`
+    """
+    yield pool.configure
+    pool.configure()
+
+
+async def peak_connections(device, operation):
+    """Run an operation, & find the most connections a device had open at once."""
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, device.connections)
+            await asyncio.sleep(0.001)
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        result = await operation
+    finally:
+        watcher.cancel()
+    return peak, result
+
+
+def test_connection_shared(run, simulated):
+    """Concurrent callers share one connection per device."""
+
+    async def acquire():
+        async with simulated() as simulator:
+            device = await find_device(simulator.devices[0].name)
+            connections = await asyncio.gather(
+                *(pool.acquire(device) for _ in range(5))
+            )
+            for _ in connections:
+                pool.release(device)
+            return device.name, connections
+
+    name, connections = run(acquire())
+    assert len({id(connection) for connection in connections}) == 1
+    assert name not in pool
+
+
+def test_hard_limit(run, simulated, limits):
+    """Concurrent requests to a device use at most `hard_limit` connections."""
+    limits(soft_limit=2, hard_limit=3)
+
+    async def burst():
+        async with simulated(latency=0.05) as simulator:
+            device = simulator.devices[0]
+            # Check the device is reachable first, so only requests connect.
+            await run_rpc(device.name, "get-commit-information")
+            requests = asyncio.gather(
+                *(run_rpc(device.name, "get-commit-information") for _ in range(12))
+            )
+            peak, outputs = await peak_connections(device, requests)
+            await asyncio.sleep(0.05)
+            return peak, outputs, device.connections
+
+    peak, outputs, kept = run(burst())
+    assert peak == 3
+    assert len(outputs) == 12
+    assert kept == 2
+
+
+def test_idle_reaping(run, simulated, limits):
+    """Connections are closed once idle, but never while in use."""
+    limits(idle_timeout=0.05)
+
+    async def idle():
+        async with simulated() as simulator:
+            device = await find_device(simulator.devices[0].name)
+            async with pool.session(device):
+                await asyncio.sleep(0.1)
+                in_use = device.name in pool
+            idle = device.name in pool
+            await asyncio.sleep(0.1)
+            return in_use, idle, device.name in pool
+
+    assert run(idle()) == (True, True, False)
+
+
+def test_reaping_oldest_first(run, simulated, limits):
+    """Each idle connection is closed when it expires, & not before."""
+    limits(idle_timeout=0.2)
+
+    async def stagger():
+        async with simulated(devices=2) as simulator:
+            first, second = [device.name for device in simulator.devices]
+            await run_rpc(first, "get-commit-information")
+            await asyncio.sleep(0.12)
+            await run_rpc(second, "get-commit-information")
+            await asyncio.sleep(0.12)
+            return first in pool, second in pool
+
+    assert run(stagger()) == (False, True)
+
+
+def test_async_with_closes(run, simulated):
+    """Leaving the pool's async context closes every connection."""
+
+    async def shutdown():
+        async with simulated(devices=2) as simulator:
+            async with pool:
+                for device in simulator.devices:
+                    await run_rpc(device.name, "get-commit-information")
+                opened = len(pool)
+            await asyncio.sleep(0.05)
+            return opened, len(pool), [d.connections for d in simulator.devices]
+
+    assert run(shutdown()) == (2, 0, [0, 0])
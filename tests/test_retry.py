@@ -0,0 +1,130 @@
+"""Tests for deadlines & retrying transient failures."""
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Project Imports
+import junos_rest.connection
+from junos_rest.connection import Connection
+from junos_rest.constants import RETRY_ATTEMPTS
+from junos_rest.exceptions import JunosRestError
+from junos_rest.health import health
+from junos_rest.limiter import limiter
+from junos_rest.models.device import Device
+from junos_rest.retry import Deadline
+from junos_rest.retry import backoff
+
+
+class FakeClient:
+    """Stand-in for httpx's client, replying with each given outcome in turn."""
+
+    def __init__(self, *outcomes):
+        """Set each attempt's outcome, a status code or an exception to raise."""
+        self.outcomes = list(outcomes)
+        self.attempts = 0
+
+    async def request(self, method, url, timeout=None, **kwargs):
+        """Reply to a request with the next outcome."""
+        self.attempts += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        request = httpx.Request(method, f"http://192.0.2.1:8080{url}")
+        return httpx.Response(outcome, content=b"{}", request=request)
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    """Build connections which reply with given outcomes, without backoff delays.
+
+    Returns:
+        {callable} -- Function taking each attempt's outcome & returning
+            a Connection
+    """
+    monkeypatch.setattr(junos_rest.connection, "backoff", lambda attempt: 0)
+    device = Device(name="retry1", host="192.0.2.1", username="admin", password="x")
+
+    def _connect(*outcomes):
+        connection = Connection()
+        connection.device = device
+        connection.session = FakeClient(*outcomes)
+        return connection
+
+    yield _connect
+    health._devices.pop(device.name, None)
+    limiter._devices.pop(device.name, None)
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [502, 503, 504, httpx.ReadTimeout("timed out"), ConnectionResetError()],
+)
+def test_transient_failure_retried(run, connect, failure):
+    """Idempotent requests are retried after transient failures."""
+    connection = connect(failure, failure, 200)
+    assert run(connection.get(item="get-software-information")) == {}
+    assert connection.session.attempts == 3
+
+
+@pytest.mark.parametrize("failure", [400, 401, 500, httpx.ProtocolError("bad")])
+def test_permanent_failure_not_retried(run, connect, failure):
+    """Failures which wouldn't succeed if retried are raised immediately."""
+    connection = connect(failure, 200)
+    with pytest.raises(JunosRestError):
+        run(connection.get(item="get-software-information"))
+    assert connection.session.attempts == 1
+
+
+def test_attempts_exhausted(run, connect):
+    """Retries stop after `RETRY_ATTEMPTS` attempts."""
+    connection = connect(*[503] * (RETRY_ATTEMPTS + 1))
+    with pytest.raises(JunosRestError) as err:
+        run(connection.get(item="get-software-information"))
+    assert err.value.status == 503
+    assert connection.session.attempts == RETRY_ATTEMPTS
+
+
+@pytest.mark.parametrize("failure", [503, httpx.ReadTimeout("timed out")])
+def test_non_idempotent_never_retried(run, connect, failure):
+    """Requests which may change the device are never retried."""
+    connection = connect(failure, 200)
+    with pytest.raises(JunosRestError):
+        run(connection.post(endpoint="/rpc", data="<commit/>"))
+    assert connection.session.attempts == 1
+
+
+def test_expired_deadline(run, connect):
+    """No request is sent once the deadline has passed."""
+    connection = connect(200)
+    with pytest.raises(JunosRestError) as err:
+        run(connection.get(item="get-software-information", deadline=Deadline(0)))
+    assert err.value.status == 504
+    assert connection.session.attempts == 0
+
+
+def test_retry_past_deadline_abandoned(run, connect, monkeypatch):
+    """Retries which would wait past the deadline aren't attempted."""
+    monkeypatch.setattr(junos_rest.connection, "backoff", lambda attempt: 5)
+    connection = connect(503, 200)
+    with pytest.raises(JunosRestError):
+        run(connection.get(item="get-software-information", deadline=Deadline(1)))
+    assert connection.session.attempts == 1
+
+
+def test_deadline_limits_timeouts():
+    """Timeouts are shortened so they end by the deadline."""
+    assert Deadline().remaining() is None
+    assert Deadline().limit(30) == 30
+    assert not Deadline().expired
+    assert Deadline(5).limit(30) <= 5
+    assert Deadline(60).limit(30) == 30
+    assert Deadline(0).expired
+
+
+@pytest.mark.parametrize("attempt, ceiling", [(1, 0.5), (2, 1), (4, 4), (10, 10)])
+def test_backoff(attempt, ceiling):
+    """Delays are jittered, up to a doubling ceiling capped at the maximum."""
+    delays = [backoff(attempt, base_delay=0.5, max_delay=10) for _ in range(200)]
+    assert all(0 <= delay <= ceiling for delay in delays)
+    assert max(delays) > ceiling / 2
@@ -0,0 +1,147 @@
+"""Tests for the per-device running config cache."""
+
+# Standard Library Imports
+from types import SimpleNamespace
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.pool import pool
+from junos_rest.running import RunningConfigCache
+from junos_rest.util import find_device
+
+CONFIG = {
+    "system": {"host-name": "r1"},
+    "interfaces": {"interface": [{"name": "ge-0/0/0"}]},
+    "protocols": {"lldp": {"interface": [{"name": "all"}]}},
+}
+
+
+def commit_information(number):
+    """Build `get-commit-information` output, with `number` commits."""
+    if not number:
+        return {"commit-information": [{}]}
+    history = [{"sequence-number": [{"data": "0"}], "comment": [{"data": number}]}]
+    return {"commit-information": [{"commit-history": history}]}
+
+
+class FakeSession:
+    """Device connection, recording each config fetched."""
+
+    def __init__(self, commits=1):
+        """Start with a number of commits on the device."""
+        self.device = SimpleNamespace(name="r1")
+        self.commits = commits
+        self.fetched = []
+
+    async def get(self, item, deadline=None):
+        """Get the device's commit history."""
+        assert item == "get-commit-information"
+        return commit_information(self.commits)
+
+    async def get_config(self, paths=None, deadline=None):
+        """Get some of the device's config, or all of it."""
+        self.fetched.append(paths)
+        if paths is None:
+            config = CONFIG
+        else:
+            config = {key: CONFIG[key] for key in paths if key in CONFIG}
+        return {"configuration": {"@": {"junos:changed-seconds": "1"}, **config}}
+
+
+@pytest.fixture
+def cache():
+    """Build an empty running config cache.
+
+    Returns:
+        {object} -- RunningConfigCache
+    """
+    return RunningConfigCache()
+
+
+def test_fetches_only_missing_hierarchies(run, cache):
+    """Only hierarchies which aren't cached yet are fetched."""
+    session = FakeSession()
+    system = run(cache.get(session, ["system"]))
+    assert system == {"configuration": {"system": CONFIG["system"]}}
+    assert run(cache.get(session, ["system"])) == system
+    both = run(cache.get(session, ["interfaces", "system"]))
+    assert both["configuration"].keys() == {"system", "interfaces"}
+    assert session.fetched == [["system"], ["interfaces"]]
+
+
+def test_missing_hierarchy_cached(run, cache):
+    """A hierarchy which doesn't exist is cached as absent."""
+    session = FakeSession()
+    assert run(cache.get(session, ["snmp"])) == {"configuration": {}}
+    run(cache.get(session, ["snmp"]))
+    assert session.fetched == [["snmp"]]
+
+
+def test_whole_config(run, cache):
+    """Once the whole config is cached, no hierarchy is fetched again."""
+    session = FakeSession()
+    assert run(cache.get(session)) == {"configuration": CONFIG}
+    run(cache.get(session, ["protocols"]))
+    run(cache.get(session))
+    assert session.fetched == [None]
+
+
+def test_partial_then_whole_config(run, cache):
+    """The whole config is fetched if only some hierarchies are cached."""
+    session = FakeSession()
+    run(cache.get(session, ["system"]))
+    run(cache.get(session))
+    assert session.fetched == [["system"], None]
+
+
+def test_commit_invalidates(run, cache):
+    """A new commit on the device discards every cached hierarchy."""
+    session = FakeSession()
+    run(cache.get(session, ["system", "interfaces"]))
+    session.commits += 1
+    run(cache.get(session, ["system"]))
+    run(cache.get(session, ["interfaces"]))
+    assert session.fetched == [["system", "interfaces"], ["system"], ["interfaces"]]
+
+
+def test_no_commit_history(run, cache):
+    """Configs aren't cached for devices without a commit history."""
+    session = FakeSession(commits=0)
+    run(cache.get(session, ["system"]))
+    run(cache.get(session, ["system"]))
+    assert session.fetched == [["system"], ["system"]]
+
+
+def test_invalidate(run, cache):
+    """Invalidating a device drops its cached config."""
+    session = FakeSession()
+    run(cache.get(session, ["system"]))
+    assert "r1" in cache
+    cache.invalidate("r1")
+    assert "r1" not in cache
+    run(cache.get(session, ["system"]))
+    assert session.fetched == [["system"], ["system"]]
+
+
+def test_simulated_device(run, simulated, cache):
+    """Only the requested hierarchies are fetched from a device, until it commits."""
+
+    async def fetch():
+        async with simulated(config=CONFIG) as simulator:
+            device = simulator.devices[0]
+            device.commits.append({"number": 1, "time": 0})
+            device_obj = await find_device(device.name)
+            async with pool.session(device_obj) as session:
+                first = await cache.get(session, ["system"])
+                device.config = {**CONFIG, "system": {"host-name": "r2"}}
+                cached = await cache.get(session, ["system"])
+                device.commits.append({"number": 2, "time": 1})
+                committed = await cache.get(session, ["system"])
+            return first, cached, committed
+
+    first, cached, committed = run(fetch())
+    assert first == {"configuration": {"system": {"host-name": "r1"}}}
+    assert cached == first
+    assert committed == {"configuration": {"system": {"host-name": "r2"}}}
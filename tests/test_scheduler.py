@@ -0,0 +1,257 @@
+"""Tests for coalescing concurrent pushes to a device into one commit."""
+
+# Standard Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+import junos_rest.scheduler
+from junos_rest.actions import set_config
+from junos_rest.diff import combine_configs
+from junos_rest.exceptions import JunosRestError
+from junos_rest.scheduler import scheduler
+
+
+def wrap(config):
+    """Wrap a config under `configuration`, as pushed & fetched."""
+    return {"configuration": config}
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    """Record each combined config the scheduler pushes, instead of sending it.
+
+    Returns:
+        {list} -- Device name, config & action of each push, in order
+    """
+    pushed = []
+
+    async def push_config(device_name, config_data, action="merge", **kwargs):
+        pushed.append((device_name, config_data, action))
+        return {"status": "success", "data": None}
+
+    monkeypatch.setattr(junos_rest.scheduler, "push_config", push_config)
+    return pushed
+
+
+def submit_all(run, *pushes):
+    """Submit configs to one device concurrently, & wait for every result."""
+
+    async def submit():
+        return await asyncio.gather(
+            *(scheduler.submit("r1", wrap(config), action) for config, action in pushes)
+        )
+
+    return run(submit())
+
+
+def test_combine_merges_named_items():
+    """Configs for different members of a named list are combined."""
+    base = wrap({"interfaces": {"interface": [{"name": "ge-0/0/0", "mtu": 9192}]}})
+    fragment = wrap(
+        {"interfaces": {"interface": [{"name": "ge-0/0/1", "description": "b"}]}}
+    )
+    combined, conflicts = combine_configs(base, fragment)
+    assert conflicts == []
+    assert combined == wrap(
+        {
+            "interfaces": {
+                "interface": [
+                    {"name": "ge-0/0/0", "mtu": 9192},
+                    {"name": "ge-0/0/1", "description": "b"},
+                ]
+            }
+        }
+    )
+
+
+def test_combine_reports_conflicts():
+    """Configs which set the same value differently conflict, by path."""
+    base = wrap({"interfaces": {"interface": [{"name": "ge-0/0/0", "mtu": 9192}]}})
+    fragment = wrap({"interfaces": {"interface": [{"name": "ge-0/0/0", "mtu": 1500}]}})
+    conflicts = ["/interfaces/interface/ge-0/0/0/mtu"]
+    assert combine_configs(base, fragment) == (None, conflicts)
+    assert combine_configs(base, base) == (base, [])
+
+    base, fragment = wrap({"system": {"host-name": "a"}}), wrap({"system": {}})
+    assert combine_configs(base, fragment, "replace") == (None, ["/system"])
+
+
+def test_concurrent_submits_are_coalesced(run, commits):
+    """Configs queued within the commit window are pushed together."""
+    results = submit_all(
+        run,
+        ({"system": {"host-name": "r1"}}, "merge"),
+        ({"system": {"domain-name": "example.com"}}, "merge"),
+    )
+    assert commits == [
+        (
+            "r1",
+            wrap({"system": {"host-name": "r1", "domain-name": "example.com"}}),
+            "merge",
+        )
+    ]
+    assert [result["coalesced"] for result in results] == [2, 2]
+
+
+def test_conflict_and_later_configs_are_deferred(run, commits):
+    """A conflicting config, & every config after it, is pushed afterwards."""
+    results = submit_all(
+        run,
+        ({"system": {"host-name": "r1"}}, "merge"),
+        ({"system": {"host-name": "r2"}}, "merge"),
+        ({"system": {"domain-name": "example.com"}}, "merge"),
+    )
+    assert [config for _, config, _ in commits] == [
+        wrap({"system": {"host-name": "r1"}}),
+        wrap({"system": {"host-name": "r2", "domain-name": "example.com"}}),
+    ]
+    assert [result["coalesced"] for result in results] == [1, 2, 2]
+    assert [result.get("conflicts") for result in results] == [
+        None,
+        ["/system/host-name"],
+        None,
+    ]
+
+
+def test_actions_are_not_combined(run, commits):
+    """Configs are only combined with configs pushed with the same action."""
+    submit_all(
+        run,
+        ({"system": {"host-name": "r1"}}, "merge"),
+        ({"system": {"domain-name": "example.com"}}, "replace"),
+    )
+    assert [action for _, _, action in commits] == ["merge", "replace"]
+
+
+def test_failed_push_fails_its_batch(run, monkeypatch):
+    """Every config in a batch gets the error if its push fails."""
+
+    async def push_config(device_name, config_data, action="merge", **kwargs):
+        raise OSError("Connection refused")
+
+    monkeypatch.setattr(junos_rest.scheduler, "push_config", push_config)
+
+    async def submit():
+        configs = [{"system": {"host-name": "r1"}}, {"system": {"time-zone": "UTC"}}]
+        return await asyncio.gather(
+            *(scheduler.submit("r1", wrap(config)) for config in configs),
+            return_exceptions=True,
+        )
+
+    assert [type(result) for result in run(submit())] == [OSError, OSError]
+    assert len(scheduler) == 0
+
+
+def test_unbatchable_configs_fail_every_waiting_push(run, commits):
+    """If a batch can't be built, every queued config gets the error."""
+
+    async def submit():
+        results = await asyncio.gather(
+            scheduler.submit("r1", wrap({"system": {"host-name": "r1"}})),
+            scheduler.submit("r1", ["not", "a", "config"]),
+            return_exceptions=True,
+        )
+        retried = await scheduler.submit("r1", wrap({"system": {"host-name": "r1"}}))
+        return results, retried
+
+    results, retried = run(submit())
+    assert [type(result) for result in results] == [AttributeError] * 2
+    assert retried["status"] == "success"
+    assert len(commits) == 1
+
+
+def test_commit_gets_earliest_deadline(run, monkeypatch):
+    """A commit is bounded by its configs' earliest deadline, & expired configs fail."""
+    deadlines = []
+
+    async def push_config(device_name, config_data, action="merge", deadline=None):
+        deadlines.append(deadline)
+        return {"status": "success", "data": None}
+
+    monkeypatch.setattr(junos_rest.scheduler, "push_config", push_config)
+
+    async def submit():
+        configs = [({"host-name": "r1"}, 60), ({"time-zone": "UTC"}, 10)]
+        return await asyncio.gather(
+            *(
+                scheduler.submit("r1", wrap({"system": config}), deadline=deadline)
+                for config, deadline in configs
+            ),
+            scheduler.submit("r1", wrap({"system": {"domain-name": "a"}}), deadline=0),
+            return_exceptions=True,
+        )
+
+    first, second, expired = run(submit())
+    assert first["coalesced"] == second["coalesced"] == 2
+    assert len(deadlines) == 1 and 9 < deadlines[0] <= 10
+    assert isinstance(expired, JunosRestError) and expired.status == 504
+
+
+def test_push_deadline(run, simulated):
+    """A push to a slow device fails once its deadline passes."""
+
+    async def push():
+        async with simulated(latency=0.5) as simulator:
+            device = simulator.devices[0]
+            with pytest.raises(JunosRestError):
+                config = {"system": {"host-name": "r1"}}
+                await set_config(device.name, config=config, deadline=0.2)
+            return device
+
+    assert run(push()).commits == []
+
+
+def test_concurrent_pushes_share_a_commit(run, simulated):
+    """Pushes to a simulated device within the window share a commit."""
+
+    async def push():
+        async with simulated() as simulator:
+            device = simulator.devices[0]
+            configs = [
+                {"system": {"host-name": "r1"}},
+                {"system": {"domain-name": "example.com"}},
+                {"system": {"time-zone": "Etc/UTC"}},
+            ]
+            results = await asyncio.gather(
+                *(set_config(device.name, config=config) for config in configs)
+            )
+            return device, results
+
+    device, results = run(push())
+    assert [result["status"] for result in results] == ["success"] * 3
+    assert [result["coalesced"] for result in results] == [3, 3, 3]
+    assert len(device.commits) == 1
+    assert device.config["system"] == {
+        "host-name": "r1",
+        "domain-name": "example.com",
+        "time-zone": "Etc/UTC",
+    }
+
+
+def test_conflicting_push_is_deferred(run, simulated):
+    """A conflicting push to a simulated device is committed afterwards."""
+
+    async def push():
+        async with simulated() as simulator:
+            device = simulator.devices[0]
+            configs = [
+                {"system": {"host-name": "r1"}},
+                {"system": {"host-name": "r2"}},
+                {"system": {"domain-name": "example.com"}},
+            ]
+            results = await asyncio.gather(
+                *(set_config(device.name, config=config) for config in configs)
+            )
+            return device, results
+
+    device, results = run(push())
+    first, conflicting, later = results
+    assert first["coalesced"] == 1 and "conflicts" not in first
+    assert conflicting["coalesced"] == 2
+    assert conflicting["conflicts"] == ["/system/host-name"]
+    assert later["coalesced"] == 2 and "conflicts" not in later
+    assert len(device.commits) == 2
+    assert device.config["system"] == {"host-name": "r2", "domain-name": "example.com"}
@@ -0,0 +1,154 @@
+"""Tests for compiled inventory snapshots."""
+
+# Standard Library Imports
+import pickle  # noqa: S403
+import stat
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest import snapshot
+
+PASSWORD = "hunter2-secret"
+
+
+def inventory(*names):
+    """Build a config file's contents, with one device per name."""
+    return "devices:\n" + "".join(
+        f"  - name: {name}\n"
+        "    host: 192.0.2.1\n"
+        "    username: admin\n"
+        f"    password: {PASSWORD}-{name}\n"
+        "    tags: [core]\n"
+        for name in names
+    )
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    """Save snapshots to a new directory.
+
+    Returns:
+        {Path} -- Snapshot directory
+    """
+    snapshot_dir = tmp_path / "snapshots"
+    monkeypatch.setenv(snapshot.SNAPSHOT_ENV, str(snapshot_dir))
+    return snapshot_dir
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Record each config compiled, rather than loaded from a snapshot.
+
+    Returns:
+        {list} -- Contents of each config compiled
+    """
+    compiled = []
+    compile_raw = snapshot._compile
+
+    def _compile(raw):
+        compiled.append(raw)
+        return compile_raw(raw)
+
+    monkeypatch.setattr(snapshot, "_compile", _compile)
+    return compiled
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a config file with two devices.
+
+    Returns:
+        {Path} -- Config file path
+    """
+    path = tmp_path / "junos_rest.yaml"
+    path.write_text(inventory("r1", "r2"))
+    return path
+
+
+def test_hit_and_miss(snapshots, compiles, config_file):
+    """A config is compiled once, & later loaded from its snapshot."""
+    compiled = snapshot.load(config_file)
+    loaded = snapshot.load(config_file)
+    assert len(compiles) == 1
+    assert compiled.devices == loaded.devices
+    assert loaded.devices[1].name == "r2"
+    assert loaded.devices[1].tags == ("core",)
+    assert loaded.devices[1].url() == "http://192.0.2.1:8080"
+
+    config_file.write_text(inventory("r1", "r2", "r3"))
+    assert len(snapshot.load(config_file).devices) == 3
+    assert len(compiles) == 2
+
+
+def test_stale_snapshots_removed(snapshots, compiles, config_file, tmp_path):
+    """Older snapshots of a config are removed, but not other configs'."""
+    other_file = tmp_path / "other.yaml"
+    other_file.write_text(inventory("x1"))
+    snapshot.load(other_file)
+    snapshot.load(config_file)
+    config_file.write_text(inventory("r1"))
+    snapshot.load(config_file)
+    snapshot.load(config_file)
+
+    files = sorted(snapshots.iterdir())
+    assert [path.suffix for path in files].count(".pickle") == 2
+    assert [path.suffix for path in files].count(".passwords") == 2
+    assert len({path.name.split("-")[0] for path in files}) == 2
+    assert len(compiles) == 3
+
+
+def test_permissions(snapshots, config_file):
+    """Snapshots are only readable by the current user."""
+    snapshot.load(config_file)
+    assert stat.S_IMODE(snapshots.stat().st_mode) == 0o700
+    for path in snapshots.iterdir():
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_passwords_not_in_snapshot(snapshots, config_file):
+    """Passwords are saved in their own file, not in the snapshot."""
+    snapshot.load(config_file)
+    (snapshot_file,) = snapshots.glob("*.pickle")
+    assert PASSWORD.encode() not in snapshot_file.read_bytes()
+    with snapshot_file.open("rb") as f:
+        _, rows = pickle.load(f)  # noqa: S301
+    assert [row[4] for row in rows] == [None, None]
+
+    devices = snapshot.load(config_file).devices
+    assert devices[0].password.get_secret_value() == f"{PASSWORD}-r1"
+    assert devices[1].password.get_secret_value() == f"{PASSWORD}-r2"
+    assert PASSWORD not in repr(devices[0].password)
+
+
+def test_passwords_file_missing(snapshots, compiles, config_file):
+    """Passwords are read from the config file if their file is missing."""
+    snapshot.load(config_file)
+    for path in snapshots.glob("*.passwords"):
+        path.unlink()
+    device = snapshot.load(config_file).devices[1]
+    assert device.password.get_secret_value() == f"{PASSWORD}-r2"
+    assert len(compiles) == 1
+
+
+def test_compare_without_passwords(snapshots, config_file, monkeypatch):
+    """Devices from the same config compare equal without reading passwords."""
+    snapshot.load(config_file)
+
+    def read_password(passwords, index):
+        raise AssertionError("Password read")
+
+    monkeypatch.setattr(snapshot.Passwords, "get", read_password)
+    first, second = snapshot.load(config_file), snapshot.load(config_file)
+    assert first.devices == second.devices
+    assert first.devices[0] != second.devices[1]
+
+
+def test_unhashable(snapshots, config_file):
+    """Devices & passwords are mutable, so they can't be hashed."""
+    device = snapshot.load(config_file).devices[0]
+    with pytest.raises(TypeError):
+        hash(device)
+    with pytest.raises(TypeError):
+        hash(device.password)
@@ -0,0 +1,103 @@
+"""Tests for streaming records out of JSON documents split into chunks."""
+
+# Standard Library Imports
+import json
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.actions import stream_rpc
+from junos_rest.exceptions import JunosRestError
+from junos_rest.stream import JSONPathStreamer
+
+PATH = "route-information/route-table/rt"
+
+
+def route(i):
+    """Build a route record, with text which looks like JSON syntax."""
+    return {
+        "rt-destination": [{"data": f"10.0.{i}.0/24"}],
+        "rt-entry": [{"as-path": [{"data": '65000 {"[I]"} \\ ,:'}], "metric": i}],
+    }
+
+
+def route_table(count):
+    """Build `get-route-information` output, with a table off the path."""
+    return {
+        "route-information": [
+            {
+                "route-summary": [{"rt": [{"skipped": "[{"}], "count": count}],
+                "route-table": [
+                    {"table-name": "inet.0", "rt": [route(i) for i in range(count)]}
+                ],
+            }
+        ]
+    }
+
+
+def stream(text, cuts):
+    """Feed a document to a streamer, split at each position in `cuts`."""
+    streamer = JSONPathStreamer(PATH)
+    records, start = [], 0
+    for end in [*cuts, len(text)]:
+        records += streamer.feed(text[start:end])
+        start = end
+    return records + streamer.close()
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_split_point(indent):
+    """Records are the same wherever the document is split."""
+    text = json.dumps(route_table(3), indent=indent)
+    expected = [route(i) for i in range(3)]
+    for cut in range(len(text) + 1):
+        assert stream(text, [cut]) == expected
+
+
+def test_single_characters():
+    """Records are found when the document arrives a character at a time."""
+    text = json.dumps(route_table(5))
+    assert stream(text, range(1, len(text))) == [route(i) for i in range(5)]
+
+
+def test_records_yielded_when_complete():
+    """Each record is yielded as soon as its last character arrives."""
+    text = json.dumps(route_table(2))
+    second = text.index('{"rt-destination"', text.index("rt-destination") + 1)
+    streamer = JSONPathStreamer(PATH)
+    assert streamer.feed(text[:second]) == [route(0)]
+    assert streamer.feed(text[second:-4]) == [route(1)]
+    assert streamer.feed(text[-4:]) == []
+    assert streamer.close() == []
+
+
+def test_scalar_split_across_chunks():
+    """Numbers at the end of a chunk aren't decoded until they're complete."""
+    streamer = JSONPathStreamer("a/b")
+    assert streamer.feed('{"a": {"b": [12') == []
+    assert streamer.feed("345, -500.") == [12345]
+    assert streamer.feed("0, true]}}") == [-500.0, True]
+    assert streamer.close() == []
+
+
+def test_incomplete_document():
+    """A document which ends early is an error."""
+    text = json.dumps(route_table(2))
+    streamer = JSONPathStreamer(PATH)
+    streamer.feed(text[: len(text) // 2])
+    with pytest.raises(JunosRestError):
+        streamer.close()
+
+
+def test_stream_rpc(run, simulated):
+    """Records are streamed from a device's output."""
+
+    async def read():
+        responses = {"get-route-information": route_table(200)}
+        async with simulated(responses=responses) as simulator:
+            device = simulator.devices[0].name
+            rpc = "get-route-information"
+            return [record async for record in stream_rpc(device, rpc, PATH)]
+
+    assert run(read()) == [route(i) for i in range(200)]
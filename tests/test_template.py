@@ -0,0 +1,158 @@
+"""Tests for rendering per-device configs from a template."""
+
+# Standard Library Imports
+from ipaddress import ip_address
+from types import SimpleNamespace
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from junos_rest.exceptions import JunosRestError
+from junos_rest.template import ConfigTemplate
+
+DEVICE = SimpleNamespace(
+    name="nyc-edge1",
+    host=ip_address("192.0.2.1"),
+    port=443,
+    site="nyc",
+    role="edge",
+    tags=("core", "lab"),
+)
+
+
+def render(value, **variables):
+    """Render a single template value for the device."""
+    template = ConfigTemplate({"value": value})
+    return template.render(DEVICE, variables=variables)["value"]
+
+
+@pytest.mark.parametrize(
+    "variable",
+    [
+        ["192.0.2.10", "192.0.2.11"],
+        {"server": [{"name": "192.0.2.10"}]},
+        9192,
+        1.5,
+        True,
+        None,
+        "text",
+    ],
+)
+def test_whole_string_keeps_type(variable):
+    """A string which is only a placeholder is replaced by the value as-is."""
+    assert render("{var}", var=variable) == variable
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("{device.name}", "nyc-edge1"),
+        ("{device.host}", "192.0.2.1"),
+        ("{device.port}", 443),
+        ("{device.tags}", ["core", "lab"]),
+        ("{device.site}-{device.role}", "nyc-edge"),
+        ("mtu {mtu}", "mtu 9192"),
+        ("{mtu:06d}", "009192"),
+        ("{mtu!r}", "9192"),
+        ("{desc!r}", "'uplink'"),
+        ("{mtu:{width}}", "  9192"),
+        ("{{literal}} {desc}", "{literal} uplink"),
+        ("{{mtu}}", "{mtu}"),
+    ],
+)
+def test_formatted(value, expected):
+    """Device fields & variables are formatted into strings."""
+    assert render(value, mtu=9192, desc="uplink", width=6) == expected
+
+
+def test_keys_rendered():
+    """Placeholders in keys are rendered, & static parts are shared."""
+    template = ConfigTemplate({"{device.role}": {"{vlan}": 10}, "static": {"a": 1}})
+    config = template.render(DEVICE, variables={"vlan": "v10"})
+    other = template.render(DEVICE, variables={"vlan": "v20"})
+    assert config == {"edge": {"v10": 10}, "static": {"a": 1}}
+    assert other == {"edge": {"v20": 10}, "static": {"a": 1}}
+    assert config["static"] is other["static"]
+
+
+def test_variables_over_defaults():
+    """A device's own variables take precedence over the defaults."""
+    template = ConfigTemplate({"ntp": "{ntp}", "dns": "{dns}"})
+    config = template.render(
+        DEVICE, variables={"ntp": "10.0.0.1"}, defaults={"ntp": "x", "dns": "y"}
+    )
+    assert config == {"ntp": "10.0.0.1", "dns": "y"}
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [
+        ("{}", "must be named"),
+        ("{0}", "must be named"),
+        ("a {} b", "must be named"),
+        ("{device.password}", "isn't a device field"),
+        ("{device.name.__class__}", "isn't a device field"),
+        ("{unclosed", "Invalid template string"),
+        ("}", "Invalid template string"),
+    ],
+)
+def test_invalid_placeholders(value, message):
+    """Positional, unknown device & malformed placeholders are rejected."""
+    with pytest.raises(JunosRestError) as err:
+        ConfigTemplate({"value": value})
+    assert message in str(err.value)
+    assert err.value.status == 400
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["{site.upper}", "{servers[0]}", "x {site.__doc__}"],
+)
+def test_no_attribute_or_item_access(value):
+    """Attributes & items of variables can't be reached from a template."""
+    with pytest.raises(JunosRestError) as err:
+        render(value, site="nyc", servers=["192.0.2.10"])
+    assert "isn't set for nyc-edge1" in str(err.value)
+
+
+def test_dotted_variable_name():
+    """A dotted placeholder is a variable's full name, not an attribute."""
+    assert render("{site.upper}", **{"site.upper": "NYC"}) == "NYC"
+
+
+def test_missing_variable():
+    """Rendering fails if a variable isn't set for the device."""
+    with pytest.raises(JunosRestError) as err:
+        render("{ntp}")
+    assert str(err.value) == "Template variable 'ntp' isn't set for nyc-edge1"
+
+
+def test_invalid_format():
+    """Formatting errors are reported for the device."""
+    with pytest.raises(JunosRestError) as err:
+        render("{mtu:d}", mtu="9192")
+    assert "Unable to render template for nyc-edge1" in str(err.value)
+
+
+def test_render_many(run, simulated):
+    """Configs are rendered for each device matching a selector, in order."""
+    template = ConfigTemplate({"system": {"host-name": "{device.name}-{suffix}"}})
+
+    async def render_all():
+        async with simulated(devices=3) as simulator:
+            names = [device.name for device in simulator.devices]
+            rendered = list(
+                template.render_many(
+                    f"* !{names[1]}",
+                    variables={names[0]: {"suffix": "a"}},
+                    defaults={"suffix": "z"},
+                )
+            )
+            return names, rendered
+
+    names, rendered = run(render_all())
+    assert rendered == [
+        (names[0], {"system": {"host-name": f"{names[0]}-a"}}),
+        (names[2], {"system": {"host-name": f"{names[2]}-z"}}),
+    ]
@@ -0,0 +1,88 @@
+"""Tests for checking changes on every device before committing any."""
+
+# Project Imports
+from junos_rest.actions import commit_many
+
+BASE = {"system": {"host-name": "router"}}
+CHANGE = {"system": {"location": {"building": "lab-2"}}}
+
+
+def commit(run, simulated, devices, reject=None):
+    """Commit the change to every simulated device, with one optionally rejecting it.
+
+    Returns:
+        {tuple} -- commit_many's result, & the simulated devices
+    """
+
+    async def _commit():
+        async with simulated(devices=devices, config=BASE) as simulator:
+            if reject is not None:
+                simulator.devices[1].reject = reject
+            result = await commit_many("*", config=CHANGE)
+            return result, simulator.devices
+
+    return run(_commit())
+
+
+def test_all_checks_pass(run, simulated):
+    """The change is committed on every device, once each has checked it."""
+    result, devices = commit(run, simulated, devices=3)
+    names = [device.name for device in devices]
+    assert result["status"] == "success"
+    assert list(result["checked"]) == names
+    assert all(check["status"] == "success" for check in result["checked"].values())
+    assert list(result["committed"]) == names
+    for device in devices:
+        assert len(device.commits) == 1
+        assert device.config["system"]["location"] == {"building": "lab-2"}
+        assert not device.locked
+
+
+def test_one_check_fails(run, simulated):
+    """Nothing is committed anywhere if one device rejects the change."""
+    result, devices = commit(run, simulated, devices=3, reject="lab-2")
+    rejected = result["checked"][devices[1].name]
+    assert result["status"] == "fail"
+    assert result["committed"] == {}
+    assert rejected["status"] == "fail"
+    assert "'lab-2' is not allowed" in rejected["data"]
+    assert result["checked"][devices[0].name]["status"] == "success"
+    for device in devices:
+        assert device.commits == []
+        assert device.config == BASE
+        assert not device.locked
+
+
+def test_unchanged_devices_skipped(run, simulated):
+    """Devices which already have the change are checked, but not committed."""
+
+    async def _commit():
+        async with simulated(devices=2, config=BASE) as simulator:
+            simulator.devices[0].config = {**BASE, **CHANGE}
+            result = await commit_many(
+                [device.name for device in simulator.devices], config=CHANGE
+            )
+            return result, simulator.devices
+
+    result, (unchanged, changed) = run(_commit())
+    assert result["status"] == "success"
+    assert result["checked"][unchanged.name]["changed"] is False
+    assert list(result["committed"]) == [changed.name]
+    assert unchanged.commits == []
+    assert len(changed.commits) == 1
+
+
+def test_unknown_device(run, simulated):
+    """Nothing is committed if a device can't be checked at all."""
+
+    async def _commit():
+        async with simulated(devices=1, config=BASE) as simulator:
+            device = simulator.devices[0]
+            result = await commit_many([device.name, "missing"], config=CHANGE)
+            return result, device
+
+    result, device = run(_commit())
+    assert result["status"] == "fail"
+    assert result["checked"]["missing"]["status"] == "error"
+    assert result["committed"] == {}
+    assert device.commits == []